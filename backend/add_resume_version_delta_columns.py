@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add delta storage columns to resume_versions table
+Existing rows hold full content, so they are marked as snapshots
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv('env')
+
+NEW_COLUMNS = {
+    "is_snapshot": "BOOLEAN NOT NULL DEFAULT TRUE",
+    "delta": "JSON",
+    "content_length": "INTEGER",
+}
+
+def add_resume_version_delta_columns():
+    """Add snapshot/delta columns to resume_versions if they don't exist"""
+    
+    # Get database URL from environment
+    database_url = os.getenv("DATABASE_URL")
+    
+    if not database_url:
+        print("❌ DATABASE_URL environment variable not set")
+        return False
+    
+    try:
+        # Create database engine
+        engine = create_engine(database_url)
+        
+        with engine.connect() as connection:
+            # Check which columns already exist
+            check_columns_query = text("""
+                SELECT column_name 
+                FROM information_schema.columns 
+                WHERE table_name = 'resume_versions'
+            """)
+            
+            existing = {row[0] for row in connection.execute(check_columns_query)}
+            
+            for column_name, column_type in NEW_COLUMNS.items():
+                if column_name in existing:
+                    print(f"✅ {column_name} column already exists in resume_versions table")
+                    continue
+                
+                connection.execute(text(f"ALTER TABLE resume_versions ADD COLUMN {column_name} {column_type}"))
+                print(f"✅ Added {column_name} column to resume_versions table")
+            
+            # Delta versions have no full content
+            connection.execute(text("ALTER TABLE resume_versions ALTER COLUMN content DROP NOT NULL"))
+            connection.execute(text("""
+                UPDATE resume_versions 
+                SET content_length = LENGTH(content) 
+                WHERE content_length IS NULL AND content IS NOT NULL
+            """))
+            
+            # Legacy writes could give two versions of a resume the same number;
+            # renumber those resumes in order (1..n) so the unique index can be built
+            renumbered = connection.execute(text("""
+                UPDATE resume_versions AS rv
+                SET version_number = ordered.new_number
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY resume_id ORDER BY version_number, created_at, id
+                    ) AS new_number
+                    FROM resume_versions
+                    WHERE resume_id IN (
+                        SELECT resume_id
+                        FROM resume_versions
+                        GROUP BY resume_id, version_number
+                        HAVING COUNT(*) > 1
+                    )
+                ) AS ordered
+                WHERE rv.id = ordered.id AND rv.version_number <> ordered.new_number
+            """)).rowcount
+            if renumbered:
+                print(f"✅ Renumbered {renumbered} resume versions with duplicate version numbers")
+            
+            connection.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_resume_version_number 
+                ON resume_versions (resume_id, version_number)
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_resume_versions_resume_id 
+                ON resume_versions (resume_id)
+            """))
+            connection.commit()
+            
+            print("✅ Successfully migrated resume_versions table")
+            return True
+            
+    except SQLAlchemyError as e:
+        print(f"❌ Database error: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🔄 Adding delta storage columns to resume_versions table...")
+    success = add_resume_version_delta_columns()
+    
+    if success:
+        print("🎉 Migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Migration failed!")
+        sys.exit(1)
@@ -1,12 +1,16 @@
 from typing import Tuple, Dict, Any, List
 import json
+import logging
 from sqlalchemy.orm import Session
 from ..models.resume import Resume
+from ..utils.structured_output import parse_json_object
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 async def enhance_resume(resume_id: int, job_description: str, db: Session) -> None:
     """Enhance a resume using AI."""
     resume = db.query(Resume).filter(Resume.id == resume_id).first()
@@ -16,15 +20,9 @@ async def enhance_resume(resume_id: int, job_description: str, db: Session) -> N
     # For testing without Google AI, return the original content
     enhanced_content = resume.original_content
 
-    # Create new version
-    from ..models.resume import ResumeVersion
-    version = ResumeVersion(
-        resume_id=resume.id,
-        content=enhanced_content,
-        version_number=len(resume.versions) + 1,
-        changes={"type": "enhancement", "job_description": job_description}
-    )
-    db.add(version)
+    # Create new version (stored as a delta unless a snapshot is due)
+    from ..services.resume_versions import add_resume_version
+    add_resume_version(db, resume, enhanced_content)
 
     # Update resume
     resume.enhanced_content = enhanced_content
@@ -73,10 +71,10 @@ async def score_resume(resume_content: str, job_description: str) -> Tuple[float
 
     try:
         response = await model.generate_content(prompt)
-        result = json.loads(response.text)
+        result = parse_json_object(response.text)
         return result["score"], result["feedback"], result["learning_suggestions"]
     except Exception as e:
-        print(f"Error scoring resume: {e}")
+        logger.exception("Error scoring resume")
         raise
 
 async def generate_cover_letter(
@@ -112,7 +110,7 @@ async def generate_cover_letter(
         response = await model.generate_content(prompt)
         return response.text
     except Exception as e:
-        print(f"Error generating cover letter: {e}")
+        logger.exception("Error generating cover letter")
         raise
 
 
@@ -145,7 +143,7 @@ async def generate_resume_snapshot(
 
     try:
         response = await model.generate_content(prompt)
-        result = json.loads(response.text)
+        result = parse_json_object(response.text)
         
         # TODO: Generate and upload image to cloud storage
         # For now, return a placeholder URL
@@ -153,5 +151,5 @@ async def generate_resume_snapshot(
         
         return result
     except Exception as e:
-        print(f"Error generating resume snapshot: {e}")
+        logger.exception("Error generating resume snapshot")
         raise 
\ No newline at end of file
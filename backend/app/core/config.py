@@ -2,10 +2,13 @@
 Configuration settings for CVPerfect backend
 """
 
+import logging
 import os
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -27,6 +30,9 @@ class Settings(BaseSettings):
     STRIPE_SECRET_KEY: str = ""
     STRIPE_PUBLISHABLE_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
+    STRIPE_EVENT_BATCH_SIZE: int = 100  # webhook events applied per customer per commit
+    STRIPE_EVENT_MAX_ATTEMPTS: int = 5
+    STRIPE_EVENT_MAX_ORPHAN_ATTEMPTS: int = 60  # user lookups (about one per sweep) before events are orphaned
     
     # Real Data Processing Settings
     USE_REAL_DATA: bool = True
@@ -37,21 +43,74 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE_MB: int = 10
     ALLOWED_FILE_TYPES: list = [".pdf", ".doc", ".docx", ".txt"]
     UPLOAD_DIR: str = "uploads"
+    REPORT_CACHE_DIR: str = "report_cache"
+    REPORT_CACHE_MAX_MB: int = 512
+    REPORT_CACHE_MAX_AGE_DAYS: int = 7
+    BULK_UPLOAD_MAX_FILES: int = 1000
+    BULK_EXTRACTION_WORKERS: int = 0  # 0 = one per CPU
     
     # AI Integration Settings (use existing Gemini)
     AI_RATE_LIMIT_PER_MINUTE: int = 60
     AI_REQUEST_TIMEOUT: int = 30
+    BATCH_ANALYSIS_CONCURRENCY: int = 5
+    # Batch analyses are inserted together every N rows or T ms, then streamed
+    BATCH_ANALYSIS_SAVE_ROWS: int = 20
+    BATCH_ANALYSIS_SAVE_INTERVAL_MS: int = 250
+    
+    # Prompt token budgets for user-supplied text (~4 characters per token)
+    PROMPT_MAX_RESUME_TOKENS: int = 6000
+    PROMPT_MAX_JOB_TOKENS: int = 1500
+    PROMPT_MAX_IMPORT_TOKENS: int = 4000
+    
+    # Learning paths shared by requests with the same skill gap
+    LEARNING_PATH_CACHE_TTL_DAYS: int = 30
+    
+    # Job descriptions per resume with memoized section feedback
+    SECTION_ANALYSIS_MAX_JOBS: int = 5
     
     # Data Source Validation
     VALIDATE_PRODUCTION_DATA: bool = True
     MOCK_DATA_ALLOWED: bool = False
     
+    # Outgoing email (SMTP); connections are pooled per worker process
+    EMAIL_HOST: str = "localhost"
+    EMAIL_PORT: int = 587
+    EMAIL_USERNAME: str = ""
+    EMAIL_PASSWORD: str = ""
+    EMAIL_FROM: str = "CVPerfect <noreply@cvperfect.com>"
+    EMAIL_USE_TLS: bool = True
+    EMAIL_POOL_SIZE: int = 8
+    EMAIL_MAX_MESSAGES_PER_CONNECTION: int = 500
+    BULK_EMAIL_CHUNK_SIZE: int = 500
+    WEEKLY_DIGEST_BATCH_SIZE: int = 500
+    EMAIL_TEMPLATE_CACHE_DIR: str = "email_template_cache"  # compiled template bytecode
+    
     # Frontend URL
     FRONTEND_URL: str = "http://localhost:3000"
     
     # Redis (optional)
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Metered-feature usage is counted in Redis and flushed to the user rows
+    QUOTA_FLUSH_INTERVAL_SECONDS: int = 60
+    ENFORCE_UPLOAD_LIMITS: bool = False  # uploads are always counted; refused past the plan limit when set
+    
+    # Prometheus metrics on /metrics
+    METRICS_ENABLED: bool = True
+    METRICS_CELERY_QUEUES: list = ["celery", "resume_processing", "email", "analytics"]
+    
+    # Request timing: Server-Timing header, slow-request log, optional OTLP trace export
+    SERVER_TIMING_ENABLED: bool = False  # the header exposes internal timings; always on in development
+    SLOW_REQUEST_THRESHOLD_MS: int = 1000
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = ""  # e.g. http://localhost:4318/v1/traces
+    OTEL_SERVICE_NAME: str = "cvperfect-backend"
+    
+    # Logging: queued to a background writer; DEBUG traces kept for a sample of requests
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json or text
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+    LOG_QUEUE_SIZE: int = 10000
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
@@ -81,18 +140,18 @@ class Settings(BaseSettings):
                 raise ValueError("Production cannot allow mock data! Set MOCK_DATA_ALLOWED=false")
             
             if not self.GEMINI_API_KEY or self.GEMINI_API_KEY.startswith("test"):
-                print("Warning: Production should use real Gemini API key!")
+                logger.warning("Production should use real Gemini API key!")
             
             if "sqlite" in self.DATABASE_URL.lower():
-                print("Warning: Production should use PostgreSQL database!")
+                logger.warning("Production should use PostgreSQL database!")
                 
-            print("Production data validation passed")
+            logger.info("Production data validation passed")
         
         # Log data source configuration
-        print("Data source config:")
-        print(f"   USE_REAL_DATA: {self.USE_REAL_DATA}")
-        print(f"   ENVIRONMENT: {self.ENVIRONMENT}")
-        print(f"   AI_ENABLED: {bool(self.GEMINI_API_KEY)}")
+        logger.info(
+            f"Data source config: USE_REAL_DATA={self.USE_REAL_DATA} "
+            f"ENVIRONMENT={self.ENVIRONMENT} AI_ENABLED={bool(self.GEMINI_API_KEY)}"
+        )
 
 
 # Create settings instance
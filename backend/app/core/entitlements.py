@@ -0,0 +1,70 @@
+"""
+Feature Entitlements
+One table of what each subscription can use, as a Feature bitmask per
+SubscriptionType computed at import. Checking access is a single AND on
+the mask resolved for the request's user.
+
+Features in a plan's metered set are also limited by a usage quota
+(see services/quota.py); one-time purchases meter enhancements.
+"""
+
+import enum
+from typing import Dict, Optional
+
+from ..models.user import SubscriptionType
+
+
+class Feature(enum.IntFlag):
+    RESUME_UPLOAD = 1 << 0
+    RESUME_ANALYSIS = 1 << 1
+    RESUME_ENHANCE = 1 << 2
+    COVER_LETTER = 1 << 3
+    LEARNING_PATH = 1 << 4
+    JOB_MATCHES = 1 << 5
+    RESUME_SHARING = 1 << 6
+    ANALYTICS = 1 << 7
+    AI_RESUME_GENERATION = 1 << 8
+
+
+NO_FEATURES = Feature(0)
+RESUME_FEATURES = Feature.RESUME_UPLOAD | Feature.RESUME_ANALYSIS | Feature.RESUME_ENHANCE
+ALL_FEATURES = Feature(sum(Feature))
+
+ENTITLEMENTS: Dict[SubscriptionType, Feature] = {
+    SubscriptionType.FREE: NO_FEATURES,
+    SubscriptionType.ONE_TIME: RESUME_FEATURES,
+    SubscriptionType.BASIC: RESUME_FEATURES,
+    SubscriptionType.PROFESSIONAL: ALL_FEATURES,
+    SubscriptionType.ENTERPRISE: ALL_FEATURES,
+}
+
+# Features that draw down a usage quota on top of the plan check
+METERED: Dict[SubscriptionType, Feature] = {
+    SubscriptionType.ONE_TIME: Feature.RESUME_ENHANCE,
+}
+
+# Names accepted by check_feature_access()
+FEATURE_NAMES: Dict[str, Feature] = {feature.name.lower(): feature for feature in Feature}
+
+
+class Entitlements:
+    """A user's resolved feature mask; built once per request"""
+
+    __slots__ = ("user_id", "subscription", "features", "metered")
+
+    def __init__(self, user_id, subscription: Optional[SubscriptionType]):
+        subscription = subscription or SubscriptionType.FREE
+        self.user_id = user_id
+        self.subscription = subscription
+        self.features = ENTITLEMENTS.get(subscription, NO_FEATURES)
+        self.metered = METERED.get(subscription, NO_FEATURES)
+
+    def allows(self, feature: Feature) -> bool:
+        return self.features & feature == feature
+
+    def is_metered(self, feature: Feature) -> bool:
+        return bool(self.metered & feature)
+
+    @classmethod
+    def for_user(cls, user) -> "Entitlements":
+        return cls(user.id, user.subscription_type)
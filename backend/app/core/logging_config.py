@@ -0,0 +1,204 @@
+"""
+Logging Configuration
+Non-blocking, structured application logging. Loggers hand records to a
+QueueHandler, which only enqueues them; a QueueListener thread does the
+formatting (including tracebacks) and the stdout writes, so a request
+never waits on the terminal or the log shipper.
+
+DEBUG records from app.* loggers are sampled per request: a sampled
+request keeps its whole debug trace, the rest keep none. Records at
+LOG_LEVEL and above are always kept.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Tuple
+
+# Per-request logging context, set by RequestContextMiddleware
+_request_id: ContextVar[Optional[str]] = ContextVar("log_request_id", default=None)
+_debug_sampled: ContextVar[Optional[bool]] = ContextVar("log_debug_sampled", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id",
+}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Runs in the caller's thread before a record is queued: attaches the
+    request id and drops unsampled DEBUG records. Outside a request (Celery
+    tasks, startup) DEBUG records are sampled individually.
+    """
+
+    def __init__(self, level: int = logging.INFO, debug_sample_rate: float = 0.0):
+        super().__init__()
+        self.level = level
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        if record.levelno >= self.level:
+            return True
+        sampled = _debug_sampled.get()
+        if sampled is None:
+            sampled = random.random() < self.debug_sample_rate
+        return sampled
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller: records are queued as they
+    are (the queue is in-process, so nothing needs pickling) and formatting
+    is left to the listener. When the queue is full the record is dropped
+    and counted rather than waiting for the listener to catch up.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, in case they are mutated after the call
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(
+    level: str = "INFO",
+    debug_sample_rate: float = 0.0,
+    fmt: str = "json",
+    queue_size: int = 10000,
+) -> QueueListener:
+    """
+    Route the root logger through a bounded queue to a background listener
+    writing to stdout. Safe to call more than once; later calls return the
+    running listener.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    level_number = logging.getLevelName(level.upper())
+    if not isinstance(level_number, int):
+        level_number = logging.INFO
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(RequestContextFilter(level_number, debug_sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level_number)
+
+    # Only our own loggers create DEBUG records for sampling; library debug
+    # output stays off
+    if debug_sample_rate > 0 and level_number > logging.DEBUG:
+        logging.getLogger("app").setLevel(logging.DEBUG)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Stop the listener after it has written out everything queued"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        if _queue_handler.dropped:
+            sys.stderr.write(f"{_queue_handler.dropped} log records dropped: queue full\n")
+    _listener = None
+    _queue_handler = None
+
+
+def _restart_after_fork():
+    """
+    A forked child (prefork Celery worker, pre-loading server) inherits the
+    handler but not the listener thread, and possibly a queue whose lock was
+    held at the fork: give it a fresh queue and listener.
+    """
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+    _queue_handler.queue = log_queue
+    _queue_handler.dropped = 0
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def begin_request(request_id: Optional[str], debug_sample_rate: float) -> Tuple[Token, Token]:
+    """Set the request id and debug sampling decision; pair with end_request"""
+    return (
+        _request_id.set(request_id or uuid.uuid4().hex),
+        _debug_sampled.set(random.random() < debug_sample_rate),
+    )
+
+
+def end_request(tokens: Tuple[Token, Token]):
+    request_token, sampled_token = tokens
+    _request_id.reset(request_token)
+    _debug_sampled.reset(sampled_token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
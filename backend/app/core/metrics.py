@@ -0,0 +1,248 @@
+"""
+Prometheus Metrics
+Series exported on /metrics for the cvperfect-backend scrape job and the
+panels in infra/monitoring/grafana-dashboard.json. Hot-path metrics are
+plain counters and histograms; pool sizes, queue depths and active users
+are read only when Prometheus scrapes.
+
+With several server processes (uvicorn --workers), set
+PROMETHEUS_MULTIPROC_DIR to a shared, emptied-on-start directory so a
+scrape of any process reports the totals of all of them.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Requests that matched no route share one label value
+UNMATCHED_ROUTE = "unmatched"
+
+# Gemini calls run for seconds, well past the default request buckets
+AI_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status code",
+    ["method", "handler", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "handler"],
+)
+
+AI_REQUESTS = Counter(
+    "cvperfect_ai_requests_total",
+    "Gemini generate_content calls",
+    ["endpoint", "status"],
+)
+AI_REQUEST_DURATION = Histogram(
+    "cvperfect_ai_request_duration_seconds",
+    "Gemini generate_content latency",
+    ["endpoint"],
+    buckets=AI_LATENCY_BUCKETS,
+)
+AI_TOKENS = Counter(
+    "cvperfect_ai_tokens_total",
+    "Tokens reported by Gemini usage metadata",
+    ["endpoint", "kind"],
+)
+AI_ERRORS = Counter(
+    "cvperfect_ai_errors_total",
+    "Failed Gemini calls by exception type",
+    ["endpoint", "error"],
+)
+
+RESUMES_PROCESSED = Counter(
+    "cvperfect_resumes_processed_total",
+    "Resume analyses stored",
+    ["source"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cvperfect_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, bypass)",
+    ["cache", "result"],
+)
+
+
+@contextmanager
+def observe_ai_call(endpoint: str) -> Iterator["AICall"]:
+    """Time one Gemini call; record the response's token usage with call.record(response)"""
+    call = AICall(endpoint)
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        AI_REQUESTS.labels(endpoint, "error").inc()
+        AI_ERRORS.labels(endpoint, type(e).__name__).inc()
+        raise
+    else:
+        AI_REQUESTS.labels(endpoint, "success").inc()
+    finally:
+        AI_REQUEST_DURATION.labels(endpoint).observe(time.perf_counter() - start)
+
+
+class AICall:
+    __slots__ = ("endpoint",)
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+    def record(self, response: Any):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        for kind, attribute in (
+            ("prompt", "prompt_token_count"),
+            ("completion", "candidates_token_count"),
+            ("cached", "cached_content_token_count"),
+        ):
+            count = getattr(usage, attribute, None)
+            if count:
+                AI_TOKENS.labels(self.endpoint, kind).inc(count)
+
+
+def record_cache(cache: str, result: str, count: int = 1):
+    if count:
+        CACHE_REQUESTS.labels(cache, result).inc(count)
+
+
+class ScrapeCollector:
+    """
+    Base for collectors read at scrape time. An empty describe() keeps the
+    registry from calling collect() when the collector is registered.
+    """
+
+    def describe(self) -> Iterable[GaugeMetricFamily]:
+        return []
+
+
+class DatabasePoolCollector(ScrapeCollector):
+    """Connection pool gauges for a SQLAlchemy engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        pool = self.engine.pool
+        gauge = GaugeMetricFamily(
+            "cvperfect_db_pool_connections",
+            "SQLAlchemy pool connections in this process by state",
+            labels=["state"],
+        )
+        if hasattr(pool, "checkedout"):
+            gauge.add_metric(["size"], pool.size())
+            gauge.add_metric(["checkedin"], pool.checkedin())
+            gauge.add_metric(["checkedout"], pool.checkedout())
+            # Negative while the pool is below its size
+            gauge.add_metric(["overflow"], max(0, pool.overflow()))
+        yield gauge
+
+
+class CeleryQueueCollector(ScrapeCollector):
+    """Pending messages per Celery queue (Redis list length)"""
+
+    def __init__(self, broker_url: str, queues: Iterable[str]):
+        self.broker_url = broker_url
+        self.queues = list(queues)
+        self._client = None
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.broker_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._client
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        gauge = GaugeMetricFamily("celery_queue_length", "Messages waiting in each Celery queue", labels=["queue"])
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for queue in self.queues:
+                pipe.llen(queue)
+            for queue, length in zip(self.queues, pipe.execute()):
+                gauge.add_metric([queue], length)
+        except Exception as e:
+            logger.warning(f"Celery queue length unavailable: {str(e)}")
+            self._client = None
+        yield gauge
+
+
+class ActiveUsersCollector(ScrapeCollector):
+    """
+    Users with an analytics event in the last `window`. The count is cached
+    for `ttl` seconds so frequent scrapes do not each run the query.
+    """
+
+    def __init__(self, session_factory, window: timedelta = timedelta(minutes=15), ttl: float = 60.0):
+        self.session_factory = session_factory
+        self.window = window
+        self.ttl = ttl
+        self._value: Optional[int] = None
+        self._read_at = 0.0
+
+    def _count(self) -> int:
+        from sqlalchemy import distinct, func
+        from ..models.analytics import Analytics
+
+        with self.session_factory() as db:
+            return db.query(func.count(distinct(Analytics.user_id))).filter(
+                Analytics.created_at >= datetime.utcnow() - self.window
+            ).scalar() or 0
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        now = time.monotonic()
+        if self._value is None or now - self._read_at >= self.ttl:
+            try:
+                self._value = self._count()
+                self._read_at = now
+            except Exception as e:
+                logger.warning(f"Active user count unavailable: {str(e)}")
+        gauge = GaugeMetricFamily(
+            "cvperfect_active_users",
+            f"Users active in the last {int(self.window.total_seconds() // 60)} minutes",
+        )
+        if self._value is not None:
+            gauge.add_metric([], self._value)
+        yield gauge
+
+
+_scrape_collectors = []
+
+
+def register_scrape_collectors(*collectors):
+    """Collectors evaluated on every scrape, alongside the recorded metrics"""
+    _scrape_collectors.extend(collectors)
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        for collector in collectors:
+            REGISTRY.register(collector)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """(body, content type) for the /metrics response"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _scrape_collectors:
+            registry.register(collector)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,153 @@
+"""
+Request Tracing
+Request-scoped span timings. The timing middleware opens a RequestTimings
+for each request in a context variable; span() blocks anywhere below it
+(including asyncio tasks and threads started from the request) add their
+duration under a span name. DB time comes from SQLAlchemy cursor events,
+so every query is counted without wrapping each session.
+
+Totals are reported in a Server-Timing header and, above the configured
+threshold, a structured slow-request log line. When OTEL_EXPORTER_OTLP_ENDPOINT
+is set and the OpenTelemetry SDK is installed, spans are exported as well.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+# Set by setup_opentelemetry(); None keeps span() to plain timing
+_tracer = None
+
+
+class RequestTimings:
+    """Accumulated duration and count per span name for one request"""
+
+    __slots__ = ("started", "spans", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+        # Spans may finish on executor threads
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            entry = self.spans.get(name)
+            if entry is None:
+                self.spans[name] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{span: {"ms": total, "count": n}}"""
+        with self._lock:
+            return {
+                name: {"ms": round(seconds * 1000, 2), "count": count}
+                for name, (seconds, count) in self.spans.items()
+            }
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Server-Timing header value; concurrent spans can sum past the total"""
+        with self._lock:
+            parts = [
+                f'{name};dur={seconds * 1000:.1f};desc="{count}x"'
+                for name, (seconds, count) in self.spans.items()
+            ]
+        parts.append(f"total;dur={(self.elapsed() if total is None else total) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start_request() -> Tuple[RequestTimings, Token]:
+    """Begin timing a request; returns (timings, token for end_request)"""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: Token):
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block under `name` for the current request (no-op outside one)"""
+    timings = _current.get()
+    otel = _tracer.start_as_current_span(name) if _tracer is not None else nullcontext()
+    start = time.perf_counter()
+    try:
+        with otel:
+            yield
+    finally:
+        if timings is not None:
+            timings.add(name, time.perf_counter() - start)
+
+
+def request_span(name: str):
+    """Root OpenTelemetry span for a request, when export is enabled"""
+    if _tracer is None:
+        return nullcontext()
+    from opentelemetry.trace import SpanKind
+
+    return _tracer.start_as_current_span(name, kind=SpanKind.SERVER)
+
+
+def instrument_engine(engine, name: str = "db"):
+    """Add every query's cursor execution time to the current request's `name` span"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # A failed statement gets no after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+def setup_opentelemetry(service_name: str, endpoint: str) -> bool:
+    """
+    Export spans over OTLP/HTTP to `endpoint` (e.g. a local collector on
+    http://localhost:4318/v1/traces). Optional: without the SDK installed
+    this logs a warning and timing continues without export.
+    """
+    global _tracer
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OpenTelemetry export requested but opentelemetry-sdk is not installed")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(__name__)
+    logger.info(f"Exporting traces to {endpoint}")
+    return True
@@ -1,12 +1,15 @@
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import os
 import importlib.util
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not SQLALCHEMY_DATABASE_URL:
@@ -58,5 +61,5 @@ def init_db():
                 """))
                 conn.commit()
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        logger.exception("Error initializing database")
         raise e 
\ No newline at end of file
@@ -1,16 +1,39 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from fastapi.exception_handlers import RequestValidationError
 from fastapi.exceptions import RequestValidationError
 from .routers import auth, resume, stripe, onboarding, dashboard, billing
 from .database import engine, Base
+import logging
 import os
 from .services.real_data_service import DataSourceValidator
 from datetime import datetime
 from sqlalchemy import text
 from .database import SessionLocal
 from .core.config import settings
+from .core.logging_config import setup_logging, shutdown_logging
+from .core.metrics import (
+    ActiveUsersCollector,
+    CeleryQueueCollector,
+    DatabasePoolCollector,
+    register_scrape_collectors,
+    render_metrics,
+)
+from .core.tracing import instrument_engine, setup_opentelemetry
+from .services.bulk_ingestion import shutdown_extraction_pool
+from .middleware.metrics import PrometheusMiddleware
+from .middleware.request_context import RequestContextMiddleware
+from .middleware.timing import TimingMiddleware
+
+setup_logging(
+    level=settings.LOG_LEVEL,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+    fmt=settings.LOG_FORMAT,
+    queue_size=settings.LOG_QUEUE_SIZE,
+)
+logger = logging.getLogger(__name__)
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -29,21 +52,32 @@ app.add_middleware(
 # Add global validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print(f"Validation error for {request.url}: {exc.errors()}")
-    return JSONResponse(
-        status_code=422,
-        content={"detail": exc.errors(), "body": (await request.body()).decode(errors='replace')},
+    # Each error already carries its offending input; the raw body is not re-read or echoed.
+    # Inputs stay out of the log (they can include passwords)
+    logger.debug(
+        f"Validation error for {request.method} {request.url.path}",
+        extra={"errors": [{"loc": e["loc"], "type": e["type"], "msg": e["msg"]} for e in exc.errors()]},
     )
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
 
 # Validate production configuration on startup
 @app.on_event("startup")
 async def startup_event():
-    print("Starting CVPerfect backend...")
-    print(f"Environment: {settings.ENVIRONMENT}")
-    print(f"Real Data Enabled: {settings.USE_REAL_DATA}")
-    print(f"AI Service: {'ENABLED' if settings.GEMINI_API_KEY else 'DISABLED'}")
-    print(f"Database: {settings.DATABASE_URL.split('@')[-1] if '@' in settings.DATABASE_URL else 'local'}")
-    print(f"Gemini API key: {settings.GEMINI_API_KEY}" if settings.GEMINI_API_KEY else "No Gemini API key configured")
+    logger.info(
+        "Starting CVPerfect backend",
+        extra={
+            "environment": settings.ENVIRONMENT,
+            "real_data": settings.USE_REAL_DATA,
+            "ai_service": "enabled" if settings.GEMINI_API_KEY else "disabled",
+            "database": settings.DATABASE_URL.split("@")[-1] if "@" in settings.DATABASE_URL else "local",
+        },
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_extraction_pool()
+    # Write out whatever is still queued
+    shutdown_logging()
 
 # Add middleware to track real data usage
 @app.middleware("http")
@@ -68,6 +102,28 @@ async def real_data_middleware(request: Request, call_next):
     
     return response
 
+# Request counts and latency for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+    register_scrape_collectors(
+        DatabasePoolCollector(engine),
+        CeleryQueueCollector(settings.REDIS_URL, settings.METRICS_CELERY_QUEUES),
+        ActiveUsersCollector(SessionLocal),
+    )
+
+# Per-request span timings; outermost, so the total covers all other middleware
+instrument_engine(engine)
+if settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+    setup_opentelemetry(settings.OTEL_SERVICE_NAME, settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+app.add_middleware(
+    TimingMiddleware,
+    slow_threshold_ms=settings.SLOW_REQUEST_THRESHOLD_MS,
+    server_timing=settings.SERVER_TIMING_ENABLED or settings.ENVIRONMENT == "development",
+)
+
+# Request id and debug sampling for every log line, including the slow-request log
+app.add_middleware(RequestContextMiddleware, debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE)
+
 # Add health check endpoint
 @app.get("/health")
 async def health_check():
@@ -109,6 +165,14 @@ async def health_check():
     
     return JSONResponse(content=health_data, status_code=status_code)
 
+# Prometheus scrape endpoint (not proxied by nginx)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(resume.router, prefix="/api/resume", tags=["resume"])
@@ -0,0 +1,50 @@
+"""
+Request metrics middleware
+Plain ASGI middleware (no per-request Request/Response objects) that counts
+requests and records latency, labelled by the matched route template
+"""
+
+import time
+
+from ..core.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    def __init__(self, app):
+        self.app = app
+        # Labelled children by (method, handler, status), so the hot path
+        # skips label validation after the first request of each kind
+        self._children = {}
+
+    def _record(self, method: str, handler: str, status: str, elapsed: float):
+        key = (method, handler, status)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                HTTP_REQUEST_DURATION.labels(method, handler),
+                HTTP_REQUESTS.labels(method, handler, status),
+            )
+        children[0].observe(elapsed)
+        children[1].inc()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            handler = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self._record(scope["method"], handler, str(status), time.perf_counter() - start)
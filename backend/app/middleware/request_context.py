@@ -0,0 +1,44 @@
+"""
+Request context middleware
+Gives each request an id (the caller's X-Request-ID, or a new one) that is
+attached to every log record it produces and echoed in the response, and
+decides once per request whether its DEBUG trace is kept
+"""
+
+from ..core.logging_config import begin_request, current_request_id, end_request
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestContextMiddleware:
+    def __init__(self, app, debug_sample_rate: float = 0.0):
+        self.app = app
+        self.debug_sample_rate = debug_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER:
+                # Bounded so a client cannot bloat every log line
+                request_id = value.decode("latin-1")[:64] or None
+                break
+
+        tokens = begin_request(request_id, self.debug_sample_rate)
+        request_id = current_request_id()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request(tokens)
+
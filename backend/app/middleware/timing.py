@@ -0,0 +1,61 @@
+"""
+Request timing middleware
+Opens the request's span timings, adds a Server-Timing header with the
+per-span breakdown, and logs one structured line for slow requests
+"""
+
+import json
+import logging
+
+from ..core.tracing import end_request, request_span, start_request
+
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+
+class TimingMiddleware:
+    def __init__(self, app, slow_threshold_ms: float = 1000, server_timing: bool = False):
+        self.app = app
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with request_span(scope["method"]) as root:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    # Named by route template once routing has matched, not the raw path
+                    route = scope.get("route")
+                    if root is not None and route is not None:
+                        root.update_name(f"{scope['method']} {route.path}")
+        finally:
+            elapsed = timings.elapsed()
+            if elapsed >= self.slow_threshold:
+                route = scope.get("route")
+                slow_request_logger.warning(json.dumps({
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "spans": timings.summary(),
+                }))
+            end_request(token)
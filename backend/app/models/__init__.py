@@ -3,11 +3,16 @@ from .resume import (
     Resume,
     ResumeVersion,
     ResumeAnalysis,
+    ResumeFeatures,
+    ResumeSectionAnalysis,
+    LearningPathCache,
     CoverLetterHistory,
     GeneratedResume,
     GeneratedResumeTemplate,
 )
 from .analytics import Analytics, ActionType
+from .notification import BulkEmailJob, BulkEmailChunk, WeeklyDigestStat
+from .billing import StripeEvent
 
 __all__ = [
     'User',
@@ -15,9 +20,16 @@ __all__ = [
     'Resume',
     'ResumeVersion',
     'ResumeAnalysis',
+    'ResumeFeatures',
+    'ResumeSectionAnalysis',
+    'LearningPathCache',
     'CoverLetterHistory',
     'GeneratedResume',
     'GeneratedResumeTemplate',
     'Analytics',
-    'ActionType'
+    'ActionType',
+    'BulkEmailJob',
+    'BulkEmailChunk',
+    'WeeklyDigestStat',
+    'StripeEvent'
 ] 
\ No newline at end of file
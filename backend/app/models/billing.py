@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+
+from ..database import Base
+
+
+class StripeEvent(Base):
+    """
+    A received Stripe webhook event. The Stripe event id is the key, so a
+    redelivered event is stored (and processed) once. Events are applied
+    per customer in Stripe's created order by services/stripe_events.py.
+    """
+    __tablename__ = "stripe_events"
+    __table_args__ = (
+        Index("ix_stripe_events_customer_status", "customer_id", "status", "stripe_created_at"),
+    )
+
+    id = Column(String, primary_key=True)  # evt_...
+    type = Column(String, nullable=False)
+    customer_id = Column(String, nullable=True)
+    stripe_created_at = Column(DateTime, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, processed, failed, ignored, orphaned
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    received_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
@@ -0,0 +1,70 @@
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Text, ForeignKey, JSON, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from ..database import Base
+
+
+class BulkEmailJob(Base):
+    """One bulk notification send, fanned out as BulkEmailChunk subtasks"""
+    __tablename__ = "bulk_email_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    subject = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    email_type = Column(String, nullable=False, default="notification")
+    total_users = Column(Integer, nullable=False, default=0)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False, default="pending")  # pending, completed, completed_with_errors
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    chunks = relationship("BulkEmailChunk", back_populates="job", cascade="all, delete-orphan")
+
+
+class BulkEmailChunk(Base):
+    """
+    A slice of a bulk send's recipients. next_offset is committed as the
+    chunk progresses, so a retried chunk resumes instead of starting over.
+    """
+    __tablename__ = "bulk_email_chunks"
+    __table_args__ = (UniqueConstraint("job_id", "chunk_index", name="uq_bulk_email_chunk"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("bulk_email_jobs.id"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    user_ids = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    next_offset = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    job = relationship("BulkEmailJob", back_populates="chunks")
+
+
+class WeeklyDigestStat(Base):
+    """
+    Staging row for one user's weekly digest, filled for every active user
+    by a single INSERT ... SELECT and marked as the digest batches send
+    """
+    __tablename__ = "weekly_digest_stats"
+    __table_args__ = (Index("ix_weekly_digest_stats_status", "week_start", "status"),)
+
+    week_start = Column(Date, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    resumes_analyzed = Column(Integer, nullable=False, default=0)
+    analyses_count = Column(Integer, nullable=False, default=0)
+    best_score = Column(Float, nullable=True)
+    previous_best_score = Column(Float, nullable=True)
+    improvement_score = Column(Float, nullable=False, default=0)
+    actions_count = Column(Integer, nullable=False, default=0)
+    cover_letters_generated = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False, default="pending")  # pending, sent, failed
+    sent_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Integer, Float, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Integer, Float, JSON, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, synonym
 from sqlalchemy.sql import func
@@ -25,16 +25,83 @@ class Resume(Base):
     analyses = relationship("ResumeAnalysis", back_populates="resume")
     cover_letters = relationship("CoverLetterHistory", back_populates="resume", cascade="all, delete-orphan")
     analytics = relationship("Analytics", back_populates="resume")
+    features = relationship("ResumeFeatures", back_populates="resume", cascade="all, delete-orphan")
+    section_analyses = relationship("ResumeSectionAnalysis", back_populates="resume", cascade="all, delete-orphan")
     user = relationship("User", back_populates="resumes")
 
 
+class ResumeFeatures(Base):
+    """Text features computed once per resume version by utils.text_features"""
+    __tablename__ = "resume_features"
+    __table_args__ = (UniqueConstraint("resume_id", "content_hash", name="uq_resume_features_version"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=False, index=True)
+    content_hash = Column(String(64), nullable=False)
+    pipeline_version = Column(Integer, nullable=False, default=1)
+    sections = Column(JSON, nullable=True)
+    keywords = Column(JSON, nullable=True)
+    contact_info = Column(JSON, nullable=True)
+    word_stats = Column(JSON, nullable=True)
+    readability_score = Column(Float, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    resume = relationship("Resume", back_populates="features")
+
+
+class ResumeSectionAnalysis(Base):
+    """Memoized AI feedback for one section's text against one job description"""
+    __tablename__ = "resume_section_analyses"
+    __table_args__ = (
+        UniqueConstraint("resume_id", "section", "section_hash", "job_hash", name="uq_resume_section_analysis"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=False, index=True)
+    section = Column(String, nullable=False)
+    section_hash = Column(String(64), nullable=False)
+    job_hash = Column(String(64), nullable=False)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    resume = relationship("Resume", back_populates="section_analyses")
+
+
+class LearningPathCache(Base):
+    """
+    Generated learning path shared by every request with the same skill-gap
+    signature (target-role bucket plus sorted missing skills)
+    """
+    __tablename__ = "learning_path_cache"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    signature = Column(String(64), nullable=False, unique=True, index=True)
+    role_bucket = Column(String, nullable=False)
+    missing_skills = Column(JSON, nullable=False)
+    learning_path = Column(JSON, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    generation_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class ResumeVersion(Base):
+    """
+    One version of a resume. Snapshots store the full text in content;
+    other versions store a line delta against the previous version.
+    Use services.resume_versions to write and read versions.
+    """
     __tablename__ = "resume_versions"
+    __table_args__ = (UniqueConstraint("resume_id", "version_number", name="uq_resume_version_number"),)
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=False)
+    resume_id = Column(UUID(as_uuid=True), ForeignKey("resumes.id"), nullable=False, index=True)
     version_number = Column(Integer, nullable=False)
-    content = Column(Text, nullable=False)
+    content = Column(Text, nullable=True)
+    is_snapshot = Column(Boolean, nullable=False, default=True)
+    delta = Column(JSON, nullable=True)
+    content_length = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_current = Column(Boolean, default=False)
 
@@ -42,7 +42,7 @@ class User(Base):
     linkedin_url = Column(String, nullable=True)
     github_url = Column(String, nullable=True)
     
-    # Upload tracking
+    # Upload tracking; no longer written, uploads are counted in rolling windows (services/quota.py)
     uploads_count = Column(Integer, default=0)
     last_upload_reset = Column(DateTime, default=datetime.utcnow)
 
@@ -5,6 +5,8 @@ from ..models import User
 from ..models.user import SubscriptionType
 from ..schemas import UserCreate, UserResponse, UserLogin
 from ..schemas.auth import DeveloperCodeCreate
+from ..core.entitlements import Feature
+from ..services.quota import remaining_quota, uploads_in_window
 import os
 import bcrypt
 from dotenv import load_dotenv
@@ -120,14 +122,18 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/subscription-status", response_model=dict)
-async def get_subscription_status(current_user: User = Depends(get_current_user)):
+async def get_subscription_status(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     features = current_user.get_subscription_features()
     return {
         "subscription_type": current_user.subscription_type.value,
         "subscription_status": "active",
         "can_upload": current_user.can_upload(),
-        "uploads_used": current_user.uploads_count,
+        "uploads_used": uploads_in_window(db, current_user),
         "upload_limit": current_user.get_upload_limit(),
+        "remaining_enhancements": remaining_quota(current_user, Feature.RESUME_ENHANCE),
         "features": features,
         "subscription_end_date": current_user.subscription_end_date.isoformat()
         if current_user.subscription_end_date
@@ -164,8 +170,6 @@ async def validate_developer_code(
 
         test_user.subscription_type = SubscriptionType.FREE
         test_user.subscription_end_date = datetime.utcnow() + timedelta(days=365)
-        test_user.uploads_count = 0
-        test_user.last_upload_reset = datetime.utcnow()
         db.commit()
 
         return {
@@ -173,7 +177,7 @@ async def validate_developer_code(
             "message": "Developer code activated!",
             "subscription_type": test_user.subscription_type.value,
             "upload_limit": test_user.get_upload_limit(),
-            "uploads_used": test_user.uploads_count,
+            "uploads_used": uploads_in_window(db, test_user),
         }
     except HTTPException:
         raise
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
+import json
 import stripe
 from datetime import datetime, timedelta
 
@@ -12,6 +13,14 @@ from ..schemas.billing import (
     PaymentIntentResponse,
     WebhookEvent
 )
+from ..core.entitlements import Feature
+from ..services.quota import remaining_quota, uploads_in_window
+from ..services.stripe_events import (
+    EVENT_HANDLERS,
+    enqueue_customer_events,
+    event_customer_id,
+    record_stripe_event,
+)
 from .auth import get_current_user
 import os
 from dotenv import load_dotenv
@@ -76,8 +85,9 @@ async def get_subscription_info(
         "subscription_type": current_user.subscription_type.value,
         "subscription_status": "active",
         "can_upload": current_user.can_upload(),
-        "uploads_used": current_user.uploads_count,
+        "uploads_used": uploads_in_window(db, current_user),
         "upload_limit": current_user.get_upload_limit(),
+        "remaining_enhancements": remaining_quota(current_user, Feature.RESUME_ENHANCE),
         "features": features,
         "subscription_end_date": current_user.subscription_end_date.isoformat() if current_user.subscription_end_date else None,
         "stripe_customer_id": current_user.stripe_customer_id
@@ -126,11 +136,16 @@ async def create_subscription(
 
 @router.post("/webhook")
 async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+    """
+    Store the verified event and acknowledge at once; it is applied by a
+    worker (services/stripe_events.py). Redeliveries of a stored event are
+    acknowledged without being stored or processed again.
+    """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
 
     try:
-        event = stripe.Webhook.construct_event(
+        stripe.Webhook.construct_event(
             payload, sig_header, STRIPE_WEBHOOK_SECRET
         )
     except ValueError as e:
@@ -138,74 +153,15 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     except stripe.error.SignatureVerificationError as e:
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    # Handle the event
-    if event.type == "customer.subscription.created":
-        subscription = event.data.object
-        await handle_subscription_created(subscription, db)
-        
-    elif event.type == "customer.subscription.updated":
-        subscription = event.data.object
-        await handle_subscription_updated(subscription, db)
-        
-    elif event.type == "customer.subscription.deleted":
-        subscription = event.data.object
-        await handle_subscription_deleted(subscription, db)
-        
-    elif event.type == "invoice.payment_succeeded":
-        invoice = event.data.object
-        await handle_payment_succeeded(invoice, db)
-
-    return {"status": "success"}
+    event = json.loads(payload)
+    if not record_stripe_event(db, event):
+        return {"status": "duplicate"}
 
-async def handle_subscription_created(subscription, db: Session):
-    """Handle subscription creation"""
-    customer_id = subscription.customer
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
-    
-    if user:
-        # Get plan type from metadata
-        plan_type = subscription.metadata.get("plan_type")
-        if plan_type in [t.value for t in SubscriptionType]:
-            user.subscription_type = SubscriptionType(plan_type)
-            user.subscription_end_date = datetime.utcnow() + timedelta(days=30)  # Default to monthly
-            db.commit()
+    customer_id = event_customer_id(event)
+    if customer_id and event["type"] in EVENT_HANDLERS:
+        enqueue_customer_events(customer_id)
 
-async def handle_subscription_updated(subscription, db: Session):
-    """Handle subscription updates"""
-    customer_id = subscription.customer
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
-    
-    if user:
-        if subscription.status == "active":
-            # Update to new plan type if available
-            plan_type = subscription.metadata.get("plan_type")
-            if plan_type in [t.value for t in SubscriptionType]:
-                user.subscription_type = SubscriptionType(plan_type)
-        elif subscription.status == "canceled":
-            user.subscription_type = SubscriptionType.FREE
-            user.subscription_end_date = None
-        
-        db.commit()
-
-async def handle_subscription_deleted(subscription, db: Session):
-    """Handle subscription cancellation"""
-    customer_id = subscription.customer
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
-    
-    if user:
-        user.subscription_type = SubscriptionType.FREE
-        user.subscription_end_date = None
-        db.commit()
-
-async def handle_payment_succeeded(invoice, db: Session):
-    """Handle successful payment"""
-    customer_id = invoice.customer
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
-    
-    if user and invoice.subscription:
-        # Extend subscription end date
-        user.subscription_end_date = datetime.utcnow() + timedelta(days=30)  # Extend by 30 days
-        db.commit()
+    return {"status": "success"}
 
 @router.get("/plans", response_model=List[SubscriptionResponse])
 async def get_subscription_plans():
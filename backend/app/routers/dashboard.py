@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
@@ -9,6 +11,8 @@ from ..models.user import User
 from ..models.resume import Resume, ResumeAnalysis
 from .auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/")
@@ -72,5 +76,5 @@ async def get_dashboard_data(
         }
 
     except Exception as e:
-        print(f"❌ Dashboard data error: {str(e)}")
+        logger.exception("Dashboard data error")
         raise HTTPException(status_code=500, detail="Failed to retrieve dashboard data") 
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Entitlement Dependencies
+Per-request feature checks shared by the routers. Kept inside the routers
+package (importing only .auth) so routers can use them without importing
+app.middleware.subscription, which imports the routers package.
+"""
+
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from ..core.entitlements import Entitlements, Feature
+from ..models.user import User
+from ..services.quota import consume_quota
+from .auth import get_current_user
+
+
+async def get_entitlements(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> Entitlements:
+    """
+    The current user's feature mask. FastAPI resolves this once per request
+    (reusing the principal from get_current_user); it is also kept on
+    request.state for code outside the dependency graph.
+    """
+    entitlements = getattr(request.state, "entitlements", None)
+    if entitlements is None or entitlements.user_id != current_user.id:
+        entitlements = Entitlements.for_user(current_user)
+        request.state.entitlements = entitlements
+    return entitlements
+
+
+@lru_cache(maxsize=None)
+def require_feature(feature: Feature):
+    """
+    Dependency allowing only plans that include `feature`. One dependency
+    per feature, so using it on several routes (or twice in one request)
+    shares FastAPI's per-request cache.
+    """
+    async def _require_feature(entitlements: Entitlements = Depends(get_entitlements)) -> Entitlements:
+        if not entitlements.allows(feature):
+            raise HTTPException(
+                status_code=403,
+                detail="This feature requires a Pro subscription."
+            )
+        return entitlements
+    return _require_feature
+
+
+def use_metered_feature(feature: Feature, current_user: User, entitlements: Entitlements, db: Session) -> bool:
+    """
+    Draw one use from the user's quota if their plan meters `feature`.
+    Returns whether a use was taken (to refund on failure); raises 403
+    when the quota is exhausted.
+    """
+    if not entitlements.is_metered(feature):
+        return False
+    if not consume_quota(db, current_user, feature):
+        raise HTTPException(
+            status_code=403,
+            detail="No remaining enhancements. Please purchase more or upgrade to Pro."
+        )
+    return True
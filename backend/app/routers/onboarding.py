@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Dict
@@ -8,6 +10,8 @@ from ..models.user import User
 from ..schemas.onboarding import OnboardingData, OnboardingResponse
 from .auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/onboarding", tags=["onboarding"])
 
 def validate_url(url: str) -> bool:
@@ -52,7 +56,7 @@ async def save_onboarding_data(
         db.commit()
         db.refresh(current_user)
 
-        print(f"✅ Onboarding completed for user {current_user.email}")
+        logger.info(f"Onboarding completed for user {current_user.id}")
 
         return OnboardingResponse(
             success=True,
@@ -63,7 +67,7 @@ async def save_onboarding_data(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Onboarding error: {str(e)}")
+        logger.exception("Onboarding error")
         raise HTTPException(status_code=500, detail=f"Failed to save onboarding data: {str(e)}")
 
 @router.get("/status")
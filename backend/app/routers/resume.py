@@ -1,27 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import json
 import os
 from pathlib import Path
 import shutil
 import uuid
 import base64
-from fastapi.responses import Response
-from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-import io
+import asyncio
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime, timedelta
 import json
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Float, desc
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Float, desc, insert
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from ..database import get_db
-from ..models.user import User, SubscriptionType
+from ..database import get_db, SessionLocal
+from ..models.user import User
 from ..models.resume import (
     Resume,
     ResumeVersion,
@@ -36,6 +31,7 @@ from ..schemas.resume import (
     ResumeCreate,
     ResumeResponse,
     ResumeEnhanceRequest,
+    BatchAnalysisRequest,
     ResumeScoreResponse,
     CoverLetterRequest,
     CoverLetterResponse,
@@ -52,8 +48,32 @@ from ..services.gemini_service import (
     GeminiService
 )
 from .auth import get_current_user
-from ..middleware.subscription import check_subscription_access, decrement_enhancements
+from ..core.entitlements import Entitlements, Feature
+from .dependencies import get_entitlements, use_metered_feature
+from ..services.quota import record_upload, refund_quota, release_upload
 from ..services.real_data_service import get_data_service, DataSourceValidator
+from ..services.resume_features import get_resume_features, features_summary
+from ..services.section_analysis import analyze_resume_incremental
+from ..services.learning_path_cache import get_learning_path, learning_path_cache_report, CACHE_STATUS_KEY
+from ..services.resume_versions import (
+    VersionNotFoundError,
+    add_resume_version,
+    diff_versions,
+    get_version_content,
+    list_versions,
+)
+from ..services.report_service import (
+    ReportCache,
+    build_report_data,
+    generate_pdf_report,
+    iter_json,
+    iter_text_report,
+)
+from ..services.history_export import iter_history_ndjson, iter_history_zip
+from ..services.bulk_ingestion import ingest_resume_files, BulkUploadError, UploadLimitError
+from ..core.config import settings
+from ..core.metrics import RESUMES_PROCESSED
+from ..utils.prompt_builder import compact_input, compact_json
 from ..utils.file_processing import save_uploaded_file, extract_text_from_file, cleanup_temp_file, get_file_info, validate_file_type, validate_file_size
 from logging import getLogger
 
@@ -61,6 +81,18 @@ logger = getLogger(__name__)
 
 router = APIRouter()
 
+report_cache = ReportCache(
+    settings.REPORT_CACHE_DIR,
+    max_bytes=settings.REPORT_CACHE_MAX_MB * 1024 * 1024,
+    max_age=timedelta(days=settings.REPORT_CACHE_MAX_AGE_DAYS),
+)
+
+REPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+}
+
 
 def _default_generated_resume_templates() -> List[Dict[str, Any]]:
     return [
@@ -166,13 +198,6 @@ def _build_generated_resume_response(item: GeneratedResume) -> Dict[str, Any]:
     }
 
 
-def _is_paid_subscription(subscription: SubscriptionType) -> bool:
-    return subscription in {
-        SubscriptionType.PROFESSIONAL,
-        SubscriptionType.ENTERPRISE,
-    }
-
-
 def _build_rule_based_summary(payload: GeneratedResumeSummaryRequest) -> str:
     role = payload.current_role or "professional"
     years = payload.years_experience or "several"
@@ -189,40 +214,6 @@ def _build_rule_based_summary(payload: GeneratedResumeSummaryRequest) -> str:
     )
 
 
-def _extract_json_object(raw_text: str) -> Dict[str, Any]:
-    text = (raw_text or "").strip()
-    if not text:
-        return {}
-
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-
-    fence_start = text.find("```")
-    if fence_start != -1:
-        fence_end = text.rfind("```")
-        if fence_end > fence_start:
-            fenced = text[fence_start + 3:fence_end].strip()
-            if fenced.startswith("json"):
-                fenced = fenced[4:].strip()
-            try:
-                return json.loads(fenced)
-            except Exception:
-                pass
-
-    first = text.find("{")
-    last = text.rfind("}")
-    if first != -1 and last != -1 and last > first:
-        possible = text[first:last + 1]
-        try:
-            return json.loads(possible)
-        except Exception:
-            return {}
-
-    return {}
-
-
 @router.get("/generated/templates")
 async def list_generated_resume_templates(
     current_user: User = Depends(get_current_user),
@@ -367,6 +358,7 @@ async def generate_generated_resume_summary(
     generated_resume_id: str,
     request: GeneratedResumeSummaryRequest,
     current_user: User = Depends(get_current_user),
+    entitlements: Entitlements = Depends(get_entitlements),
     db: Session = Depends(get_db),
 ):
     item = db.query(GeneratedResume).filter(
@@ -376,7 +368,7 @@ async def generate_generated_resume_summary(
     if not item:
         raise HTTPException(status_code=404, detail="Generated resume not found")
 
-    if _is_paid_subscription(current_user.subscription_type):
+    if entitlements.allows(Feature.AI_RESUME_GENERATION):
         prompt = (
             "Write a concise professional resume summary (2-4 sentences).\n"
             f"Current role: {request.current_role or ''}\n"
@@ -391,8 +383,7 @@ async def generate_generated_resume_summary(
             from ..services.gemini_service import GeminiService
 
             gemini_svc = GeminiService()
-            response = gemini_svc.client.models.generate_content(model=gemini_svc.model, contents=prompt)
-            summary = (response.text or "").strip()
+            summary = await gemini_svc.generate_resume_summary(prompt)
             if not summary:
                 summary = _build_rule_based_summary(request)
             generation_mode = "ai"
@@ -422,6 +413,7 @@ async def ai_generate_generated_resume(
     generated_resume_id: str,
     request: GeneratedResumeAIGenerateRequest,
     current_user: User = Depends(get_current_user),
+    entitlements: Entitlements = Depends(get_entitlements),
     db: Session = Depends(get_db),
 ):
     item = db.query(GeneratedResume).filter(
@@ -431,7 +423,7 @@ async def ai_generate_generated_resume(
     if not item:
         raise HTTPException(status_code=404, detail="Generated resume not found")
 
-    if not _is_paid_subscription(current_user.subscription_type):
+    if not entitlements.allows(Feature.AI_RESUME_GENERATION):
         raise HTTPException(status_code=403, detail="AI resume generation is available on Pro and Enterprise plans")
 
     seed = _normalize_resume_data(item.resume_data or {})
@@ -439,34 +431,22 @@ async def ai_generate_generated_resume(
     target_role = request.target_role or seed.get("summary_inputs", {}).get("target_role", "")
     target_company_type = request.target_company_type or seed.get("summary_inputs", {}).get("target_company_type", "")
 
-    prompt = (
-        "You are a resume writing assistant. Return valid JSON only. No markdown.\n"
-        "Use this exact schema with all keys present:\n"
-        "{\n"
-        "  \"personal_info\": {\"full_name\":\"\",\"target_title\":\"\",\"email\":\"\",\"phone\":\"\",\"location\":\"\",\"linkedin_url\":\"\",\"website\":\"\"},\n"
-        "  \"summary_inputs\": {\"current_role\":\"\",\"years_experience\":\"\",\"specialization\":\"\",\"highlights\":[],\"target_role\":\"\",\"target_company_type\":\"\"},\n"
-        "  \"summary\":\"\",\n"
-        "  \"experience\":[{\"job_title\":\"\",\"company\":\"\",\"dates\":\"\",\"responsibilities\":\"\",\"achievements\":\"\",\"led_team\":\"\"}],\n"
-        "  \"education\":[{\"degree\":\"\",\"institution\":\"\",\"graduation_year\":\"\",\"details\":\"\"}],\n"
-        "  \"skills\":[],\n"
-        "  \"certifications\":[{\"name\":\"\",\"year\":\"\"}],\n"
-        "  \"languages\":[{\"name\":\"\",\"level\":\"Fluent\"}]\n"
-        "}\n"
-        "Improve bullet specificity and include measurable impact where possible.\n"
-        f"Target role: {target_role}\n"
-        f"Target company type: {target_company_type}\n"
-        f"Job description: {request.job_description or ''}\n"
-        f"Current JSON seed: {json.dumps(seed)}\n"
-        f"Imported resume text and notes: {import_text}\n"
-    )
+    prompt_parts = [
+        f"Target role: {target_role}" if target_role else "",
+        f"Target company type: {target_company_type}" if target_company_type else "",
+        f"Job description: {compact_input(request.job_description, settings.PROMPT_MAX_JOB_TOKENS)}"
+        if request.job_description else "",
+        f"Current JSON seed: {compact_json(seed)}",
+        f"Imported resume text and notes: {compact_input(import_text, settings.PROMPT_MAX_IMPORT_TOKENS)}"
+        if import_text.strip() else "",
+    ]
+    prompt = "\n".join(part for part in prompt_parts if part)
 
     try:
         from ..services.gemini_service import GeminiService
 
         gemini_svc = GeminiService()
-        response = gemini_svc.client.models.generate_content(model=gemini_svc.model, contents=prompt)
-        payload = _extract_json_object(response.text or "")
-        generated_data = _normalize_resume_data(payload)
+        generated_data = _normalize_resume_data(await gemini_svc.generate_resume_data(prompt))
     except Exception as e:
         logger.error(f"AI generated resume failed: {str(e)}")
         raise HTTPException(status_code=500, detail="AI resume generation failed")
@@ -491,6 +471,10 @@ async def upload_resume(
     """
     Upload and process real resume file with actual text extraction
     """
+    window_bucket = record_upload(db, current_user)
+    if not window_bucket:
+        raise HTTPException(status_code=403, detail="Upload limit reached for your plan")
+
     try:
         # Get real data service
         data_service = get_data_service(db)
@@ -537,18 +521,216 @@ async def upload_resume(
             cleanup_temp_file(file_path)
             
     except Exception as e:
+        release_upload(current_user, window_bucket)
         logger.error(f"Resume upload failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/upload/bulk")
+async def upload_resumes_bulk(
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload many resumes at once, as individual files and/or zip archives.
+    Returns a manifest with the outcome of every file.
+    """
+    try:
+        data_service = get_data_service(db)
+        DataSourceValidator.log_data_source_usage(data_service, "resume_bulk_upload")
+        
+        return await ingest_resume_files(db, current_user, files)
+        
+    except UploadLimitError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except BulkUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Bulk resume upload failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Bulk upload failed")
+
+def _save_batch_analyses(rows: List[Dict[str, Any]]) -> None:
+    """Insert batch analyses in their own session (the request's is not thread-safe)"""
+    with SessionLocal() as session:
+        session.execute(insert(ResumeAnalysis), rows)
+        session.commit()
+    RESUMES_PROCESSED.labels("batch").inc(len(rows))
+
+def _save_batch_analyses_or_split(rows: List[Dict[str, Any]]) -> List[bool]:
+    """
+    One executemany insert for the rows; if it fails, rows are retried one
+    by one so a bad row does not fail its neighbours. Returns whether each
+    row was saved.
+    """
+    try:
+        _save_batch_analyses(rows)
+        return [True] * len(rows)
+    except Exception as e:
+        if len(rows) == 1:
+            logger.error(f"Saving batch analysis for {rows[0]['resume_id']} failed: {str(e)}")
+            return [False]
+        logger.warning(f"Saving {len(rows)} batch analyses failed, retrying one by one: {str(e)}")
+    return [_save_batch_analyses_or_split([row])[0] for row in rows]
+
+@router.post("/analyze/batch")
+async def analyze_resumes_batch(
+    request: BatchAnalysisRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Analyze many resumes against one job description.
+    Streams one NDJSON line per resume once its analysis is saved, then a
+    summary line. Completed analyses are buffered and inserted together
+    every BATCH_ANALYSIS_SAVE_ROWS rows or BATCH_ANALYSIS_SAVE_INTERVAL_MS,
+    whichever comes first, and their lines are sent after that commit.
+    """
+    resume_ids = list(dict.fromkeys(request.resume_ids))
+    rows = db.query(Resume.id, Resume.content).filter(
+        Resume.id.in_(resume_ids),
+        Resume.user_id == current_user.id
+    ).all()
+    contents = {row.id: row.content for row in rows}
+    
+    missing = [str(resume_id) for resume_id in resume_ids if resume_id not in contents]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Resumes not found: {', '.join(missing)}")
+    
+    data_service = get_data_service(db)
+    DataSourceValidator.log_data_source_usage(data_service, "resume_batch_analysis")
+    
+    gemini_svc = GeminiService()
+    job_description = request.job_description
+    user_id = current_user.id
+    
+    async def stream_results():
+        saved = 0
+        failed = 0
+        
+        to_analyze = []
+        for resume_id in resume_ids:
+            content = contents[resume_id]
+            if not content or len(content.strip()) < 50:
+                failed += 1
+                yield json.dumps({
+                    "resume_id": str(resume_id),
+                    "status": "failed",
+                    "error": "Resume content is too short or missing"
+                }) + "\n"
+            else:
+                to_analyze.append((resume_id, content))
+        
+        # (row, completed line) pairs waiting for the next insert
+        pending: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        
+        async def save_pending():
+            nonlocal saved, failed
+            if not pending:
+                return
+            batch = pending[:]
+            pending.clear()
+            outcomes = await asyncio.to_thread(_save_batch_analyses_or_split, [row for row, _ in batch])
+            for (row, line), ok in zip(batch, outcomes):
+                if ok:
+                    saved += 1
+                    yield json.dumps(line) + "\n"
+                else:
+                    failed += 1
+                    yield json.dumps({
+                        "resume_id": str(row["resume_id"]),
+                        "status": "failed",
+                        "error": "Saving the analysis failed"
+                    }) + "\n"
+        
+        loop = asyncio.get_running_loop()
+        save_interval = settings.BATCH_ANALYSIS_SAVE_INTERVAL_MS / 1000
+        save_deadline = None
+        results = gemini_svc.analyze_resumes_batch(
+            to_analyze, job_description, settings.BATCH_ANALYSIS_CONCURRENCY
+        ).__aiter__()
+        next_result = asyncio.ensure_future(results.__anext__())
+        
+        try:
+            while True:
+                # Waiting for the next analysis must not hold back a due insert
+                if pending:
+                    await asyncio.wait({next_result}, timeout=max(0.0, save_deadline - loop.time()))
+                    if not next_result.done():
+                        async for line in save_pending():
+                            yield line
+                        continue
+                
+                try:
+                    resume_id, result, error = await next_result
+                except StopAsyncIteration:
+                    break
+                next_result = asyncio.ensure_future(results.__anext__())
+                
+                if error:
+                    failed += 1
+                    yield json.dumps({"resume_id": str(resume_id), "status": "failed", "error": error}) + "\n"
+                    continue
+                
+                analysis_id = uuid.uuid4()
+                row = {
+                    "id": analysis_id,
+                    "resume_id": resume_id,
+                    "analysis_data": result,
+                    "overall_score": result.get('overall_score', 0),
+                    "ats_score": result.get('ats_score', 0),
+                    "strengths": result.get('strengths', []),
+                    "recommendations": result.get('recommendations', [])
+                }
+                if not pending:
+                    save_deadline = loop.time() + save_interval
+                pending.append((row, {
+                    "resume_id": str(resume_id),
+                    "analysis_id": str(analysis_id),
+                    "status": "completed",
+                    "overall_score": result.get('overall_score', 0),
+                    "ats_score": result.get('ats_score', 0),
+                    "strengths": result.get('strengths', []),
+                    "feedback": result.get('feedback', []),
+                    "recommendations": result.get('recommendations', [])
+                }))
+                # Saved before it is reported, so every streamed analysis_id exists
+                if len(pending) >= settings.BATCH_ANALYSIS_SAVE_ROWS:
+                    async for line in save_pending():
+                        yield line
+        finally:
+            # Only still pending if the client went away mid-stream
+            next_result.cancel()
+        
+        async for line in save_pending():
+            yield line
+        
+        logger.info(f"Batch analysis for user {user_id}: {saved} saved, {failed} failed")
+        yield json.dumps({
+            "status": "summary",
+            "total": len(resume_ids),
+            "completed": saved,
+            "saved": saved,
+            "failed": failed
+        }) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @router.post("/analyze/{resume_id}")
 async def analyze_resume(
     resume_id: str,
     request: Optional[dict] = None,
+    incremental: bool = Query(default=False),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Analyze resume using existing Gemini integration with real data
+    incremental=true opts in to section-by-section analysis, which only
+    re-analyzes sections whose text changed since the last analysis
+    against the same job description. Its scores are length-weighted
+    averages of section scores, so they are not comparable with full
+    analysis scores; the response lists the sections analyzed and reused.
     """
     try:
         # Verify resume belongs to user
@@ -573,19 +755,27 @@ async def analyze_resume(
         
         # Get job description if provided
         job_description = None
-        if request and hasattr(request, 'job_description'):
-            job_description = request.job_description
+        if request:
+            job_description = request.get('job_description')
+        
+        # Stored once per resume version; only computed here for legacy rows
+        features = get_resume_features(db, resume)
         
         # Use Gemini service for analysis (instantiate fresh to pick up current env key)
         from ..services.gemini_service import GeminiService
         gemini_svc = GeminiService()
         
         try:
-            # Analyze real resume content
-            analysis_result = await gemini_svc.analyze_resume_content(
-                resume.content, 
-                job_description
-            )
+            analysis_result = None
+            if incremental:
+                analysis_result = await analyze_resume_incremental(db, resume, gemini_svc, job_description)
+            
+            if analysis_result is None:
+                # No sections detected (or full re-analysis requested): analyze the whole text
+                analysis_result = await gemini_svc.analyze_resume_content(
+                    resume.content, 
+                    job_description
+                )
             
             # Save real analysis to database
             analysis = ResumeAnalysis(
@@ -600,18 +790,24 @@ async def analyze_resume(
             db.add(analysis)
             db.commit()
             db.refresh(analysis)
+            RESUMES_PROCESSED.labels("api").inc()
             
             logger.info(f"Real resume analysis completed for {resume_id}: score {analysis.overall_score}")
             
-            return {
+            response = {
                 "analysis_id": analysis.id,
                 "overall_score": analysis.overall_score,
                 "ats_score": analysis.ats_score,
                 "strengths": analysis.strengths,
                 "feedback": analysis_result.get('feedback', []),
                 "recommendations": analysis.recommendations,
+                "resume_features": features_summary(features),
                 "data_source": "real_gemini_analysis"
             }
+            if 'sections_analyzed' in analysis_result:
+                response["sections_analyzed"] = analysis_result['sections_analyzed']
+                response["sections_reused"] = analysis_result['sections_reused']
+            return response
             
         except Exception as ai_error:
             import traceback
@@ -664,6 +860,7 @@ async def enhance_resume(
     resume_id: str,
     job_description: Optional[str] = None,
     current_user: User = Depends(get_current_user),
+    entitlements: Entitlements = Depends(get_entitlements),
     db: Session = Depends(get_db)
 ):
     # Get resume
@@ -674,6 +871,9 @@ async def enhance_resume(
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
+    # One-time purchases draw from their enhancement quota
+    metered = use_metered_feature(Feature.RESUME_ENHANCE, current_user, entitlements, db)
+
     try:
         # Enhance resume
         enhanced_content = await gemini_service.enhance_resume_with_gemini(
@@ -682,17 +882,9 @@ async def enhance_resume(
             resume.feedback
         )
 
-        # Create new version
-        version_number = db.query(ResumeVersion).filter(
-            ResumeVersion.resume_id == resume.id
-        ).count() + 1
-
-        version = ResumeVersion(
-            resume_id=resume.id,
-            content=enhanced_content,
-            version_number=version_number
-        )
-        db.add(version)
+        # Create new version (stored as a delta unless a snapshot is due)
+        version = add_resume_version(db, resume, enhanced_content)
+        version_number = version.version_number
 
         # Update resume
         resume.enhanced_content = enhanced_content
@@ -717,6 +909,8 @@ async def enhance_resume(
         }
 
     except Exception as e:
+        if metered:
+            refund_quota(db, current_user, Feature.RESUME_ENHANCE)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/cover-letter/history")
@@ -829,24 +1023,18 @@ async def generate_cover_letter(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    print(f"📝 Cover letter generation started for resume {resume_id} by user {current_user.id}")
-    
     # Get resume
     resume = db.query(Resume).filter(
         Resume.id == resume_id,
         Resume.user_id == current_user.id
     ).first()
     if not resume:
-        print(f"❌ Resume {resume_id} not found for user {current_user.id}")
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    print(f"✅ Resume found: {resume.filename}")
-
     try:
-        print("🤖 Calling Gemini API to generate cover letter...")
         # Generate cover letter using the text content
         resume_text_content = resume.content
-        print(f"📄 Using resume content: {len(resume_text_content) if resume_text_content else 0} characters")
+        logger.debug(f"Generating cover letter for resume {resume_id} ({len(resume_text_content or '')} characters)")
         
         if not resume_text_content:
             raise HTTPException(status_code=400, detail="Resume content not available for cover letter generation")
@@ -862,7 +1050,7 @@ async def generate_cover_letter(
             company_name
         )
         
-        print(f"✅ Cover letter generated successfully (length: {len(cover_letter)} chars)")
+        logger.debug(f"Cover letter generated for resume {resume_id} ({len(cover_letter)} characters)")
 
         cover_letter_entry = CoverLetterHistory(
             user_id=current_user.id,
@@ -899,10 +1087,7 @@ async def generate_cover_letter(
         }
 
     except Exception as e:
-        print(f"❌ Cover letter generation failed: {str(e)}")
-        print(f"❌ Error type: {type(e).__name__}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.exception(f"Cover letter generation failed for resume {resume_id}")
         raise HTTPException(status_code=400, detail=f"Cover letter generation failed: {str(e)}")
 
 @router.post("/learning-path/{resume_id}")
@@ -927,20 +1112,25 @@ async def generate_learning_path(
         if not resume_text_content:
             raise HTTPException(status_code=400, detail="Resume content not available for learning path generation")
             
-        learning_path = await gemini_service.generate_learning_path(
+        # Shared per skill gap, personalized for this resume
+        learning_path, cache_status = await get_learning_path(
+            db,
+            gemini_service,
             resume_text_content,
             request.job_description,
+            request.job_title,
         )
 
         # Update resume
         resume.learning_path = learning_path
         db.commit()
 
-        # Track analytics
+        # Track analytics; the cache status feeds the hit-rate report
         analytics = Analytics(
             user_id=current_user.id,
             resume_id=resume.id,
-            action_type=ActionType.LEARNING_PATH_GENERATION
+            action_type=ActionType.LEARNING_PATH_GENERATION,
+            meta_data={CACHE_STATUS_KEY: cache_status}
         )
         db.add(analytics)
         db.commit()
@@ -950,6 +1140,19 @@ async def generate_learning_path(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/learning-path/cache-report")
+async def get_learning_path_cache_report(
+    days: int = Query(30, ge=1, le=365),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Hit rate of the skill-gap learning path cache and the model calls it saved"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only administrators can access cache reports")
+
+    end_date = datetime.utcnow()
+    return learning_path_cache_report(db, end_date - timedelta(days=days), end_date)
+
 @router.post("/practice-exam/{resume_id}")
 async def generate_practice_exam(
     resume_id: str,
@@ -958,43 +1161,35 @@ async def generate_practice_exam(
     db: Session = Depends(get_db)
 ):
     """Generate a custom practice exam based on resume and job requirements"""
-    print(f"🧪 Backend practice exam endpoint called for resume: {resume_id}")
-    print(f"👤 User: {current_user.email} (ID: {current_user.id})")
-    print(f"📝 Job description provided: {bool(request.job_description)}")
-    print(f"📝 Job description length: {len(request.job_description) if request.job_description else 0}")
-    
     # Get resume
     resume = db.query(Resume).filter(
         Resume.id == resume_id,
         Resume.user_id == current_user.id
     ).first()
     if not resume:
-        print(f"❌ Resume not found: {resume_id}")
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    print(f"✅ Resume found: {resume.filename}")
-    print(f"📄 Resume content length: {len(resume.content) if resume.content else 0}")
-
     try:
         # Get learning path for context (if available)
         learning_plan = resume.learning_path or {}
-        print(f"🎓 Learning plan available: {bool(learning_plan)}")
+        logger.debug(
+            f"Generating practice exam for resume {resume_id}: "
+            f"{len(resume.content or '')} resume characters, "
+            f"{len(request.job_description or '')} job description characters, "
+            f"learning plan {'available' if learning_plan else 'unavailable'}"
+        )
         
         # Generate practice exam
-        print("🤖 Calling Gemini API for practice exam generation...")
         practice_exam = await gemini_service.generate_practice_exam(
             resume.content,
             request.job_description,
             request.num_questions
         )
-        print(f"✅ Practice exam generated successfully")
-        print(f"📊 Exam info: {practice_exam.get('exam_info', {}).get('title', 'Unknown')}")
-        print(f"❓ Total questions: {len(practice_exam.get('questions', []))}")
+        logger.debug(f"Practice exam generated for resume {resume_id}: {len(practice_exam.get('questions', []))} questions")
 
         # Save practice exam to database
         resume.practice_exam = practice_exam
         db.commit()
-        print("💾 Practice exam saved to database")
 
         # Track analytics
         analytics = Analytics(
@@ -1004,15 +1199,11 @@ async def generate_practice_exam(
         )
         db.add(analytics)
         db.commit()
-        print("✅ Analytics tracked")
 
         return practice_exam
 
     except Exception as e:
-        print(f"❌ Practice exam generation failed: {str(e)}")
-        print(f"❌ Error type: {type(e).__name__}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.exception(f"Practice exam generation failed for resume {resume_id}")
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/list", response_model=List[ResumeResponse])
@@ -1047,6 +1238,29 @@ async def get_resume_history(
         logger.error(f"Failed to get resume history: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve resume history")
 
+@router.get("/export/history")
+async def export_history(
+    format: str = Query(default="ndjson", regex="^(ndjson|zip)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the user's full analysis and cover-letter history, as NDJSON or
+    a zip of PDF reports. Rows are read in batches and sent as produced.
+    """
+    stamp = datetime.utcnow().strftime('%Y%m%d')
+    if format == "zip":
+        return StreamingResponse(
+            iter_history_zip(current_user.id, report_cache),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename=cvperfect_history_{stamp}.zip"}
+        )
+    
+    return StreamingResponse(
+        iter_history_ndjson(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=cvperfect_history_{stamp}.ndjson"}
+    )
+
 @router.get("/analytics")
 async def get_user_analytics(
     current_user: User = Depends(get_current_user),
@@ -1073,11 +1287,17 @@ async def get_user_analytics(
 @router.get("/download/{resume_id}")
 async def download_resume_report(
     resume_id: str,
+    request: Request,
     format: str = Query(default="pdf", regex="^(pdf|txt|json)$"),
+    stream: bool = Query(default=False),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Download resume analysis report in specified format"""
+    """
+    Download resume analysis report in specified format
+    With stream=true, txt and json reports are sent section by section
+    as they are produced instead of being built in memory first.
+    """
     
     # Get the resume from database
     resume = db.query(Resume).filter(
@@ -1088,234 +1308,92 @@ async def download_resume_report(
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    if not resume.score:
-        raise HTTPException(status_code=400, detail="Resume analysis not available")
-    
-    # Construct analysis data from resume fields
-    analysis_data = {
-        "score": resume.score,
-        "feedback": resume.feedback or [],
-        "extracted_info": resume.extracted_info or {},
-        "job_matches": resume.job_matches or [],
-        "improvements": resume.improvements or []
-    }
+    analysis = db.query(ResumeAnalysis).filter(
+        ResumeAnalysis.resume_id == resume.id
+    ).order_by(desc(ResumeAnalysis.created_at)).first()
     
-    if format == "json":
-        # Return JSON format
-        return Response(
-            content=json.dumps(analysis_data, indent=2),
-            media_type="application/json",
-            headers={"Content-Disposition": f"attachment; filename=resume_analysis_{resume_id[:8]}.json"}
-        )
-    
-    elif format == "txt":
-        # Generate text report
-        report = generate_text_report(analysis_data, resume)
-        return Response(
-            content=report,
-            media_type="text/plain",
-            headers={"Content-Disposition": f"attachment; filename=resume_analysis_{resume_id[:8]}.txt"}
-        )
+    if not analysis:
+        raise HTTPException(status_code=400, detail="Resume analysis not available")
     
-    elif format == "pdf":
-        # Generate PDF report
-        pdf_content = generate_pdf_report(analysis_data, resume)
-        return Response(
-            content=pdf_content,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=resume_analysis_{resume_id[:8]}.pdf"}
-        )
+    # Contact info, summary and text stats come from the stored features
+    features = get_resume_features(db, resume)
+    db.commit()
     
-    else:
-        raise HTTPException(status_code=400, detail="Invalid format")
-
-def generate_text_report(analysis_data: dict, resume) -> str:
-    """Generate a text-based report"""
-    report_lines = [
-        "RESUME ANALYSIS REPORT",
-        "=" * 50,
-        "",
-        f"Resume: {resume.filename}",
-        f"Analyzed: {resume.updated_at.strftime('%Y-%m-%d %H:%M')}",
-        f"Overall Score: {analysis_data.get('score', 0)}/100",
-        "",
-        "PERSONAL INFORMATION:",
-        "-" * 20
-    ]
+    cache_key = report_cache.make_key(resume.id, analysis.id, features.content_hash, format)
+    etag = report_cache.etag(cache_key)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename=resume_analysis_{resume_id[:8]}.{format}",
+    }
     
-    if 'extracted_info' in analysis_data:
-        info = analysis_data['extracted_info']
-        report_lines.extend([
-            f"Name: {info.get('name', 'N/A')}",
-            f"Email: {info.get('contact', {}).get('email', 'N/A')}",
-            f"Phone: {info.get('contact', {}).get('phone', 'N/A')}",
-            f"Location: {info.get('contact', {}).get('location', 'N/A')}",
-            "",
-            "SUMMARY:",
-            "-" * 8,
-            info.get('summary', 'No summary available'),
-            ""
-        ])
+    if report_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
     
-    # Add feedback sections
-    if 'feedback' in analysis_data:
-        report_lines.extend([
-            "DETAILED FEEDBACK BY CATEGORY:",
-            "-" * 35,
-            ""
-        ])
+    content = report_cache.get(cache_key, format)
+    if content is None:
+        analysis_data = build_report_data(analysis, features)
         
-        for category in analysis_data['feedback']:
-            report_lines.extend([
-                f"{category.get('category', 'Unknown').upper()}:",
-                ""
-            ])
-            
-            for item in category.get('items', []):
-                report_lines.extend([
-                    f"  Issue: {item.get('issue', 'N/A')}",
-                    f"  Suggestion: {item.get('suggestion', 'N/A')}",
-                    f"  Severity: {item.get('severity', 'N/A')}",
-                    ""
-                ])
-    
-    # Add experience section
-    if 'extracted_info' in analysis_data and 'experience' in analysis_data['extracted_info']:
-        report_lines.extend([
-            "EXPERIENCE:",
-            "-" * 11,
-            ""
-        ])
+        if format == "pdf":
+            content = generate_pdf_report(analysis_data, resume)
+        else:
+            chunks = iter_json(analysis_data) if format == "json" else iter_text_report(analysis_data, resume)
+            if stream:
+                return StreamingResponse(chunks, media_type=REPORT_MEDIA_TYPES[format], headers=headers)
+            content = "".join(chunks).encode("utf-8")
         
-        for i, exp in enumerate(analysis_data['extracted_info']['experience'], 1):
-            report_lines.extend([
-                f"{i}. {exp.get('title', 'N/A')} at {exp.get('company', 'N/A')}",
-                f"   Duration: {exp.get('duration', 'N/A')}",
-                "   Achievements:"
-            ])
-            
-            for achievement in exp.get('achievements', []):
-                report_lines.append(f"   - {achievement}")
-            
-            report_lines.append("")
+        report_cache.put(cache_key, format, content)
     
-    report_lines.extend([
-        "",
-        f"Report generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-    ])
-    
-    return "\n".join(report_lines)
+    return Response(content=content, media_type=REPORT_MEDIA_TYPES[format], headers=headers)
 
-def generate_pdf_report(analysis_data: dict, resume) -> bytes:
-    """Generate a PDF report using ReportLab"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # Get styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'TitleStyle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    
-    heading_style = ParagraphStyle(
-        'HeadingStyle',
-        parent=styles['Heading2'],
-        fontSize=16,
-        spaceAfter=12,
-        textColor=colors.darkblue
-    )
-    
-    story = []
-    
-    # Title
-    story.append(Paragraph("Resume Analysis Report", title_style))
-    story.append(Spacer(1, 12))
-    
-    # Basic info
-    story.append(Paragraph("Report Summary", heading_style))
-    basic_info = [
-        ['Resume:', resume.filename or 'Unnamed Resume'],
-        ['Analyzed:', resume.updated_at.strftime('%Y-%m-%d %H:%M')],
-        ['Overall Score:', f"{analysis_data.get('score', 0)}/100"],
-    ]
-    
-    basic_table = Table(basic_info, colWidths=[2*inch, 4*inch])
-    basic_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(basic_table)
-    story.append(Spacer(1, 20))
-    
-    # Personal Information
-    if 'extracted_info' in analysis_data:
-        info = analysis_data['extracted_info']
-        story.append(Paragraph("Personal Information", heading_style))
-        
-        personal_info = [
-            ['Name:', info.get('name', 'N/A')],
-            ['Email:', info.get('contact', {}).get('email', 'N/A')],
-            ['Phone:', info.get('contact', {}).get('phone', 'N/A')],
-            ['Location:', info.get('contact', {}).get('location', 'N/A')],
-        ]
-        
-        personal_table = Table(personal_info, colWidths=[2*inch, 4*inch])
-        personal_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(personal_table)
-        story.append(Spacer(1, 20))
-        
-        # Summary
-        if info.get('summary'):
-            story.append(Paragraph("Professional Summary", heading_style))
-            story.append(Paragraph(info['summary'], styles['Normal']))
-            story.append(Spacer(1, 20))
-    
-    # Feedback sections
-    if 'feedback' in analysis_data:
-        story.append(Paragraph("Detailed Feedback", heading_style))
-        
-        for category in analysis_data['feedback']:
-            cat_title = category.get('category', 'Unknown').title()
-            story.append(Paragraph(cat_title, styles['Heading3']))
-            
-            for item in category.get('items', []):
-                issue_text = f"<b>Issue:</b> {item.get('issue', 'N/A')}"
-                suggestion_text = f"<b>Suggestion:</b> {item.get('suggestion', 'N/A')}"
-                severity_text = f"<b>Severity:</b> {item.get('severity', 'N/A').title()}"
-                
-                story.append(Paragraph(issue_text, styles['Normal']))
-                story.append(Paragraph(suggestion_text, styles['Normal']))
-                story.append(Paragraph(severity_text, styles['Normal']))
-                story.append(Spacer(1, 12))
-    
-    # Footer
-    story.append(Spacer(1, 30))
-    footer_text = f"Report generated on {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-    story.append(Paragraph(footer_text, styles['Normal']))
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
+def _get_owned_resume(db: Session, resume_id: str, user: User) -> Resume:
+    resume = db.query(Resume).filter(
+        Resume.id == resume_id,
+        Resume.user_id == user.id
+    ).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+@router.get("/{resume_id}/versions")
+async def get_resume_versions(
+    resume_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List stored versions of a resume"""
+    resume = _get_owned_resume(db, resume_id, current_user)
+    return list_versions(db, resume.id)
+
+@router.get("/{resume_id}/versions/diff")
+async def get_resume_version_diff(
+    resume_id: str,
+    from_version: int = Query(..., alias="from", ge=1),
+    to_version: int = Query(..., alias="to", ge=1),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Unified diff between two versions of a resume"""
+    resume = _get_owned_resume(db, resume_id, current_user)
+    try:
+        return diff_versions(db, resume.id, from_version, to_version)
+    except VersionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/{resume_id}/versions/{version_number}")
+async def get_resume_version(
+    resume_id: str,
+    version_number: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Full text of one version, rebuilt from the nearest snapshot"""
+    resume = _get_owned_resume(db, resume_id, current_user)
+    try:
+        content = get_version_content(db, resume.id, version_number)
+    except VersionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"resume_id": str(resume.id), "version_number": version_number, "content": content}
 
 @router.get("/{resume_id}", response_model=ResumeResponse)
 async def get_resume(
@@ -1405,7 +1483,7 @@ async def get_feedback_history(
         }
         
     except Exception as e:
-        print(f"Error getting feedback history: {str(e)}")
+        logger.exception("Error getting feedback history")
         raise HTTPException(status_code=500, detail="Failed to get feedback history")
 
 # Removed unused debug endpoint 
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+AI Output Schemas
+Pydantic models for Gemini structured responses. Passed to Gemini as
+response schemas and used to validate whatever comes back.
+
+Gemini rejects non-null defaults and additionalProperties in response
+schemas, so optional scalars default to None, lists use default_factory
+and extra fields are ignored (pydantic's default).
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class FeedbackItem(BaseModel):
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    job_wants: Optional[str] = None
+    you_have: Optional[str] = None
+    fix: Optional[str] = None
+    example: Optional[str] = None
+    bonus: Optional[str] = None
+
+
+class KeywordAnalysis(BaseModel):
+    missing_keywords: List[str] = Field(default_factory=list)
+    keyword_density: Optional[str] = None
+
+
+class ResumeAnalysisOutput(BaseModel):
+    overall_score: Optional[float] = None
+    ats_score: Optional[float] = None
+    strengths: List[str] = Field(default_factory=list)
+    feedback: List[FeedbackItem] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+    keyword_analysis: Optional[KeywordAnalysis] = None
+    formatting_score: Optional[float] = None
+    content_score: Optional[float] = None
+
+
+class SectionAnalysisItem(BaseModel):
+    section: str
+    score: Optional[float] = None
+    ats_score: Optional[float] = None
+    strengths: List[str] = Field(default_factory=list)
+    feedback: List[FeedbackItem] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+    missing_keywords: List[str] = Field(default_factory=list)
+
+
+class SectionAnalysisOutput(BaseModel):
+    sections: List[SectionAnalysisItem] = Field(default_factory=list)
+
+
+class JobCompatibilityOutput(BaseModel):
+    compatibility_score: Optional[float] = None
+    matching_skills: List[str] = Field(default_factory=list)
+    missing_skills: List[str] = Field(default_factory=list)
+    experience_match: Optional[str] = None
+    key_strengths: List[str] = Field(default_factory=list)
+    improvement_areas: List[str] = Field(default_factory=list)
+    recommendation: Optional[str] = None
+    detailed_feedback: Optional[str] = None
+
+
+class JobCompatibilityBatchItem(JobCompatibilityOutput):
+    job_index: Optional[int] = None
+
+
+class JobCompatibilityBatchOutput(BaseModel):
+    results: List[JobCompatibilityBatchItem] = Field(default_factory=list)
+
+
+class ResumeImprovement(BaseModel):
+    category: Optional[str] = None
+    before: Optional[str] = None
+    after: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class ResumeFixOutput(BaseModel):
+    fixed_content: str
+    improvements: List[ResumeImprovement] = Field(default_factory=list)
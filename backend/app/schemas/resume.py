@@ -41,6 +41,10 @@ class ResumeResponse(ResumeBase):
 class ResumeEnhanceRequest(BaseModel):
     job_description: Optional[str] = None
 
+class BatchAnalysisRequest(BaseModel):
+    resume_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+    job_description: str = Field(..., min_length=1)
+
 class ResumeScoreResponse(BaseModel):
     score: float = Field(..., ge=0, le=100)
     feedback: Dict[str, Any]
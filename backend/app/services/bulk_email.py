@@ -0,0 +1,198 @@
+"""
+Bulk Email Service
+Splits a bulk notification into chunks stored with their progress, so
+chunk tasks can run in parallel and a retried chunk resumes where it
+stopped instead of resending from the start
+"""
+
+import logging
+from datetime import datetime, timedelta
+from email.message import Message
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.orm import Session
+
+from ..models.notification import BulkEmailJob, BulkEmailChunk
+from ..models.user import User
+from .email_sender import SMTPSender
+
+logger = logging.getLogger(__name__)
+
+# Progress is committed after every PROGRESS_BATCH_SIZE recipients, which
+# also bounds how many messages a crashed chunk can send twice
+PROGRESS_BATCH_SIZE = 50
+
+# A running chunk with no progress for this long is assumed to belong to
+# a dead worker and may be claimed again
+CHUNK_STALE_AFTER = timedelta(minutes=10)
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def create_bulk_email_job(
+    db: Session,
+    user_ids: List[str],
+    subject: str,
+    message: str,
+    email_type: str = "notification",
+    chunk_size: int = 500
+) -> BulkEmailJob:
+    """Store the job and its chunks (duplicate ids dropped). Caller commits."""
+    unique_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+    chunks = list(chunked(unique_ids, max(1, chunk_size)))
+
+    job = BulkEmailJob(
+        subject=subject,
+        message=message,
+        email_type=email_type,
+        total_users=len(unique_ids),
+        chunk_count=len(chunks),
+    )
+    db.add(job)
+    db.flush()
+
+    if chunks:
+        db.execute(insert(BulkEmailChunk), [
+            {"job_id": job.id, "chunk_index": index, "user_ids": list(ids)}
+            for index, ids in enumerate(chunks)
+        ])
+    return job
+
+
+class ChunkInProgress(Exception):
+    """Another worker holds a fresh claim on the chunk"""
+
+
+def claim_chunk(db: Session, job_id, chunk_index: int) -> Optional[BulkEmailChunk]:
+    """
+    Mark a chunk running and return it, or None if it has already finished.
+    Raises ChunkInProgress while another worker is actively sending it.
+    """
+    stale_before = datetime.utcnow() - CHUNK_STALE_AFTER
+    claimed = db.query(BulkEmailChunk).filter(
+        BulkEmailChunk.job_id == job_id,
+        BulkEmailChunk.chunk_index == chunk_index,
+        or_(
+            BulkEmailChunk.status.in_(["pending", "failed"]),
+            and_(BulkEmailChunk.status == "running", BulkEmailChunk.updated_at < stale_before),
+        )
+    ).update(
+        {
+            BulkEmailChunk.status: "running",
+            BulkEmailChunk.attempts: BulkEmailChunk.attempts + 1,
+            BulkEmailChunk.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+    db.commit()
+
+    chunk = db.query(BulkEmailChunk).filter(
+        BulkEmailChunk.job_id == job_id,
+        BulkEmailChunk.chunk_index == chunk_index
+    ).first()
+    if claimed:
+        return chunk
+    if chunk is not None and chunk.status == "running":
+        raise ChunkInProgress(f"Chunk {chunk_index} of job {job_id} is being sent by another worker")
+    return None
+
+
+def send_chunk(
+    db: Session,
+    chunk: BulkEmailChunk,
+    build: Callable[[Any], Message],
+    sender: SMTPSender,
+    batch_size: int = PROGRESS_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Send the chunk's remaining recipients, committing progress after each
+    batch. Recipients are loaded with one IN query; ids with no user count
+    as failed.
+    """
+    remaining = chunk.user_ids[chunk.next_offset:]
+    users = {
+        str(user.id): user
+        for user in db.query(User.id, User.email, User.full_name).filter(User.id.in_(remaining))
+    }
+
+    if chunk.next_offset:
+        logger.info(f"Resuming bulk email chunk {chunk.chunk_index} of job {chunk.job_id} at {chunk.next_offset}")
+
+    for batch in chunked(remaining, batch_size):
+        found = [users[user_id] for user_id in batch if user_id in users]
+        result = sender.send_many(build(user) for user in found)
+
+        chunk.next_offset += len(batch)
+        chunk.sent_count += result.sent
+        chunk.failed_count += result.failed + len(batch) - len(found)
+        db.commit()
+
+    chunk.status = "completed"
+    chunk.last_error = None
+    db.commit()
+
+    logger.info(
+        f"Bulk email chunk {chunk.chunk_index} of job {chunk.job_id}: "
+        f"{chunk.sent_count} sent, {chunk.failed_count} failed"
+    )
+    return {
+        "chunk_index": chunk.chunk_index,
+        "status": chunk.status,
+        "sent_count": chunk.sent_count,
+        "failed_count": chunk.failed_count,
+    }
+
+
+def release_chunk(db: Session, chunk_id, error: str, final: bool):
+    """After an error: back to pending for the retry, or failed when out of retries"""
+    db.query(BulkEmailChunk).filter(BulkEmailChunk.id == chunk_id).update(
+        {
+            BulkEmailChunk.status: "failed" if final else "pending",
+            BulkEmailChunk.last_error: error[:2000],
+            BulkEmailChunk.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def bulk_email_progress(db: Session, job_id) -> Dict[str, Any]:
+    """Totals across a job's chunks, readable while the job is running"""
+    rows = db.query(
+        BulkEmailChunk.status,
+        func.count(BulkEmailChunk.id),
+        func.coalesce(func.sum(BulkEmailChunk.next_offset), 0),
+        func.coalesce(func.sum(BulkEmailChunk.sent_count), 0),
+        func.coalesce(func.sum(BulkEmailChunk.failed_count), 0),
+    ).filter(BulkEmailChunk.job_id == job_id).group_by(BulkEmailChunk.status).all()
+
+    chunks = {status: count for status, count, _, _, _ in rows}
+    return {
+        "job_id": str(job_id),
+        "chunks": chunks,
+        "processed": int(sum(row[2] for row in rows)),
+        "sent_count": int(sum(row[3] for row in rows)),
+        "failed_count": int(sum(row[4] for row in rows)),
+    }
+
+
+def finalize_bulk_email_job(db: Session, job_id) -> Dict[str, Any]:
+    """Record the job's totals once every chunk has finished"""
+    progress = bulk_email_progress(db, job_id)
+    job = db.query(BulkEmailJob).filter(BulkEmailJob.id == job_id).first()
+    if job is None:
+        raise ValueError(f"Bulk email job {job_id} not found")
+
+    clean = progress["failed_count"] == 0 and set(progress["chunks"]) <= {"completed"}
+    job.status = "completed" if clean else "completed_with_errors"
+    job.sent_count = progress["sent_count"]
+    job.failed_count = progress["failed_count"] + job.total_users - progress["processed"]
+    job.completed_at = datetime.utcnow()
+    db.commit()
+
+    logger.info(f"Bulk email job {job_id} {job.status}: {job.sent_count} sent, {job.failed_count} failed")
+    return {**progress, "status": job.status, "total_users": job.total_users, "failed_count": job.failed_count}
@@ -0,0 +1,257 @@
+"""
+Bulk Resume Ingestion
+Stages a zip or multi-file upload, extracts text in a process pool,
+dedupes by content hash and bulk-inserts the resulting Resume rows.
+New resumes count against the user's upload window like single uploads.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path, PurePosixPath
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.resume import Resume, ResumeFeatures
+from ..models.user import User
+from ..utils.file_processing import extract_text_from_file, validate_file_type, validate_file_size
+from ..utils.text_features import compute_resume_features, content_hash
+from .quota import record_upload, release_upload
+
+logger = logging.getLogger(__name__)
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all bulk uploads in this process. Workers are
+    never forked from the server itself, whose threads, event loop and
+    database connections would be copied into them half-initialized.
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        workers = settings.BULK_EXTRACTION_WORKERS or os.cpu_count() or 1
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _extraction_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+    return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(cancel_futures=True)
+        _extraction_pool = None
+
+
+@dataclass
+class ManifestEntry:
+    """Per-file outcome returned to the client"""
+    filename: str
+    status: str  # created | duplicate | failed | skipped
+    resume_id: Optional[str] = None
+    duplicate_of: Optional[str] = None
+    character_count: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class StagedFile:
+    index: int
+    filename: str
+    path: str
+
+
+class BulkUploadError(ValueError):
+    """The upload as a whole cannot be ingested"""
+
+
+class UploadLimitError(BulkUploadError):
+    """The new resumes would take the user past their plan's upload limit"""
+
+
+def _is_ignored_member(name: str) -> bool:
+    parts = PurePosixPath(name).parts
+    return any(part.startswith(".") or part == "__MACOSX" for part in parts)
+
+
+def stage_uploads(uploads, staging_dir: str, manifest: List[ManifestEntry]) -> List[StagedFile]:
+    """
+    Copy uploaded files, expanding zip archives, into staging_dir.
+    Unsupported or oversized files get a 'skipped' manifest entry.
+    """
+    staged: List[StagedFile] = []
+    max_files = settings.BULK_UPLOAD_MAX_FILES
+
+    def add(filename: str, source, size: int):
+        if len(staged) >= max_files:
+            raise BulkUploadError(f"Too many files; the limit is {max_files} per upload")
+        if not validate_file_type(filename):
+            manifest.append(ManifestEntry(filename=filename, status="skipped", error="Unsupported file type"))
+            return
+        if not validate_file_size(size, max_size_mb=settings.MAX_FILE_SIZE_MB):
+            manifest.append(ManifestEntry(filename=filename, status="skipped", error="File too large"))
+            return
+
+        path = os.path.join(staging_dir, f"{len(staged)}{Path(filename).suffix.lower()}")
+        with open(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        staged.append(StagedFile(index=len(staged), filename=filename, path=path))
+
+    for upload in uploads:
+        if Path(upload.filename or "").suffix.lower() == ".zip":
+            try:
+                with zipfile.ZipFile(upload.file) as archive:
+                    for info in archive.infolist():
+                        if info.is_dir() or _is_ignored_member(info.filename):
+                            continue
+                        # Sizes come from the central directory, so bombs are rejected unread
+                        with archive.open(info) as member:
+                            add(PurePosixPath(info.filename).name, member, info.file_size)
+            except zipfile.BadZipFile:
+                manifest.append(ManifestEntry(filename=upload.filename, status="failed", error="Invalid zip archive"))
+        else:
+            upload.file.seek(0, os.SEEK_END)
+            size = upload.file.tell()
+            upload.file.seek(0)
+            add(upload.filename, upload.file, size)
+
+    return staged
+
+
+def _extract_worker(path: str) -> Dict[str, Any]:
+    """Runs in a pool process: text extraction plus the feature pipeline"""
+    try:
+        text = extract_text_from_file(path)
+        if not text.strip():
+            return {"error": "No text content found in uploaded file"}
+        return {"text": text, "features": compute_resume_features(text)}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def extract_staged_files(staged: List[StagedFile]) -> List[Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    pool = get_extraction_pool()
+    return await asyncio.gather(*(
+        loop.run_in_executor(pool, _extract_worker, item.path) for item in staged
+    ))
+
+
+def _existing_hashes(db: Session, user_id, hashes: List[str]) -> Dict[str, str]:
+    """content_hash -> resume id for this user's resumes already stored"""
+    if not hashes:
+        return {}
+    rows = db.query(ResumeFeatures.content_hash, ResumeFeatures.resume_id).join(Resume).filter(
+        Resume.user_id == user_id,
+        ResumeFeatures.content_hash.in_(hashes)
+    ).all()
+    existing = {stored_hash: str(resume_id) for stored_hash, resume_id in rows}
+
+    # Resumes from before the features table have no row yet; hash their text here
+    legacy = db.query(Resume.id, Resume.content).filter(
+        Resume.user_id == user_id,
+        ~Resume.features.any()
+    ).yield_per(500)
+    wanted = set(hashes)
+    for resume_id, text in legacy:
+        stored_hash = content_hash(text or "")
+        if stored_hash in wanted:
+            existing.setdefault(stored_hash, str(resume_id))
+    return existing
+
+
+async def ingest_resume_files(db: Session, user: User, uploads) -> Dict[str, Any]:
+    """
+    Ingest many resumes in one request and return a per-file manifest.
+    Resume and ResumeFeatures rows are each written with one executemany.
+    Raises UploadLimitError, and stores nothing, if the new (non-duplicate)
+    resumes do not fit in the user's upload window.
+    """
+    user_id = user.id
+    manifest: List[ManifestEntry] = []
+
+    with tempfile.TemporaryDirectory(prefix="bulk_upload_") as staging_dir:
+        staged = await asyncio.to_thread(stage_uploads, uploads, staging_dir, manifest)
+        results = await extract_staged_files(staged)
+
+    extracted = []
+    for item, result in zip(staged, results):
+        if "error" in result:
+            manifest.append(ManifestEntry(filename=item.filename, status="failed", error=result["error"]))
+        else:
+            extracted.append((item, result))
+
+    seen = _existing_hashes(db, user_id, [result["features"]["content_hash"] for _, result in extracted])
+
+    resume_rows = []
+    feature_rows = []
+    for item, result in extracted:
+        text, features = result["text"], result["features"]
+        text_hash = features["content_hash"]
+
+        if text_hash in seen:
+            manifest.append(ManifestEntry(
+                filename=item.filename, status="duplicate", duplicate_of=seen[text_hash]
+            ))
+            continue
+
+        resume_id = uuid.uuid4()
+        seen[text_hash] = str(resume_id)
+        resume_rows.append({
+            "id": resume_id,
+            "user_id": user_id,
+            "filename": item.filename,
+            "content": text,
+            "file_type": Path(item.filename).suffix.lstrip(".").lower(),
+            "processing_status": "completed",
+            "character_count": len(text),
+        })
+        feature_rows.append({
+            "resume_id": resume_id,
+            "content_hash": text_hash,
+            "pipeline_version": features["pipeline_version"],
+            "sections": features["sections"],
+            "keywords": features["keywords"],
+            "contact_info": features["contact_info"],
+            "word_stats": features["word_stats"],
+            "readability_score": features["readability_score"],
+        })
+        manifest.append(ManifestEntry(
+            filename=item.filename, status="created", resume_id=str(resume_id), character_count=len(text)
+        ))
+
+    if resume_rows:
+        window_bucket = record_upload(db, user, len(resume_rows))
+        if not window_bucket:
+            raise UploadLimitError(
+                f"Upload limit reached for your plan; this upload has {len(resume_rows)} new resumes"
+            )
+        try:
+            db.execute(insert(Resume), resume_rows)
+            db.execute(insert(ResumeFeatures), feature_rows)
+            db.commit()
+        except Exception:
+            release_upload(user, window_bucket, len(resume_rows))
+            raise
+
+    counts: Dict[str, int] = {}
+    for entry in manifest:
+        counts[entry.status] = counts.get(entry.status, 0) + 1
+
+    logger.info(f"Bulk upload for user {user_id}: {counts}")
+    return {
+        "total_files": len(manifest),
+        "counts": counts,
+        "files": [asdict(entry) for entry in manifest],
+    }
@@ -0,0 +1,303 @@
+"""
+Email Sender
+Pooled SMTP delivery: authenticated connections are kept open and reused
+across messages, bulk sends run over several connections at once, and a
+dropped connection is replaced and the message retried
+"""
+
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the connection is unusable rather than the message bad
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+# "Service not available, closing transmission channel"
+SMTP_CLOSING_CODE = 421
+
+
+def _is_connection_error(error: Exception) -> bool:
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == SMTP_CLOSING_CODE
+
+
+def build_message(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None,
+    from_email: Optional[str] = None
+) -> MIMEMultipart:
+    """multipart/alternative message with an optional plain-text part"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    if from_email:
+        msg['From'] = from_email
+    msg['To'] = to_email
+
+    if text_content:
+        msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+
+@dataclass
+class _PooledConnection:
+    smtp: smtplib.SMTP
+    opened_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    messages: int = 0
+
+
+@dataclass
+class BulkSendResult:
+    sent: int = 0
+    failed: int = 0
+    failed_recipients: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+
+class SMTPSender:
+    """
+    Thread-safe sender over a pool of at most pool_size SMTP connections.
+    Connections are recycled after max_messages_per_connection messages or
+    idle_timeout seconds unused, since servers drop long-lived sessions.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        from_email: Optional[str] = None,
+        use_tls: bool = True,
+        pool_size: int = 4,
+        max_messages_per_connection: int = 500,
+        idle_timeout: float = 60.0,
+        timeout: float = 30.0,
+        retries: int = 2
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.from_email = from_email
+        self.use_tls = use_tls
+        self.pool_size = max(1, pool_size)
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.retries = retries
+
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"sent": 0, "failed": 0, "connections_opened": 0, "reconnects": 0}
+        self._started_at: Optional[float] = None
+
+    # Connections
+
+    def _connect(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.use_tls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except Exception:
+            self._close_quietly(smtp)
+            raise
+        self._count("connections_opened")
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _close_quietly(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _acquire(self) -> _PooledConnection:
+        """An idle connection that is still fresh, or a new one. Caller holds a slot."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - conn.last_used < self.idle_timeout:
+                return conn
+            self._close_quietly(conn.smtp)
+
+    def _release(self, conn: _PooledConnection, healthy: bool):
+        conn.last_used = time.monotonic()
+        if not healthy or self._closed or conn.messages >= self.max_messages_per_connection:
+            self._close_quietly(conn.smtp)
+        else:
+            self._idle.put(conn)
+
+    # Sending
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def send(self, message: Message) -> bool:
+        """
+        Send one message on a pooled connection. Connection failures are
+        retried on a fresh connection; a rejected message is not retried.
+        """
+        if self._closed:
+            raise RuntimeError("SMTPSender is closed")
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        if not message['From'] and self.from_email:
+            message['From'] = self.from_email
+
+        recipient = message['To']
+        attempt = 0
+        with self._slots:
+            while True:
+                conn = None
+                try:
+                    conn = self._acquire()
+                    conn.smtp.send_message(message)
+                    conn.messages += 1
+                    self._release(conn, healthy=True)
+                    self._count("sent")
+                    return True
+                except (smtplib.SMTPException, OSError) as e:
+                    connection_lost = _is_connection_error(e)
+                    if conn is not None:
+                        # A rejected message leaves the session usable (smtplib sends RSET)
+                        self._release(conn, healthy=not connection_lost)
+                    if not connection_lost or attempt >= self.retries:
+                        logger.error(f"Failed to send email to {recipient} after {attempt + 1} attempt(s): {str(e)}")
+                        break
+                    attempt += 1
+                    self._count("reconnects")
+                    logger.warning(f"SMTP connection lost sending to {recipient}, reconnecting: {str(e)}")
+                except Exception as e:
+                    # Malformed message or unexpected client state: drop the session to be safe
+                    if conn is not None:
+                        self._release(conn, healthy=False)
+                    logger.error(f"Failed to send email to {recipient}: {str(e)}")
+                    break
+
+        self._count("failed")
+        return False
+
+    def send_many(self, messages: Iterable[Message], concurrency: Optional[int] = None) -> BulkSendResult:
+        """
+        Send a stream of messages over up to concurrency connections
+        (default pool_size). Messages are pulled lazily so only a bounded
+        number are built and in flight at once.
+        """
+        concurrency = min(concurrency or self.pool_size, self.pool_size)
+        result = BulkSendResult()
+        start = time.monotonic()
+        max_in_flight = concurrency * 2
+
+        def finish(done):
+            for future in done:
+                recipient, ok = future.result()
+                if ok:
+                    result.sent += 1
+                else:
+                    result.failed += 1
+                    result.failed_recipients.append(recipient)
+
+        def send_one(message: Message) -> Tuple[str, bool]:
+            return message['To'], self.send(message)
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="smtp-send") as executor:
+            in_flight = set()
+            for message in messages:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    finish(done)
+                in_flight.add(executor.submit(send_one, message))
+            done, _ = wait(in_flight)
+            finish(done)
+
+        result.elapsed = time.monotonic() - start
+        logger.info(
+            f"Bulk send: {result.sent} sent, {result.failed} failed in {result.elapsed:.1f}s "
+            f"({result.messages_per_second:.1f} msg/s over {concurrency} connections)"
+        )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since creation, with overall throughput in messages per second"""
+        with self._lock:
+            stats = dict(self._stats)
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        stats["idle_connections"] = self._idle.qsize()
+        stats["messages_per_second"] = round(stats["sent"] / elapsed, 2) if elapsed else 0.0
+        return stats
+
+    def close(self):
+        """Close every idle connection; in-flight ones close on release"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn.smtp)
+
+
+_sender: Optional[SMTPSender] = None
+_sender_pid: Optional[int] = None
+_sender_lock = threading.Lock()
+
+
+def get_email_sender() -> SMTPSender:
+    """Process-wide sender built from settings; a forked worker builds its own"""
+    global _sender, _sender_pid
+    from ..core.config import settings
+
+    with _sender_lock:
+        if _sender is None or _sender_pid != os.getpid():
+            _sender = SMTPSender(
+                host=settings.EMAIL_HOST,
+                port=settings.EMAIL_PORT,
+                username=settings.EMAIL_USERNAME,
+                password=settings.EMAIL_PASSWORD,
+                from_email=settings.EMAIL_FROM,
+                use_tls=settings.EMAIL_USE_TLS,
+                pool_size=settings.EMAIL_POOL_SIZE,
+                max_messages_per_connection=settings.EMAIL_MAX_MESSAGES_PER_CONNECTION,
+            )
+            _sender_pid = os.getpid()
+        return _sender
+
+
+def close_email_sender():
+    global _sender
+    with _sender_lock:
+        if _sender is not None and _sender_pid == os.getpid():
+            _sender.close()
+        _sender = None
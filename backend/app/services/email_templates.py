@@ -0,0 +1,132 @@
+"""
+Email Templates
+Jinja2 templates for outgoing email, compiled once per worker process.
+Each template is rendered once with the fields shared by every recipient
+(layout, links, a bulk message body) and cut into static segments around
+placeholders for the per-user fields, so a send only escapes and joins
+those fields instead of running the template again.
+
+Per-user fields must be output as plain ``{{ field }}`` substitutions in
+the template: no filters or conditionals on them. Format or branch in
+Python and pass the result.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    StrictUndefined,
+    select_autoescape,
+)
+from markupsafe import Markup, escape
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+_PLACEHOLDER = "\x00{}\x00"
+_PLACEHOLDER_RE = re.compile("\x00(\\w+)\x00")
+
+
+def build_template_environment(
+    cache_dir: Optional[str] = None,
+    template_dir: Path = TEMPLATE_DIR,
+    **global_context: Any
+) -> Environment:
+    """
+    Environment that loads templates from template_dir. Compiled bytecode is
+    written to cache_dir (when given) so new worker processes skip parsing.
+    Templates are not re-checked on disk once loaded.
+    """
+    bytecode_cache = None
+    if cache_dir:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    environment = Environment(
+        loader=FileSystemLoader(str(template_dir)),
+        autoescape=select_autoescape(["html"]),
+        bytecode_cache=bytecode_cache,
+        auto_reload=False,
+        undefined=StrictUndefined,
+        keep_trailing_newline=True,
+    )
+    environment.globals.update(global_context)
+    return environment
+
+
+class CompiledEmail:
+    """
+    A template pre-rendered with its shared context. render() fills in the
+    per-user fields; HTML templates escape them, text templates do not.
+    """
+
+    def __init__(
+        self,
+        environment: Environment,
+        template_name: str,
+        user_fields: Iterable[str],
+        **static_context: Any
+    ):
+        self.template_name = template_name
+        self.user_fields = tuple(user_fields)
+        autoescape = environment.autoescape
+        self.escape = autoescape(template_name) if callable(autoescape) else autoescape
+
+        template = environment.get_template(template_name)
+        placeholders = {field: Markup(_PLACEHOLDER.format(field)) for field in self.user_fields}
+        rendered = template.render(**static_context, **placeholders)
+
+        # Even positions are static text, odd positions are field names
+        self.segments: List[str] = _PLACEHOLDER_RE.split(rendered)
+        missing = set(self.user_fields) - set(self.segments[1::2])
+        if missing:
+            raise ValueError(
+                f"Template {template_name} does not output {', '.join(sorted(missing))} as a plain substitution"
+            )
+
+    def render(self, **user_values: Any) -> str:
+        convert = escape if self.escape else str
+        values = {field: convert(user_values[field]) for field in self.user_fields}
+        segments = self.segments
+        return "".join(
+            segment if index % 2 == 0 else values[segment]
+            for index, segment in enumerate(segments)
+        )
+
+
+@lru_cache(maxsize=1)
+def get_template_environment() -> Environment:
+    """The worker's shared environment"""
+    from ..core.config import settings
+
+    return build_template_environment(
+        settings.EMAIL_TEMPLATE_CACHE_DIR,
+        frontend_url=settings.FRONTEND_URL,
+    )
+
+
+@lru_cache(maxsize=64)
+def get_compiled_email(
+    template_name: str,
+    user_fields: Tuple[str, ...],
+    static_items: Tuple[Tuple[str, Any], ...] = ()
+) -> CompiledEmail:
+    return CompiledEmail(get_template_environment(), template_name, user_fields, **dict(static_items))
+
+
+def render_email(template_name: str, static: Optional[Dict[str, Any]] = None, **user_values: Any) -> str:
+    """
+    Render template_name for one recipient. `static` holds values shared by
+    every recipient of a send (such as a bulk message body); the template is
+    pre-rendered once per distinct static context.
+    """
+    compiled = get_compiled_email(
+        template_name,
+        tuple(sorted(user_values)),
+        tuple(sorted((static or {}).items())),
+    )
+    return compiled.render(**user_values)
@@ -3,16 +3,92 @@ Enhanced Gemini Service
 Uses google-genai SDK (new, replaces deprecated google.generativeai)
 """
 
-import logging
 import json
+import logging
 import asyncio
-import re
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 from google import genai
+from google.genai import types
+from pydantic import BaseModel
 from ..core.config import settings
+from ..core.metrics import observe_ai_call
+from ..core.tracing import span
+from ..schemas.ai_outputs import (
+    ResumeAnalysisOutput,
+    SectionAnalysisOutput,
+    JobCompatibilityOutput,
+    JobCompatibilityBatchOutput,
+    ResumeFixOutput,
+)
+from ..utils.structured_output import (
+    StructuredOutputError,
+    parse_json_object,
+    validate_structured,
+    extract_json,
+)
+from ..utils.prompt_builder import compact_input, normalize_text, log_prompt_tokens
 
 logger = logging.getLogger(__name__)
 
+# Fixed instructions go in the system instruction rather than the prompt
+# text, built once per process, so every call shares the same prefix and
+# Gemini's implicit prompt caching can reuse it. The response schema
+# enforces the shape; these lines only describe what the values mean.
+FEEDBACK_ITEM_GUIDE = (
+    "{category: technical|experience|education|format|keywords, priority: high|medium|low, "
+    "job_wants: what the job requires, you_have: what the candidate currently has, "
+    "fix: specific improvement needed, example: concrete example of the improvement, "
+    "bonus: additional enhancement}"
+)
+
+ANALYSIS_INSTRUCTIONS = normalize_text(f"""
+    You are an expert resume reviewer. Analyze the RESUME comprehensively, against the TARGET JOB when one is given.
+    Be specific, actionable and professional.
+    Respond in JSON:
+    overall_score, ats_score, formatting_score, content_score: 0-100
+    strengths: list of strings
+    feedback: list of {FEEDBACK_ITEM_GUIDE}
+    recommendations: list of strings
+    keyword_analysis: {{missing_keywords: list of strings, keyword_density: assessment of current keywords}}
+""")
+
+SECTION_ANALYSIS_INSTRUCTIONS = normalize_text(f"""
+    You are an expert resume reviewer. Analyze each resume SECTION independently, against the TARGET JOB when one is given.
+    Respond in JSON with one entry per section in "sections":
+    section: the section name in lowercase
+    score, ats_score: 0-100
+    strengths, recommendations, missing_keywords: lists of strings
+    feedback: list of {FEEDBACK_ITEM_GUIDE}
+""")
+
+# Resume builder generation; only the targets, seed and import text vary per request
+AI_GENERATE_INSTRUCTIONS = (
+    "You are a resume writing assistant. Return valid JSON only. No markdown.\n"
+    "Use this exact schema with all keys present:\n"
+    + json.dumps({
+        "personal_info": {"full_name": "", "target_title": "", "email": "", "phone": "", "location": "", "linkedin_url": "", "website": ""},
+        "summary_inputs": {"current_role": "", "years_experience": "", "specialization": "", "highlights": [], "target_role": "", "target_company_type": ""},
+        "summary": "",
+        "experience": [{"job_title": "", "company": "", "dates": "", "responsibilities": "", "achievements": "", "led_team": ""}],
+        "education": [{"degree": "", "institution": "", "graduation_year": "", "details": ""}],
+        "skills": [],
+        "certifications": [{"name": "", "year": ""}],
+        "languages": [{"name": "", "level": "Fluent"}],
+    }, separators=(",", ":"))
+    + "\nImprove bullet specificity and include measurable impact where possible. "
+    "The seed omits empty fields; fill them from the imported text where it has them."
+)
+
+
+@lru_cache(maxsize=32)
+def _generate_config(schema: Optional[type], system_instruction: Optional[str]) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=schema,
+        system_instruction=system_instruction,
+    )
+
 
 class GeminiService:
     """
@@ -42,15 +118,17 @@ class GeminiService:
         if not resume_text.strip():
             raise ValueError("Resume text cannot be empty")
         
-        # Create comprehensive analysis prompt
+        # Create compacted analysis prompt; instructions travel as the system instruction
         analysis_prompt = self._create_resume_analysis_prompt(resume_text, job_description)
         
-        # Generate analysis using new google.genai SDK
-        response = self.client.models.generate_content(model=self.model, contents=analysis_prompt)
-        analysis_text = response.text.strip()
+        # Generate analysis using new google.genai SDK, as schema-validated JSON
+        response = await self._generate_async(
+            "analyze_resume", analysis_prompt, self._json_config(ResumeAnalysisOutput, ANALYSIS_INSTRUCTIONS)
+        )
+        log_prompt_tokens("analyze_resume", analysis_prompt, ANALYSIS_INSTRUCTIONS, response)
         
         # Parse structured response
-        analysis_result = self._parse_analysis_response(analysis_text)
+        analysis_result = self._parse_analysis_response(response)
         
         logger.info(f"Resume analysis completed: {analysis_result.get('overall_score', 0)}/100")
         return analysis_result
@@ -94,7 +172,7 @@ class GeminiService:
             Generate a complete cover letter without any placeholders or mailing-address header.
             """
             
-            response = self.client.models.generate_content(model=self.model, contents=cover_letter_prompt)
+            response = await self._generate_async("cover_letter", cover_letter_prompt)
             cover_letter = response.text.strip()
             
             logger.info("Cover letter generated successfully")
@@ -149,11 +227,10 @@ class GeminiService:
             Focus on practical, actionable learning recommendations.
             """
             
-            response = self.client.models.generate_content(model=self.model, contents=learning_prompt)
-            learning_text = response.text.strip()
+            response = await self._generate_async("learning_path", learning_prompt, self._json_config())
             
             # Parse JSON response
-            learning_path = self._parse_json_response(learning_text, "learning path")
+            learning_path = self._structured_result(response, "learning path")
             
             logger.info("Learning path generated successfully")
             return learning_path
@@ -162,6 +239,65 @@ class GeminiService:
             logger.error(f"Learning path generation failed: {str(e)}")
             raise
     
+    async def generate_skill_gap_learning_path(
+        self,
+        target_role: str,
+        missing_skills: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Learning path for a skill gap rather than one resume. The prompt only
+        depends on its arguments, so the result can be cached and shared by
+        every candidate with the same gap.
+        """
+        try:
+            learning_prompt = f"""
+            Create a learning path for a candidate targeting the role below who is missing the listed skills.
+            Do not refer to a specific person; the path is shared by every candidate with this gap.
+            
+            TARGET ROLE: {target_role}
+            MISSING SKILLS: {", ".join(missing_skills)}
+            
+            Provide a JSON response with this structure:
+            {{
+                "skill_gaps": ["skill1", "skill2", ...],
+                "learning_path": [
+                    {{
+                        "skill": "skill_name",
+                        "priority": "high|medium|low",
+                        "current_level": "beginner|intermediate|advanced",
+                        "target_level": "intermediate|advanced|expert",
+                        "estimated_time": "time_estimate",
+                        "resources": [
+                            {{
+                                "type": "course|book|tutorial|practice",
+                                "title": "resource_title",
+                                "url": "resource_url_if_available",
+                                "description": "brief_description"
+                            }}
+                        ],
+                        "milestones": ["milestone1", "milestone2", ...]
+                    }}
+                ],
+                "career_advice": "advice_for_this_role_and_gap",
+                "next_steps": ["step1", "step2", ...]
+            }}
+            
+            Use one learning_path entry per missing skill, with the skill name exactly as listed.
+            Focus on practical, actionable learning recommendations.
+            """
+            
+            response = await self._generate_async("learning_path_gap", learning_prompt, self._json_config())
+            log_prompt_tokens("learning_path_gap", learning_prompt, response=response)
+            
+            learning_path = self._structured_result(response, "learning path")
+            
+            logger.info(f"Skill-gap learning path generated for {target_role} ({len(missing_skills)} skills)")
+            return learning_path
+            
+        except Exception as e:
+            logger.error(f"Skill-gap learning path generation failed: {str(e)}")
+            raise
+    
     async def generate_practice_exam(
         self, 
         resume_content: str, 
@@ -205,11 +341,10 @@ class GeminiService:
             Include a mix of technical and behavioral questions relevant to the resume and role.
             """
             
-            response = self.client.models.generate_content(model=self.model, contents=exam_prompt)
-            exam_text = response.text.strip()
+            response = await self._generate_async("practice_exam", exam_prompt, self._json_config())
             
             # Parse JSON response
-            practice_exam = self._parse_json_response(exam_text, "practice exam")
+            practice_exam = self._structured_result(response, "practice exam")
             
             logger.info(f"Practice exam with {num_questions} questions generated")
             return practice_exam
@@ -251,11 +386,12 @@ class GeminiService:
             Be specific and actionable in your analysis.
             """
             
-            response = self.client.models.generate_content(model=self.model, contents=compatibility_prompt)
-            compatibility_text = response.text.strip()
+            response = await self._generate_async(
+                "job_compatibility", compatibility_prompt, self._json_config(JobCompatibilityOutput)
+            )
             
             # Parse JSON response
-            compatibility_result = self._parse_json_response(compatibility_text, "job compatibility")
+            compatibility_result = self._structured_result(response, "job compatibility", JobCompatibilityOutput)
             
             logger.info(f"Job compatibility analyzed: {compatibility_result.get('compatibility_score', 0)}% match")
             return compatibility_result
@@ -263,7 +399,72 @@ class GeminiService:
         except Exception as e:
             logger.error(f"Job compatibility analysis failed: {str(e)}")
             raise
-    
+
+    async def analyze_job_compatibility_batch(
+        self,
+        resume_text: str,
+        job_descriptions: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze compatibility between one resume and several jobs in a single prompt
+        Returns one result per job, in input order (empty dict if the model skipped a job)
+        """
+        if not job_descriptions:
+            return []
+
+        try:
+            jobs_block = "\n\n".join(
+                f"JOB {index}:\n{description}"
+                for index, description in enumerate(job_descriptions)
+            )
+
+            batch_prompt = f"""
+            Analyze the compatibility between this resume and each of the {len(job_descriptions)} job postings below.
+
+            RESUME:
+            {resume_text}
+
+            JOB POSTINGS:
+            {jobs_block}
+
+            Provide a JSON response with one entry per job, in the same order:
+            {{
+                "results": [
+                    {{
+                        "job_index": 0,
+                        "compatibility_score": 0-100,
+                        "matching_skills": ["skill1", "skill2", ...],
+                        "missing_skills": ["missing1", "missing2", ...],
+                        "key_strengths": ["strength1", "strength2", ...],
+                        "recommendation": "apply|improve_first|not_suitable"
+                    }}
+                ]
+            }}
+
+            Be specific and concise. Do not skip any job.
+            """
+
+            # Async client so batches can run concurrently without blocking the event loop
+            response = await self._generate_async(
+                "job_compatibility_batch", batch_prompt, self._json_config(JobCompatibilityBatchOutput)
+            )
+            batch_result = self._structured_result(response, "batch job compatibility", JobCompatibilityBatchOutput)
+
+            results: List[Dict[str, Any]] = [{} for _ in job_descriptions]
+            for position, item in enumerate(batch_result.get("results", [])):
+                if not isinstance(item, dict):
+                    continue
+                index = item.get("job_index", position)
+                if isinstance(index, int) and 0 <= index < len(results):
+                    results[index] = item
+
+            logger.info(f"Batch job compatibility analyzed for {len(job_descriptions)} jobs")
+            return results
+
+        except Exception as e:
+            logger.error(f"Batch job compatibility analysis failed: {str(e)}")
+            raise
+
     async def fix_resume(
         self,
         content: str,
@@ -302,39 +503,23 @@ Instructions:
 - Improve bullet points to use strong action verbs and quantifiable achievements
 - Ensure ATS-friendly formatting
 - Keep all factual information accurate — do not fabricate experience
-- Return the complete improved resume text followed by a JSON block listing improvements
-
-Respond in this exact format:
-<resume>
-[full improved resume text here]
-</resume>
-<improvements>
-[
-  {{"category": "category_name", "before": "original text", "after": "improved text", "reason": "why this was changed"}}
-]
-</improvements>
+- Return the complete improved resume text and a list of the improvements made
+
+Respond with JSON in this exact format:
+{{
+  "fixed_content": "full improved resume text",
+  "improvements": [
+    {{"category": "category_name", "before": "original text", "after": "improved text", "reason": "why this was changed"}}
+  ]
+}}
 """
-            response = self.client.models.generate_content(model=self.model, contents=fix_prompt)
-            result_text = response.text.strip()
-
-            # Extract resume content
-            import re
-            resume_match = re.search(r'<resume>(.*?)</resume>', result_text, re.DOTALL)
-            fixed_content = resume_match.group(1).strip() if resume_match else result_text
-
-            # Extract improvements JSON
-            improvements_match = re.search(r'<improvements>(.*?)</improvements>', result_text, re.DOTALL)
-            improvements = []
-            if improvements_match:
-                try:
-                    improvements = json.loads(improvements_match.group(1).strip())
-                except json.JSONDecodeError:
-                    pass
+            response = await self._generate_async("fix_resume", fix_prompt, self._json_config(ResumeFixOutput))
+            result = self._structured_result(response, "resume fix", ResumeFixOutput)
 
             logger.info("Resume fixed successfully")
             return {
-                "fixedContent": fixed_content,
-                "improvements": improvements
+                "fixedContent": result["fixed_content"].strip(),
+                "improvements": result["improvements"]
             }
 
         except Exception as e:
@@ -379,11 +564,10 @@ Respond in this exact format:
             Focus on SEO optimization and professional branding.
             """
             
-            response = self.client.models.generate_content(model=self.model, contents=linkedin_prompt)
-            linkedin_text = response.text.strip()
+            response = await self._generate_async("linkedin_optimization", linkedin_prompt, self._json_config())
             
             # Parse JSON response
-            linkedin_optimization = self._parse_json_response(linkedin_text, "LinkedIn optimization")
+            linkedin_optimization = self._structured_result(response, "LinkedIn optimization")
             
             logger.info("LinkedIn optimization suggestions generated")
             return linkedin_optimization
@@ -392,112 +576,197 @@ Respond in this exact format:
             logger.error(f"LinkedIn optimization failed: {str(e)}")
             raise
     
-    def _create_resume_analysis_prompt(self, resume_text: str, job_description: str = None) -> str:
-        """Create comprehensive resume analysis prompt"""
+    async def generate_resume_summary(self, prompt: str) -> str:
+        """Plain-text professional summary for the resume builder"""
+        response = await self._generate_async("ai_summary", prompt)
+        return (response.text or "").strip()
+    
+    async def generate_resume_data(self, prompt: str) -> Dict[str, Any]:
+        """
+        Resume builder data (AI_GENERATE_INSTRUCTIONS schema) for the targets,
+        seed and imported text in `prompt`; an empty dict if the model does
+        not return a JSON object
+        """
+        try:
+            response = await self._generate_async(
+                "ai_generate_generated_resume",
+                prompt,
+                self._json_config(system_instruction=AI_GENERATE_INSTRUCTIONS)
+            )
+            log_prompt_tokens("ai_generate_generated_resume", prompt, AI_GENERATE_INSTRUCTIONS, response)
+        except Exception as e:
+            logger.error(f"Resume data generation failed: {str(e)}")
+            raise
+        
+        try:
+            return parse_json_object(response.text or "")
+        except StructuredOutputError:
+            logger.warning("Generated resume data was not a JSON object")
+            return {}
+    
+    def _create_analysis_context(self, job_description: str = None) -> str:
+        """
+        Target job block for resume analysis, normalized and cut to the job
+        token budget. This is the part shared by every resume analyzed
+        against the same job, so it is built once per batch and sent right
+        after the system instruction.
+        """
+        job_text = compact_input(job_description, settings.PROMPT_MAX_JOB_TOKENS)
+        return f"TARGET JOB:\n{job_text}\n\n" if job_text else ""
+    
+    def _create_resume_analysis_prompt(
+        self,
+        resume_text: str,
+        job_description: str = None,
+        analysis_context: Optional[str] = None
+    ) -> str:
+        """Per-request analysis contents: target job, then the compacted resume"""
         
-        base_prompt = f"""
-        Analyze this resume comprehensively and provide detailed feedback.
+        if analysis_context is None:
+            analysis_context = self._create_analysis_context(job_description)
+        
+        # Resume goes last so every prompt for the same job shares its prefix
+        resume_block = compact_input(resume_text, settings.PROMPT_MAX_RESUME_TOKENS)
+        return f"{analysis_context}RESUME:\n{resume_block}"
+    
+    async def analyze_resume_sections(
+        self,
+        sections: Dict[str, str],
+        job_description: str = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze only the given resume sections, each on its own merits.
+        Returns {section_name: result}; sections the model skipped are omitted.
+        """
+        if not sections:
+            return {}
         
-        RESUME:
-        {resume_text}
+        sections_block = "\n\n".join(
+            f"SECTION {name.upper()}:\n{compact_input(text, settings.PROMPT_MAX_RESUME_TOKENS)}"
+            for name, text in sections.items()
+        )
+        prompt = self._create_analysis_context(job_description) + sections_block
         
-        {f"TARGET JOB: {job_description}" if job_description else ""}
+        response = await self._generate_async(
+            "analyze_resume_sections", prompt, self._json_config(SectionAnalysisOutput, SECTION_ANALYSIS_INSTRUCTIONS)
+        )
+        log_prompt_tokens("analyze_resume_sections", prompt, SECTION_ANALYSIS_INSTRUCTIONS, response)
+        parsed = self._structured_result(response, "section analysis", SectionAnalysisOutput)
         
-        Provide a JSON response with this exact structure:
-        {{
-            "overall_score": 0-100,
-            "ats_score": 0-100,
-            "strengths": ["strength1", "strength2", ...],
-            "feedback": [
-                {{
-                    "category": "technical|experience|education|format|keywords",
-                    "priority": "high|medium|low",
-                    "job_wants": "what_the_job_requires",
-                    "you_have": "what_candidate_currently_has",
-                    "fix": "specific_improvement_needed",
-                    "example": "concrete_example_of_improvement",
-                    "bonus": "additional_enhancement_suggestion"
-                }}
-            ],
-            "recommendations": ["recommendation1", "recommendation2", ...],
-            "keyword_analysis": {{
-                "missing_keywords": ["keyword1", "keyword2", ...],
-                "keyword_density": "assessment_of_current_keywords"
-            }},
-            "formatting_score": 0-100,
-            "content_score": 0-100
-        }}
+        results: Dict[str, Dict[str, Any]] = {}
+        for result in parsed["sections"]:
+            name = result.pop("section").lower()
+            if name not in sections:
+                continue
+            result["score"] = max(0, min(100, result.get("score") or 0))
+            result["ats_score"] = max(0, min(100, result.get("ats_score") or 0))
+            results[name] = result
         
-        Be specific, actionable, and professional in your analysis.
+        logger.info(f"Section analysis completed for {len(results)}/{len(sections)} sections")
+        return results
+    
+    async def analyze_resumes_batch(
+        self,
+        resumes: List[Tuple[Any, str]],
+        job_description: str,
+        max_concurrency: int = 5
+    ) -> AsyncIterator[Tuple[Any, Dict[str, Any], Optional[str]]]:
+        """
+        Analyze many resumes against one job description.
+        Yields (key, analysis, error) as each analysis completes, with at most
+        max_concurrency requests in flight. The job context is built once.
         """
+        analysis_context = self._create_analysis_context(job_description)
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        return base_prompt
-    
-    def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse and validate analysis response"""
+        async def analyze_one(key: Any, resume_text: str):
+            async with semaphore:
+                try:
+                    prompt = self._create_resume_analysis_prompt(resume_text, analysis_context=analysis_context)
+                    response = await self._generate_async(
+                        "analyze_resume_batch", prompt, self._json_config(ResumeAnalysisOutput, ANALYSIS_INSTRUCTIONS)
+                    )
+                    log_prompt_tokens("analyze_resume_batch", prompt, ANALYSIS_INSTRUCTIONS, response)
+                    # An unreadable response is a failure here, not a placeholder score
+                    return key, self._parse_analysis_response(response, fallback=False), None
+                except Exception as e:
+                    logger.error(f"Batch resume analysis failed for {key}: {str(e)}")
+                    return key, None, str(e)
+        
+        tasks = [asyncio.create_task(analyze_one(key, text)) for key, text in resumes]
         try:
-            # Extract JSON from response
-            json_match = self._extract_json_from_text(response_text)
-            
-            if json_match:
-                analysis = json.loads(json_match)
-                
-                # Validate required fields
-                required_fields = ['overall_score', 'ats_score', 'strengths', 'feedback', 'recommendations']
-                for field in required_fields:
-                    if field not in analysis:
-                        logger.warning(f"Missing field in analysis: {field}")
-                        analysis[field] = [] if field in ['strengths', 'feedback', 'recommendations'] else 0
-                
-                # Ensure scores are in valid range
-                analysis['overall_score'] = max(0, min(100, analysis.get('overall_score', 0)))
-                analysis['ats_score'] = max(0, min(100, analysis.get('ats_score', 0)))
-                
-                return analysis
-            else:
-                logger.warning("No valid JSON found in analysis response")
-                return self._get_fallback_analysis()
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse analysis JSON: {str(e)}")
-            return self._get_fallback_analysis()
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # Client went away mid-stream: stop the remaining requests
+            for task in tasks:
+                task.cancel()
     
-    def _parse_json_response(self, response_text: str, response_type: str) -> Dict[str, Any]:
-        """Parse JSON response from Gemini"""
-        try:
-            json_match = self._extract_json_from_text(response_text)
-            
-            if json_match:
-                return json.loads(json_match)
-            else:
-                logger.warning(f"No valid JSON found in {response_type} response")
-                raise ValueError(f"Invalid {response_type} response format")
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse {response_type} JSON: {str(e)}")
-            raise ValueError(f"Invalid {response_type} response format")
+    async def _generate_async(self, endpoint: str, contents: str, config: Optional[types.GenerateContentConfig] = None):
+        """
+        generate_content on the async client, with latency, token and error
+        metrics under `endpoint`. Never blocks the calling event loop.
+        """
+        with span("gemini"), observe_ai_call(endpoint) as call:
+            response = await self.client.aio.models.generate_content(model=self.model, contents=contents, config=config)
+            call.record(response)
+        return response
+    
+    def _json_config(
+        self,
+        schema: Optional[type] = None,
+        system_instruction: Optional[str] = None
+    ) -> types.GenerateContentConfig:
+        """
+        Ask for JSON output, validated against a Pydantic schema when given.
+        Configs are cached, so a fixed system instruction is built once.
+        """
+        return _generate_config(schema, system_instruction)
+    
+    def _structured_result(
+        self,
+        response,
+        response_type: str,
+        schema: Optional[type] = None
+    ) -> Dict[str, Any]:
+        """
+        Structured payload of a JSON-mode response as a dict. Uses the SDK's
+        schema-parsed object when present, else the tolerant parser. Fields
+        the model left out are omitted rather than set to None.
+        """
+        with span("parse"):
+            parsed = getattr(response, "parsed", None)
+            if isinstance(parsed, BaseModel):
+                return parsed.model_dump(exclude_none=True)
+            
+            try:
+                if schema is not None:
+                    return validate_structured(extract_json(response.text), schema).model_dump(exclude_none=True)
+                return parse_json_object(response.text)
+            except StructuredOutputError as e:
+                logger.error(f"Failed to parse {response_type} response: {str(e)}")
+                raise ValueError(f"Invalid {response_type} response format") from e
     
-    def _extract_json_from_text(self, text: str) -> Optional[str]:
-        """Extract JSON from text that might contain markdown formatting"""
-        # Try to find JSON wrapped in code blocks
-        json_patterns = [
-            r'```json\s*(.*?)\s*```',
-            r'```\s*(.*?)\s*```',
-            r'\{.*\}',
-        ]
+    def _parse_analysis_response(self, response, fallback: bool = True) -> Dict[str, Any]:
+        """
+        Parse and validate analysis response. An unparseable response gives
+        the fallback analysis, or raises ValueError when fallback is False.
+        """
+        try:
+            analysis = self._structured_result(response, "analysis", ResumeAnalysisOutput)
+        except ValueError:
+            logger.warning("No valid JSON found in analysis response")
+            if not fallback:
+                raise
+            return self._get_fallback_analysis()
         
-        for pattern in json_patterns:
-            match = re.search(pattern, text, re.DOTALL)
-            if match:
-                json_text = match.group(1) if 'json' in pattern else match.group(0)
-                try:
-                    # Validate it's valid JSON
-                    json.loads(json_text)
-                    return json_text
-                except json.JSONDecodeError:
-                    continue
+        # Missing scores come back as None; ensure they are in valid range
+        for field in ('overall_score', 'ats_score'):
+            if analysis.get(field) is None:
+                logger.warning(f"Missing field in analysis: {field}")
+            analysis[field] = max(0, min(100, analysis.get(field) or 0))
         
-        return None
+        return analysis
     
     def _get_fallback_analysis(self) -> Dict[str, Any]:
         """Provide fallback analysis when AI analysis fails"""
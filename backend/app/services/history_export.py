@@ -0,0 +1,155 @@
+"""
+History Export Service
+Streams a user's full analysis and cover-letter history as NDJSON or a
+zip of PDF reports, reading rows in batches so memory stays flat
+regardless of history size. Nothing is loaded up front: each analysis
+row comes with its resume, and features are looked up once per resume.
+"""
+
+import json
+import logging
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.resume import Resume, ResumeAnalysis, ResumeFeatures, CoverLetterHistory
+from .resume_features import get_resume_features
+from .report_service import ReportCache, build_report_data, generate_pdf_report
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while streaming
+EXPORT_BATCH_SIZE = 200
+
+
+class _ChunkSink:
+    """Write-only file object for zipfile; drained after every archive member"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_analyses(db: Session, user_id) -> Iterator[Tuple[ResumeAnalysis, str]]:
+    """Analyses with their resume's filename, oldest first"""
+    return db.query(ResumeAnalysis, Resume.filename).join(Resume).filter(
+        Resume.user_id == user_id
+    ).order_by(ResumeAnalysis.created_at).yield_per(EXPORT_BATCH_SIZE)
+
+
+def _iter_analyses_by_resume(db: Session, user_id) -> Iterator[Tuple[ResumeAnalysis, Resume]]:
+    """Analyses with their resume, grouped by resume so its features are read once"""
+    return db.query(ResumeAnalysis, Resume).join(Resume).filter(
+        Resume.user_id == user_id
+    ).order_by(Resume.id, ResumeAnalysis.created_at).yield_per(EXPORT_BATCH_SIZE)
+
+
+def _iter_cover_letters(db: Session, user_id) -> Iterator[Tuple[CoverLetterHistory, Optional[str]]]:
+    """Cover letters with their resume's filename (if the resume still exists), oldest first"""
+    return db.query(CoverLetterHistory, Resume.filename).outerjoin(Resume).filter(
+        CoverLetterHistory.user_id == user_id
+    ).order_by(CoverLetterHistory.created_at).yield_per(EXPORT_BATCH_SIZE)
+
+
+def _analysis_record(analysis: ResumeAnalysis, resume_filename: Optional[str]) -> Dict:
+    return {
+        "type": "analysis",
+        "id": analysis.id,
+        "resume_id": analysis.resume_id,
+        "resume_filename": resume_filename,
+        "created_at": analysis.created_at,
+        "overall_score": analysis.overall_score,
+        "ats_score": analysis.ats_score,
+        "strengths": analysis.strengths or [],
+        "recommendations": analysis.recommendations or [],
+        "analysis_data": analysis.analysis_data or {},
+    }
+
+
+def _cover_letter_record(entry: CoverLetterHistory) -> Dict:
+    return {
+        "type": "cover_letter",
+        "id": entry.id,
+        "resume_id": entry.resume_id,
+        "job_title": entry.job_title,
+        "company_name": entry.company_name,
+        "job_description": entry.job_description,
+        "content": entry.content,
+        "created_at": entry.created_at,
+    }
+
+
+def iter_history_ndjson(user_id) -> Iterator[str]:
+    """One JSON object per line: every analysis, then every cover letter"""
+    with SessionLocal() as db:
+        for analysis, filename in _iter_analyses(db, user_id):
+            record = _analysis_record(analysis, filename)
+            yield json.dumps(record, default=str) + "\n"
+
+        for entry, _ in _iter_cover_letters(db, user_id):
+            yield json.dumps(_cover_letter_record(entry), default=str) + "\n"
+
+
+def _archive_name(folder: str, created_at, filename: str, item_id, extension: str) -> str:
+    date = created_at.strftime("%Y%m%d") if created_at else "undated"
+    stem = Path(filename or "resume").stem.replace(" ", "_")
+    return f"{folder}/{date}_{stem}_{str(item_id)[:8]}.{extension}"
+
+
+def iter_history_zip(user_id, report_cache: Optional[ReportCache] = None) -> Iterator[bytes]:
+    """
+    Zip archive of one PDF report per analysis plus each cover letter as text.
+    Each member is rendered, compressed and yielded before the next is read.
+    """
+    sink = _ChunkSink()
+
+    with SessionLocal() as db:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            resume_features: Optional[ResumeFeatures] = None
+            for analysis, resume in _iter_analyses_by_resume(db, user_id):
+                if resume_features is None or resume_features.resume_id != resume.id:
+                    # Legacy resumes get their features stored here; committed at the end
+                    resume_features = get_resume_features(db, resume)
+
+                pdf = None
+                if report_cache:
+                    cache_key = report_cache.make_key(resume.id, analysis.id, resume_features.content_hash, "pdf")
+                    pdf = report_cache.get(cache_key, "pdf")
+                if pdf is None:
+                    pdf = generate_pdf_report(build_report_data(analysis, resume_features), resume)
+                    if report_cache:
+                        report_cache.put(cache_key, "pdf", pdf)
+
+                # PDFs are already compressed
+                archive.writestr(
+                    _archive_name("analyses", analysis.created_at, resume.filename, analysis.id, "pdf"),
+                    pdf,
+                    compress_type=zipfile.ZIP_STORED,
+                )
+                yield sink.drain()
+
+            for entry, filename in _iter_cover_letters(db, user_id):
+                archive.writestr(
+                    _archive_name("cover_letters", entry.created_at, filename, entry.id, "txt"),
+                    entry.content or "",
+                )
+                yield sink.drain()
+
+        db.commit()
+
+    # Central directory, written when the archive closes
+    yield sink.drain()
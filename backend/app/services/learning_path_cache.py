@@ -0,0 +1,274 @@
+"""
+Learning Path Cache
+Learning paths are generated per skill gap instead of per resume: the
+missing skills and a target-role bucket form a signature, one path is
+generated per signature and shared, and each response is personalized
+from the candidate's own resume without another model call
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import record_cache
+from ..models.analytics import Analytics, ActionType
+from ..models.resume import LearningPathCache
+from ..utils.text_features import WORD_RE, extract_keywords
+
+logger = logging.getLogger(__name__)
+
+# Bump when the gap prompt or signature changes so old entries stop matching
+LEARNING_PATH_CACHE_VERSION = 1
+
+# Job keywords considered, and how many missing ones make up the gap
+JOB_KEYWORD_LIMIT = 25
+MAX_GAP_SKILLS = 8
+
+# Analytics meta_data key recording how each request was served
+CACHE_STATUS_KEY = "learning_path_cache"
+
+# Job posting filler that is never a skill
+JOB_BOILERPLATE = frozenset({
+    'looking', 'candidate', 'candidates', 'ability', 'able', 'strong', 'knowledge',
+    'skills', 'skill', 'requirements', 'required', 'preferred', 'plus', 'excellent',
+    'join', 'opportunity', 'benefits', 'salary', 'apply', 'must', 'etc', 'environment',
+    'understanding', 'familiarity', 'working', 'great', 'good', 'new', 'well', 'help',
+    'ideal', 'across', 'within', 'would', 'could', 'like', 'make', 'based', 'per',
+    'time', 'full', 'part', 'remote', 'office', 'location', 'please', 'equal',
+    'employer', 'hiring', 'hire', 'seeking', 'responsibilities', 'qualifications',
+    'degree', 'bachelor', 'related', 'field', 'proven', 'track', 'record', 'will',
+    'our', 'us', 'you', 'we', 'day', 'days', 'week', 'weeks', 'paid', 'competitive',
+})
+
+# Dropped from role titles so "Senior Backend Engineer II" and
+# "Backend Engineer" share a bucket
+SENIORITY_WORDS = frozenset({
+    'senior', 'sr', 'junior', 'jr', 'lead', 'principal', 'staff', 'head', 'chief',
+    'associate', 'intern', 'entry', 'level', 'mid', 'i', 'ii', 'iii', 'iv',
+})
+
+ROLE_WORD_RE = re.compile(r"[a-z][a-z0-9+#]*")
+MAX_ROLE_TITLE_WORDS = 8
+
+
+def role_bucket(job_title: Optional[str], job_description: Optional[str] = None) -> str:
+    """
+    Normalized target role: the job title, or a short first line of the job
+    description, lowercased with seniority words removed
+    """
+    title = job_title or ""
+    if not title.strip() and job_description:
+        first_line = next((line for line in job_description.splitlines() if line.strip()), "")
+        if len(first_line.split()) <= MAX_ROLE_TITLE_WORDS:
+            title = first_line
+
+    words = [word for word in ROLE_WORD_RE.findall(title.lower()) if word not in SENIORITY_WORDS]
+    return " ".join(words) or "general"
+
+
+def skill_gap(resume_text: str, job_description: str, bucket: str = "") -> Tuple[List[str], List[str]]:
+    """
+    (missing, matched) job keywords, most emphasized first. Missing ones do
+    not appear anywhere in the resume; at most MAX_GAP_SKILLS are kept.
+    """
+    resume_words = {token.lower() for token in WORD_RE.findall(resume_text or "")}
+    exclude = JOB_BOILERPLATE | SENIORITY_WORDS | frozenset(bucket.split())
+    job_keywords = extract_keywords(job_description, JOB_KEYWORD_LIMIT, exclude)
+
+    missing = [keyword for keyword in job_keywords if keyword not in resume_words]
+    matched = [keyword for keyword in job_keywords if keyword in resume_words]
+    return missing[:MAX_GAP_SKILLS], matched
+
+
+def gap_signature(bucket: str, missing_skills: List[str]) -> str:
+    """Cache key: the role bucket plus the missing skills in sorted order"""
+    payload = json.dumps([LEARNING_PATH_CACHE_VERSION, bucket, sorted(missing_skills)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def personalize_learning_path(
+    learning_path: Dict[str, Any],
+    missing_skills: List[str],
+    matched_skills: List[str],
+    target_role: str
+) -> Dict[str, Any]:
+    """
+    Per-candidate copy of a shared path: skills ordered by how much this
+    job stresses them, plus what the resume already covers
+    """
+    path = copy.deepcopy(learning_path)
+    rank = {skill: index for index, skill in enumerate(missing_skills)}
+
+    items = path.get("learning_path") or []
+    path["learning_path"] = sorted(
+        items,
+        key=lambda item: rank.get(str(item.get("skill", "")).lower(), len(rank)) if isinstance(item, dict) else len(rank)
+    )
+    path["skill_gaps"] = list(missing_skills)
+    path["matched_skills"] = matched_skills[:10]
+    path["target_role"] = target_role
+
+    if matched_skills:
+        covered = ", ".join(matched_skills[:3])
+        path["career_advice"] = (
+            f"You already cover {covered} from this role's requirements. "
+            f"{path.get('career_advice') or ''}"
+        ).strip()
+    return path
+
+
+def _is_fresh(entry: LearningPathCache) -> bool:
+    generated_at = entry.generated_at
+    if generated_at is None:
+        return False
+    if generated_at.tzinfo is None:
+        generated_at = generated_at.replace(tzinfo=timezone.utc)
+    max_age = timedelta(days=settings.LEARNING_PATH_CACHE_TTL_DAYS)
+    return datetime.now(timezone.utc) - generated_at < max_age
+
+
+async def get_learning_path(
+    db: Session,
+    gemini_service,
+    resume_text: str,
+    job_description: Optional[str],
+    job_title: Optional[str] = None
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Learning path for one resume and job, plus how it was served: "hit"
+    (shared path reused), "miss" (generated and stored) or "bypass" (no
+    detectable gap, generated from the full resume). Caller commits.
+    """
+    bucket = role_bucket(job_title, job_description)
+    missing, matched = skill_gap(resume_text, job_description or "", bucket)
+
+    if not missing:
+        learning_path = await gemini_service.generate_learning_path(resume_text, job_description)
+        record_cache("learning_path", "bypass")
+        return learning_path, "bypass"
+
+    signature = gap_signature(bucket, missing)
+    # Session work runs in a thread so the caller's event loop (e.g. the
+    # worker loop shared by every task) is never blocked on the database
+    entry, learning_path = await asyncio.to_thread(_lookup_entry, db, signature)
+
+    if learning_path is not None:
+        status = "hit"
+    else:
+        status = "miss"
+        learning_path = await gemini_service.generate_skill_gap_learning_path(bucket, sorted(missing))
+        await asyncio.to_thread(_save_entry, db, entry, signature, bucket, missing, learning_path)
+
+    record_cache("learning_path", status)
+    logger.info(f"Learning path cache {status} for '{bucket}' ({len(missing)} missing skills)")
+    return personalize_learning_path(learning_path, missing, matched, job_title or bucket), status
+
+
+def _lookup_entry(db: Session, signature: str) -> Tuple[Optional[LearningPathCache], Optional[Dict[str, Any]]]:
+    """The cache entry for a gap (if any) and its path if still fresh, counting the hit"""
+    entry = db.query(LearningPathCache).filter(LearningPathCache.signature == signature).first()
+    if entry is None or not _is_fresh(entry):
+        return entry, None
+
+    db.query(LearningPathCache).filter(LearningPathCache.id == entry.id).update(
+        {
+            LearningPathCache.hit_count: LearningPathCache.hit_count + 1,
+            LearningPathCache.last_hit_at: func.now(),
+        },
+        synchronize_session=False
+    )
+    return entry, entry.learning_path
+
+
+def _save_entry(
+    db: Session,
+    entry: Optional[LearningPathCache],
+    signature: str,
+    bucket: str,
+    missing: List[str],
+    learning_path: Dict[str, Any]
+):
+    """Refresh a stale entry in place, or store a new one"""
+    if entry is not None:
+        entry.learning_path = learning_path
+        entry.generation_count = LearningPathCache.generation_count + 1
+        entry.generated_at = func.now()
+    else:
+        _store_entry(db, signature, bucket, missing, learning_path)
+
+
+def _store_entry(db: Session, signature: str, bucket: str, missing: List[str], learning_path: Dict[str, Any]):
+    """Insert a new entry; if a concurrent request stored the same gap first, count ours as a regeneration"""
+    try:
+        with db.begin_nested():
+            db.add(LearningPathCache(
+                signature=signature,
+                role_bucket=bucket,
+                missing_skills=sorted(missing),
+                learning_path=learning_path,
+            ))
+    except IntegrityError:
+        db.query(LearningPathCache).filter(LearningPathCache.signature == signature).update(
+            {LearningPathCache.generation_count: LearningPathCache.generation_count + 1},
+            synchronize_session=False
+        )
+
+
+def learning_path_cache_report(db: Session, start_date: datetime, end_date: datetime, top: int = 10) -> Dict[str, Any]:
+    """
+    Hit rate over a period from the per-request analytics events, plus
+    lifetime totals and the most reused gaps from the cache table
+    """
+    statuses = db.query(Analytics.meta_data).filter(
+        Analytics.action_type == ActionType.LEARNING_PATH_GENERATION,
+        Analytics.created_at >= start_date,
+        Analytics.created_at <= end_date
+    )
+
+    counts = {"hit": 0, "miss": 0, "bypass": 0}
+    for (meta_data,) in statuses:
+        status = (meta_data or {}).get(CACHE_STATUS_KEY)
+        if status in counts:
+            counts[status] += 1
+
+    requests = sum(counts.values())
+    totals = db.query(
+        func.count(LearningPathCache.id),
+        func.coalesce(func.sum(LearningPathCache.hit_count), 0),
+        func.coalesce(func.sum(LearningPathCache.generation_count), 0),
+    ).one()
+
+    top_entries = db.query(
+        LearningPathCache.role_bucket,
+        LearningPathCache.missing_skills,
+        LearningPathCache.hit_count,
+    ).order_by(LearningPathCache.hit_count.desc()).limit(top).all()
+
+    return {
+        "period_start": start_date,
+        "period_end": end_date,
+        "requests": requests,
+        "hits": counts["hit"],
+        "misses": counts["miss"],
+        "bypassed": counts["bypass"],
+        "hit_rate": round(counts["hit"] / requests, 4) if requests else 0.0,
+        "llm_calls": counts["miss"] + counts["bypass"],
+        "llm_calls_saved": counts["hit"],
+        "cache_entries": totals[0],
+        "lifetime_hits": int(totals[1]),
+        "lifetime_generations": int(totals[2]),
+        "top_gaps": [
+            {"role": row.role_bucket, "missing_skills": row.missing_skills, "hits": row.hit_count}
+            for row in top_entries
+        ],
+    }
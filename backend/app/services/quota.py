@@ -0,0 +1,353 @@
+"""
+Usage Quotas
+Per-feature usage counters in Redis for metered features, so a request
+that uses a quota increments one key instead of updating and locking the
+user's row.
+
+The allowance is kept on the user row (e.g. remaining_enhancements) and,
+while a user is using a feature, mirrored in Redis next to their usage
+since the last flush: a use is allowed while usage does not exceed the
+mirrored allowance. The mirror is seeded from the request's principal
+the first time it is needed. flush_quota_usage() (Celery beat) moves
+usage into the row, which remains the durable record, and then lowers
+usage and the mirror together, so a request holding a principal loaded
+before the flush is still checked against the current balance. The mirror
+is only reseeded from the row once it expires (ALLOWANCE_TTL idle), so
+nothing may raise the allowance on the row while it exists; nothing
+currently does. remaining_quota() is what the API reports, as the row
+alone misses usage since the last flush. If Redis is unreachable, usage
+falls back to a guarded UPDATE ... RETURNING on the row.
+
+Rate-style limits (uploads per week or month) are rolling windows: usage
+is counted in time buckets that expire on their own, so nothing has to
+be reset and no row is written.
+
+Both counters check and count a use in one Lua script, so under any
+number of concurrent requests exactly `limit` uses succeed; a refused use
+never touches the counters.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.entitlements import Feature
+from ..models.resume import Resume
+from ..models.user import SubscriptionType, User
+
+logger = logging.getLogger(__name__)
+
+# User column holding the allowance for each metered feature
+QUOTA_COLUMNS: Dict[Feature, str] = {
+    Feature.RESUME_ENHANCE: "remaining_enhancements",
+}
+
+DIRTY_KEY = "quota:dirty"
+
+# Rolling upload windows; free accounts are limited per week, paid plans per month
+UPLOAD_WINDOWS: Dict[SubscriptionType, timedelta] = {
+    SubscriptionType.FREE: timedelta(days=7),
+}
+DEFAULT_UPLOAD_WINDOW = timedelta(days=30)
+
+# record_upload() result when Redis was down: the stored resume is the count
+UNCOUNTED_UPLOAD = "uncounted"
+
+
+# Mirrored allowances expire once a user has been idle this long (seconds);
+# by then their usage has been flushed, so the next use reseeds from the row
+ALLOWANCE_TTL = 24 * 3600
+
+
+def usage_key(feature: Feature, user_id) -> str:
+    return f"quota:used:{feature.name.lower()}:{user_id}"
+
+
+def allowance_key(feature: Feature, user_id) -> str:
+    return f"quota:allowance:{feature.name.lower()}:{user_id}"
+
+
+# KEYS: allowance, usage, dirty set; ARGV: row allowance, amount, dirty member, ttl
+CONSUME_SCRIPT = """
+local allowance = redis.call('GET', KEYS[1])
+if not allowance then
+    allowance = ARGV[1]
+    redis.call('SET', KEYS[1], allowance)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local used = tonumber(redis.call('GET', KEYS[2]) or '0')
+if used + tonumber(ARGV[2]) > tonumber(allowance) then
+    return 0
+end
+redis.call('INCRBY', KEYS[2], ARGV[2])
+redis.call('SADD', KEYS[3], ARGV[3])
+return 1
+"""
+
+# KEYS: allowance, usage, dirty set; ARGV: usage moved into the row, dirty member
+SETTLE_SCRIPT = """
+local used = redis.call('DECRBY', KEYS[2], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('DECRBY', KEYS[1], ARGV[1])
+end
+if used == 0 then
+    redis.call('SREM', KEYS[3], ARGV[2])
+end
+"""
+
+# KEYS: window buckets, current last; ARGV: amount, limit (-1: none), ttl
+RECORD_SCRIPT = """
+local limit = tonumber(ARGV[2])
+if limit >= 0 then
+    local total = 0
+    for _, key in ipairs(KEYS) do
+        total = total + tonumber(redis.call('GET', key) or '0')
+    end
+    if total + tonumber(ARGV[1]) > limit then
+        return 0
+    end
+end
+redis.call('INCRBY', KEYS[#KEYS], ARGV[1])
+redis.call('EXPIRE', KEYS[#KEYS], ARGV[3])
+return KEYS[#KEYS]
+"""
+
+# KEYS: bucket the uses were recorded in; ARGV: amount. A bucket that
+# already left the window has expired and is not recreated
+RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('DECRBY', KEYS[1], ARGV[1])
+end
+"""
+
+
+class QuotaCounters:
+    """Usage counters for metered features, backed by a Redis client"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def used(self, feature: Feature, user_id) -> int:
+        return int(self.client.get(usage_key(feature, user_id)) or 0)
+
+    def remaining(self, feature: Feature, user_id, allowance: int) -> int:
+        """Uses left; `allowance` (from the row) only counts if none is mirrored"""
+        mirrored, used = self.client.mget([allowance_key(feature, user_id), usage_key(feature, user_id)])
+        if mirrored is not None:
+            allowance = int(mirrored)
+        return max(0, allowance - int(used or 0))
+
+    def consume(self, feature: Feature, user_id, allowance: int, amount: int = 1) -> bool:
+        """Record `amount` uses if they fit in the allowance; False (and nothing recorded) otherwise"""
+        return bool(self.client.eval(
+            CONSUME_SCRIPT, 3,
+            allowance_key(feature, user_id), usage_key(feature, user_id), DIRTY_KEY,
+            allowance, amount, f"{feature.name}:{user_id}", ALLOWANCE_TTL,
+        ))
+
+    def refund(self, feature: Feature, user_id, amount: int = 1):
+        """Give back uses for work that failed after consume()"""
+        # Usage can go negative if a flush ran in between; the flush credits it back
+        pipe = self.client.pipeline(transaction=False)
+        pipe.decrby(usage_key(feature, user_id), amount)
+        pipe.sadd(DIRTY_KEY, f"{feature.name}:{user_id}")
+        pipe.execute()
+
+    def flush(self, db: Session, batch_size: int = 500) -> int:
+        """
+        Move recorded usage into the user rows; returns the number of
+        counters flushed. The row is committed before usage and the
+        mirrored allowance are lowered (in one step), so a use is never
+        missing from both and the mirror always matches row less usage.
+        A counter leaves the dirty set in that same step, and only if no
+        use arrived meanwhile, so one that fails to flush is retried next
+        time; members added during a flush wait for the next one.
+        """
+        flushed = 0
+        for member in self.client.sscan_iter(DIRTY_KEY, count=batch_size):
+            if isinstance(member, bytes):
+                member = member.decode()
+            feature_name, user_id = member.split(":", 1)
+            feature = Feature[feature_name]
+            used = self.used(feature, user_id)
+            if used:
+                column = getattr(User, QUOTA_COLUMNS[feature])
+                try:
+                    db.execute(update(User).where(User.id == user_id).values({column: column - used}))
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+            self.client.eval(
+                SETTLE_SCRIPT, 3,
+                allowance_key(feature, user_id), usage_key(feature, user_id), DIRTY_KEY, used, member,
+            )
+            if used:
+                flushed += 1
+        return flushed
+
+
+class RollingWindow:
+    """
+    Uses per user in the trailing `window`, counted in `buckets` Redis keys
+    (one per window/buckets slice) that expire once they leave the window
+    """
+
+    def __init__(self, client, name: str, window: timedelta, buckets: int = 24):
+        self.client = client
+        self.name = name
+        self.window = int(window.total_seconds())
+        self.bucket_seconds = max(1, self.window // buckets)
+
+    def _keys(self, user_id, now: float):
+        current = int(now) // self.bucket_seconds
+        first = (int(now) - self.window) // self.bucket_seconds + 1
+        return [f"window:{self.name}:{user_id}:{bucket}" for bucket in range(first, current + 1)]
+
+    def count(self, user_id, now: Optional[float] = None) -> int:
+        keys = self._keys(user_id, time.time() if now is None else now)
+        return sum(int(value) for value in self.client.mget(keys) if value)
+
+    def record(self, user_id, limit: Optional[int] = None, amount: int = 1, now: Optional[float] = None) -> Optional[str]:
+        """
+        Count `amount` uses unless that takes the window past `limit` (None:
+        no limit); returns the bucket they were counted in, or None if refused
+        """
+        keys = self._keys(user_id, time.time() if now is None else now)
+        limit = -1 if limit is None else limit
+        bucket = self.client.eval(
+            RECORD_SCRIPT, len(keys), *keys, amount, limit, self.window + self.bucket_seconds,
+        )
+        if not bucket:
+            return None
+        return bucket.decode() if isinstance(bucket, bytes) else bucket
+
+    def release(self, bucket: str, amount: int = 1):
+        """Give back uses recorded (in `bucket`, as returned by record()) for work that failed"""
+        self.client.eval(RELEASE_SCRIPT, 1, bucket, amount)
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    import redis
+
+    return redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+@lru_cache(maxsize=1)
+def get_quota_counters() -> QuotaCounters:
+    return QuotaCounters(get_redis())
+
+
+@lru_cache(maxsize=None)
+def get_upload_window(subscription: SubscriptionType) -> RollingWindow:
+    window = UPLOAD_WINDOWS.get(subscription, DEFAULT_UPLOAD_WINDOW)
+    return RollingWindow(get_redis(), f"uploads:{window.days}d", window)
+
+
+def remaining_quota(user: User, feature: Feature) -> int:
+    """Uses left for `user`; allowance less unflushed usage"""
+    allowance = getattr(user, QUOTA_COLUMNS[feature]) or 0
+    try:
+        return get_quota_counters().remaining(feature, user.id, allowance)
+    except Exception as e:
+        logger.warning(f"Quota counters unavailable: {str(e)}")
+        return allowance
+
+
+def consume_quota(db: Session, user: User, feature: Feature, amount: int = 1) -> bool:
+    """Use `amount` of the user's quota for `feature`; False if not enough is left"""
+    allowance = getattr(user, QUOTA_COLUMNS[feature]) or 0
+    try:
+        return get_quota_counters().consume(feature, user.id, allowance, amount)
+    except Exception as e:
+        logger.warning(f"Quota counters unavailable, using the database: {str(e)}")
+    return consume_quota_in_database(db, user.id, feature, amount) is not None
+
+
+def consume_quota_in_database(db: Session, user_id, feature: Feature, amount: int = 1) -> Optional[int]:
+    """
+    Take `amount` from the row's allowance in one guarded statement;
+    returns what is left, or None if there was not enough
+    """
+    column = getattr(User, QUOTA_COLUMNS[feature])
+    remaining = db.execute(
+        update(User)
+        .where(User.id == user_id, column >= amount)
+        .values({column: column - amount})
+        .returning(column)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    db.commit()
+    return remaining
+
+
+def refund_quota(db: Session, user: User, feature: Feature, amount: int = 1):
+    try:
+        get_quota_counters().refund(feature, user.id, amount)
+        return
+    except Exception as e:
+        logger.warning(f"Quota counters unavailable, using the database: {str(e)}")
+
+    column = getattr(User, QUOTA_COLUMNS[feature])
+    db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values({column: column + amount})
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def upload_limit(user: User) -> Optional[int]:
+    """The user's upload limit, or None while limits are not enforced"""
+    return user.get_upload_limit() if settings.ENFORCE_UPLOAD_LIMITS else None
+
+
+def uploads_in_window(db: Session, user: User) -> int:
+    """Uploads in the user's current rolling window"""
+    try:
+        return get_upload_window(user.subscription_type).count(user.id)
+    except Exception as e:
+        logger.warning(f"Upload window unavailable, counting resumes: {str(e)}")
+    return _stored_uploads(db, user)
+
+
+def _stored_uploads(db: Session, user: User) -> int:
+    window = UPLOAD_WINDOWS.get(user.subscription_type, DEFAULT_UPLOAD_WINDOW)
+    return db.query(func.count(Resume.id)).filter(
+        Resume.user_id == user.id,
+        Resume.created_at >= datetime.now(timezone.utc) - window,
+    ).scalar() or 0
+
+
+def record_upload(db: Session, user: User, amount: int = 1) -> Optional[str]:
+    """
+    Count an upload in the user's window; returns what to pass to
+    release_upload() if the upload fails, or None if it would pass their limit
+    """
+    limit = upload_limit(user)
+    try:
+        return get_upload_window(user.subscription_type).record(user.id, limit, amount)
+    except Exception as e:
+        logger.warning(f"Upload window unavailable, counting resumes: {str(e)}")
+    # Without Redis the check is not atomic with the upload; stored resumes are the count
+    if limit is None or _stored_uploads(db, user) + amount <= limit:
+        return UNCOUNTED_UPLOAD
+    return None
+
+
+def release_upload(user: User, bucket: str, amount: int = 1):
+    """Give back an upload counted by record_upload() (which returned `bucket`)"""
+    if bucket == UNCOUNTED_UPLOAD:
+        return
+    try:
+        get_upload_window(user.subscription_type).release(bucket, amount)
+    except Exception as e:
+        logger.warning(f"Upload window unavailable: {str(e)}")
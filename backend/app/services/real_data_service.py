@@ -10,8 +10,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from ..core.config import settings
 from ..models.user import User
-from ..models.resume import Resume, ResumeAnalysis
+from ..models.resume import Resume, ResumeAnalysis, ResumeFeatures
 from ..utils.file_processing import extract_text_from_file
+from .resume_features import build_resume_features
 
 logger = logging.getLogger(__name__)
 
@@ -53,10 +54,13 @@ class RealDataService:
                     filename=filename,
                     content=extracted_text,
                     file_type=file_path.split('.')[-1].lower(),
-                    processing_status="completed"
+                    processing_status="completed",
+                    character_count=len(extracted_text)
                 )
                 
+                # Sections, keywords, contact info and text stats in one pass
                 self.db.add(resume)
+                self.db.add(build_resume_features(resume, extracted_text))
                 self.db.commit()
                 self.db.refresh(resume)
                 
@@ -108,12 +112,20 @@ class RealDataService:
                     scores = [analysis.overall_score for analysis in reversed(recent_analyses)]
                     improvement_trend = scores
                 
+                # Text stats come from the stored features, not the raw content
+                avg_readability = self.db.query(
+                    func.avg(ResumeFeatures.readability_score)
+                ).join(Resume).filter(
+                    Resume.user_id == user_id
+                ).scalar()
+                
                 logger.info(f"Real analytics for user {user_id}: {resume_count} resumes, {avg_score:.1f} avg score")
                 
                 return {
                     "total_resumes": resume_count,
                     "average_score": round(avg_score, 1),
                     "improvement_trend": improvement_trend,
+                    "average_readability": round(float(avg_readability), 1) if avg_readability else None,
                     "last_activity": recent_analyses[0].created_at.isoformat() if recent_analyses else None,
                     "data_source": "real_database"
                 }
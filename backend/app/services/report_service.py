@@ -0,0 +1,412 @@
+"""
+Report Service
+Renders resume analysis reports (txt/pdf) and caches rendered output
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+from ..core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever report layout or content changes so cached renders are not reused.
+# Reports must render the same bytes for the same key: no render-time timestamps.
+REPORT_TEMPLATE_VERSION = 2
+
+BASIC_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('BACKGROUND', (1, 0), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+PERSONAL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+@lru_cache(maxsize=1)
+def get_report_styles() -> StyleSheet1:
+    """Sample stylesheet plus report styles, built once per process"""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=1  # Center
+    ))
+    styles.add(ParagraphStyle(
+        'ReportHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12,
+        textColor=colors.darkblue
+    ))
+    return styles
+
+
+def _group_feedback(feedback: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group flat Gemini feedback items into report categories"""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for item in feedback or []:
+        if 'items' in item:
+            grouped.setdefault(item.get('category', 'general'), []).extend(item['items'])
+            continue
+        grouped.setdefault(item.get('category', 'general'), []).append({
+            'issue': item.get('you_have') or item.get('job_wants') or 'N/A',
+            'suggestion': item.get('fix', 'N/A'),
+            'severity': item.get('priority', 'N/A'),
+        })
+    return [{'category': category, 'items': items} for category, items in grouped.items()]
+
+
+def build_report_data(analysis, features) -> Dict[str, Any]:
+    """Report payload from the latest analysis and the stored resume features"""
+    contact = features.contact_info or {}
+    sections = features.sections or {}
+    result = analysis.analysis_data or {}
+    
+    return {
+        "score": analysis.overall_score,
+        "ats_score": analysis.ats_score,
+        "analyzed_at": analysis.created_at.isoformat() if analysis.created_at else None,
+        "feedback": _group_feedback(result.get('feedback', [])),
+        "strengths": analysis.strengths or [],
+        "recommendations": analysis.recommendations or [],
+        "extracted_info": {
+            "name": contact.get('name') or 'N/A',
+            "contact": {
+                "email": contact.get('email') or 'N/A',
+                "phone": contact.get('phone') or 'N/A',
+                "location": 'N/A',
+                "linkedin": contact.get('linkedin'),
+                "github": contact.get('github'),
+            },
+            "summary": sections.get('summary') or 'No summary available',
+        },
+        "keywords": features.keywords or [],
+        "text_stats": {
+            "readability_score": features.readability_score,
+            **(features.word_stats or {}),
+        },
+    }
+
+
+def _analyzed_at(analysis_data: dict) -> str:
+    analyzed_at = analysis_data.get('analyzed_at')
+    if not analyzed_at:
+        return 'N/A'
+    return datetime.fromisoformat(analyzed_at).strftime('%Y-%m-%d %H:%M')
+
+
+def iter_text_report(analysis_data: dict, resume) -> Iterator[str]:
+    """
+    Yield a text report section by section so it can be streamed.
+    Joined together the chunks form the same text as generate_text_report.
+    """
+    yield "\n".join([
+        "RESUME ANALYSIS REPORT",
+        "=" * 50,
+        "",
+        f"Resume: {resume.filename}",
+        f"Analyzed: {_analyzed_at(analysis_data)}",
+        f"Overall Score: {analysis_data.get('score', 0)}/100",
+        f"ATS Score: {analysis_data.get('ats_score', 0)}/100",
+        "",
+        "PERSONAL INFORMATION:",
+        "-" * 20
+    ])
+    
+    if 'extracted_info' in analysis_data:
+        info = analysis_data['extracted_info']
+        yield _section([
+            f"Name: {info.get('name', 'N/A')}",
+            f"Email: {info.get('contact', {}).get('email', 'N/A')}",
+            f"Phone: {info.get('contact', {}).get('phone', 'N/A')}",
+            f"Location: {info.get('contact', {}).get('location', 'N/A')}",
+            "",
+            "SUMMARY:",
+            "-" * 8,
+            info.get('summary', 'No summary available'),
+            ""
+        ])
+    
+    if 'text_stats' in analysis_data:
+        stats = analysis_data['text_stats']
+        yield _section([
+            "TEXT STATISTICS:",
+            "-" * 16,
+            f"Words: {stats.get('words', 0)}",
+            f"Readability (Flesch): {stats.get('readability_score', 'N/A')}",
+            f"Top keywords: {', '.join(analysis_data.get('keywords', [])[:10]) or 'N/A'}",
+            ""
+        ])
+    
+    # Add feedback sections, one chunk per category
+    if 'feedback' in analysis_data:
+        yield _section([
+            "DETAILED FEEDBACK BY CATEGORY:",
+            "-" * 35,
+            ""
+        ])
+        
+        for category in analysis_data['feedback']:
+            lines = [
+                f"{category.get('category', 'Unknown').upper()}:",
+                ""
+            ]
+            
+            for item in category.get('items', []):
+                lines.extend([
+                    f"  Issue: {item.get('issue', 'N/A')}",
+                    f"  Suggestion: {item.get('suggestion', 'N/A')}",
+                    f"  Severity: {item.get('severity', 'N/A')}",
+                    ""
+                ])
+            yield _section(lines)
+    
+    # Add experience section
+    if 'extracted_info' in analysis_data and 'experience' in analysis_data['extracted_info']:
+        lines = [
+            "EXPERIENCE:",
+            "-" * 11,
+            ""
+        ]
+        
+        for i, exp in enumerate(analysis_data['extracted_info']['experience'], 1):
+            lines.extend([
+                f"{i}. {exp.get('title', 'N/A')} at {exp.get('company', 'N/A')}",
+                f"   Duration: {exp.get('duration', 'N/A')}",
+                "   Achievements:"
+            ])
+            
+            for achievement in exp.get('achievements', []):
+                lines.append(f"   - {achievement}")
+            
+            lines.append("")
+        yield _section(lines)
+
+
+
+def _section(lines: List[str]) -> str:
+    """Continuation chunk: the newline joining it to the previous chunk plus its lines"""
+    return "\n" + "\n".join(lines)
+
+
+def generate_text_report(analysis_data: dict, resume) -> str:
+    """Generate a text-based report"""
+    return "".join(iter_text_report(analysis_data, resume))
+
+
+def iter_json(data: Any) -> Iterator[str]:
+    """Encode JSON incrementally instead of building one large string"""
+    return json.JSONEncoder(indent=2, default=str).iterencode(data)
+
+
+def generate_pdf_report(analysis_data: dict, resume) -> bytes:
+    """Generate a PDF report using ReportLab"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    
+    styles = get_report_styles()
+    
+    story = []
+    
+    # Title
+    story.append(Paragraph("Resume Analysis Report", styles['ReportTitle']))
+    story.append(Spacer(1, 12))
+    
+    # Basic info
+    story.append(Paragraph("Report Summary", styles['ReportHeading']))
+    basic_info = [
+        ['Resume:', resume.filename or 'Unnamed Resume'],
+        ['Analyzed:', _analyzed_at(analysis_data)],
+        ['Overall Score:', f"{analysis_data.get('score', 0)}/100"],
+        ['ATS Score:', f"{analysis_data.get('ats_score', 0)}/100"],
+        ['Readability:', str(analysis_data.get('text_stats', {}).get('readability_score', 'N/A'))],
+    ]
+    
+    basic_table = Table(basic_info, colWidths=[2*inch, 4*inch])
+    basic_table.setStyle(BASIC_TABLE_STYLE)
+    
+    story.append(basic_table)
+    story.append(Spacer(1, 20))
+    
+    # Personal Information
+    if 'extracted_info' in analysis_data:
+        info = analysis_data['extracted_info']
+        story.append(Paragraph("Personal Information", styles['ReportHeading']))
+        
+        personal_info = [
+            ['Name:', info.get('name', 'N/A')],
+            ['Email:', info.get('contact', {}).get('email', 'N/A')],
+            ['Phone:', info.get('contact', {}).get('phone', 'N/A')],
+            ['Location:', info.get('contact', {}).get('location', 'N/A')],
+        ]
+        
+        personal_table = Table(personal_info, colWidths=[2*inch, 4*inch])
+        personal_table.setStyle(PERSONAL_TABLE_STYLE)
+        
+        story.append(personal_table)
+        story.append(Spacer(1, 20))
+        
+        # Summary
+        if info.get('summary'):
+            story.append(Paragraph("Professional Summary", styles['ReportHeading']))
+            story.append(Paragraph(info['summary'], styles['Normal']))
+            story.append(Spacer(1, 20))
+    
+    # Feedback sections
+    if 'feedback' in analysis_data:
+        story.append(Paragraph("Detailed Feedback", styles['ReportHeading']))
+        
+        for category in analysis_data['feedback']:
+            cat_title = category.get('category', 'Unknown').title()
+            story.append(Paragraph(cat_title, styles['Heading3']))
+            
+            for item in category.get('items', []):
+                issue_text = f"<b>Issue:</b> {item.get('issue', 'N/A')}"
+                suggestion_text = f"<b>Suggestion:</b> {item.get('suggestion', 'N/A')}"
+                severity_text = f"<b>Severity:</b> {item.get('severity', 'N/A').title()}"
+                
+                story.append(Paragraph(issue_text, styles['Normal']))
+                story.append(Paragraph(suggestion_text, styles['Normal']))
+                story.append(Paragraph(severity_text, styles['Normal']))
+                story.append(Spacer(1, 12))
+
+    
+    # Build PDF
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.read()
+
+
+class ReportCache:
+    """
+    Rendered reports on disk, keyed by resume, analysis, resume content,
+    format and template version. The key doubles as the ETag, so
+    conditional requests are answered without rendering or reading files.
+
+    Entries are bounded in total size and idle age: a hit refreshes the
+    file's mtime, and every prune_every writes the least recently used
+    files are removed until the cache fits.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: timedelta = timedelta(days=7),
+        prune_every: int = 50
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.prune_every = max(1, prune_every)
+        self._writes = 0
+
+    @staticmethod
+    def make_key(resume_id, analysis_id, content_hash: str, fmt: str) -> str:
+        raw = f"{resume_id}:{analysis_id}:{content_hash}:{fmt}:v{REPORT_TEMPLATE_VERSION}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def etag(key: str) -> str:
+        return f'"{key}"'
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """True if an If-None-Match header value covers this ETag"""
+        if not if_none_match:
+            return False
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        return "*" in candidates or any(
+            candidate.removeprefix("W/") == etag for candidate in candidates
+        )
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.cache_dir / f"{key}.{fmt}"
+
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        path = self._path(key, fmt)
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            record_cache("report", "miss")
+            return None
+        record_cache("report", "hit")
+        return content
+
+    def put(self, key: str, fmt: str, content: bytes) -> None:
+        """Write atomically so concurrent requests never read a partial file"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+            os.replace(tmp_path, self._path(key, fmt))
+        except OSError as e:
+            # A failed cache write should never fail the download
+            logger.warning(f"Could not cache report {key}.{fmt}: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Remove idle entries, then the least recently used until under max_bytes; returns files removed"""
+        if not self.cache_dir.is_dir():
+            return 0
+
+        entries = []
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+        entries.sort()
+
+        expire_before = time.time() - self.max_age.total_seconds()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if mtime >= expire_before and total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"Pruned {removed} cached report(s)")
+        return removed
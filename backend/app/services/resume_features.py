@@ -0,0 +1,90 @@
+"""
+Resume Features Service
+Stores text features once per resume version so analysis, matching,
+reports and analytics read them instead of re-deriving from raw text
+"""
+
+import logging
+from typing import Dict, Any, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models.resume import Resume, ResumeFeatures
+from ..utils.text_features import compute_resume_features, content_hash, FEATURES_PIPELINE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Columns filled from compute_resume_features()
+FEATURE_COLUMNS = [
+    "content_hash",
+    "pipeline_version",
+    "sections",
+    "keywords",
+    "contact_info",
+    "word_stats",
+    "readability_score",
+]
+
+
+def build_resume_features(resume: Resume, text: Optional[str] = None) -> ResumeFeatures:
+    """Run the feature pipeline for a resume's text and return an unsaved row"""
+    features = compute_resume_features(text if text is not None else resume.content or "")
+
+    return ResumeFeatures(
+        resume=resume,
+        content_hash=features["content_hash"],
+        pipeline_version=features["pipeline_version"],
+        sections=features["sections"],
+        keywords=features["keywords"],
+        contact_info=features["contact_info"],
+        word_stats=features["word_stats"],
+        readability_score=features["readability_score"],
+    )
+
+
+def _stored_features(db: Session, resume_id, current_hash: str) -> Optional[ResumeFeatures]:
+    return db.query(ResumeFeatures).filter(
+        ResumeFeatures.resume_id == resume_id,
+        ResumeFeatures.content_hash == current_hash
+    ).first()
+
+
+def get_resume_features(db: Session, resume: Resume) -> ResumeFeatures:
+    """
+    Features for the resume's current content. Computed and upserted only
+    when this version has no up-to-date row yet (caller commits), so two
+    first reads of the same version do not race on the unique constraint.
+    """
+    current_hash = content_hash(resume.content or "")
+    features = _stored_features(db, resume.id, current_hash)
+
+    if features and features.pipeline_version >= FEATURES_PIPELINE_VERSION:
+        return features
+
+    logger.info(f"Computing text features for resume {resume.id}")
+    computed = compute_resume_features(resume.content or "")
+
+    stmt = insert(ResumeFeatures).values(
+        resume_id=resume.id,
+        **{column: computed[column] for column in FEATURE_COLUMNS}
+    )
+    db.execute(stmt.on_conflict_do_update(
+        constraint="uq_resume_features_version",
+        set_={column: stmt.excluded[column] for column in FEATURE_COLUMNS},
+        # Rows from an older pipeline are replaced in place; a concurrent insert is kept
+        where=ResumeFeatures.pipeline_version < stmt.excluded.pipeline_version,
+    ))
+
+    if features is not None:
+        db.expire(features)
+    return _stored_features(db, resume.id, current_hash)
+
+
+def features_summary(features: ResumeFeatures) -> Dict[str, Any]:
+    """Compact view of stored features for API responses"""
+    return {
+        "keywords": features.keywords or [],
+        "word_stats": features.word_stats or {},
+        "readability_score": features.readability_score,
+        "contact_info": features.contact_info or {},
+    }
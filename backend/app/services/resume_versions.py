@@ -0,0 +1,140 @@
+"""
+Resume Version Store
+Keeps periodic full snapshots plus line deltas between them, so storage
+grows with edit size and any version is rebuilt from at most
+SNAPSHOT_INTERVAL - 1 deltas
+"""
+
+import logging
+from typing import List, Dict, Any
+
+from sqlalchemy.orm import Session
+
+from ..models.resume import Resume, ResumeVersion
+from ..utils.text_delta import make_delta, apply_delta, delta_size, diff_texts
+
+logger = logging.getLogger(__name__)
+
+# A full snapshot is written at least every SNAPSHOT_INTERVAL versions
+SNAPSHOT_INTERVAL = 10
+
+# ...or earlier, once the deltas since the last snapshot add up to this
+# fraction of the text, at which point replaying them stops paying off
+MAX_DELTA_RATIO = 0.5
+
+
+class VersionNotFoundError(LookupError):
+    """Requested resume version does not exist"""
+
+
+def _versions_from_snapshot(db: Session, resume_id, version_number: int) -> List[ResumeVersion]:
+    """The nearest snapshot at or before version_number, then every delta up to it"""
+    snapshot_number = db.query(ResumeVersion.version_number).filter(
+        ResumeVersion.resume_id == resume_id,
+        ResumeVersion.is_snapshot.is_(True),
+        ResumeVersion.version_number <= version_number
+    ).order_by(ResumeVersion.version_number.desc()).limit(1).scalar()
+
+    if snapshot_number is None:
+        raise VersionNotFoundError(f"No snapshot for resume {resume_id} version {version_number}")
+
+    return db.query(ResumeVersion).filter(
+        ResumeVersion.resume_id == resume_id,
+        ResumeVersion.version_number >= snapshot_number,
+        ResumeVersion.version_number <= version_number
+    ).order_by(ResumeVersion.version_number).all()
+
+
+def _rebuild(chain: List[ResumeVersion]) -> str:
+    content = chain[0].content or ""
+    for version in chain[1:]:
+        content = apply_delta(content, version.delta or [])
+    return content
+
+
+def get_version_content(db: Session, resume_id, version_number: int) -> str:
+    """Full text of one version"""
+    chain = _versions_from_snapshot(db, resume_id, version_number)
+    if chain[-1].version_number != version_number:
+        raise VersionNotFoundError(f"Resume {resume_id} has no version {version_number}")
+    return _rebuild(chain)
+
+
+def add_resume_version(db: Session, resume: Resume, content: str) -> ResumeVersion:
+    """
+    Append a version and mark it current. Stored as a delta against the
+    previous version unless a snapshot is due. Caller commits.
+    """
+    latest = db.query(ResumeVersion).filter(
+        ResumeVersion.resume_id == resume.id
+    ).order_by(ResumeVersion.version_number.desc()).first()
+
+    version_number = latest.version_number + 1 if latest else 1
+    version = ResumeVersion(
+        resume_id=resume.id,
+        version_number=version_number,
+        content_length=len(content),
+        is_current=True,
+    )
+
+    if latest is None:
+        version.is_snapshot = True
+        version.content = content
+    else:
+        chain = _versions_from_snapshot(db, resume.id, latest.version_number)
+        delta = make_delta(_rebuild(chain), content)
+        pending_delta = sum(delta_size(v.delta or []) for v in chain[1:]) + delta_size(delta)
+
+        if len(chain) >= SNAPSHOT_INTERVAL or pending_delta > MAX_DELTA_RATIO * max(len(content), 1):
+            version.is_snapshot = True
+            version.content = content
+        else:
+            version.is_snapshot = False
+            version.delta = delta
+
+        db.query(ResumeVersion).filter(
+            ResumeVersion.resume_id == resume.id,
+            ResumeVersion.is_current.is_(True)
+        ).update({ResumeVersion.is_current: False}, synchronize_session=False)
+
+    db.add(version)
+    logger.info(
+        f"Resume {resume.id} version {version_number} stored as "
+        f"{'snapshot' if version.is_snapshot else 'delta'}"
+    )
+    return version
+
+
+def list_versions(db: Session, resume_id) -> List[Dict[str, Any]]:
+    """Version metadata without rebuilding any text"""
+    rows = db.query(
+        ResumeVersion.version_number,
+        ResumeVersion.is_snapshot,
+        ResumeVersion.is_current,
+        ResumeVersion.content_length,
+        ResumeVersion.created_at,
+    ).filter(
+        ResumeVersion.resume_id == resume_id
+    ).order_by(ResumeVersion.version_number).all()
+
+    return [
+        {
+            "version_number": row.version_number,
+            "is_snapshot": row.is_snapshot,
+            "is_current": row.is_current,
+            "content_length": row.content_length,
+            "created_at": row.created_at,
+        }
+        for row in rows
+    ]
+
+
+def diff_versions(db: Session, resume_id, from_version: int, to_version: int) -> Dict[str, Any]:
+    """Unified diff between two versions"""
+    old = get_version_content(db, resume_id, from_version)
+    new = get_version_content(db, resume_id, to_version)
+    return {
+        "from_version": from_version,
+        "to_version": to_version,
+        **diff_texts(old, new, f"v{from_version}", f"v{to_version}"),
+    }
@@ -0,0 +1,163 @@
+"""
+Section Analysis Service
+Incremental resume analysis: each section's feedback is memoized by a hash
+of its text, so re-analysis after an edit only sends changed sections.
+Only the current text of each section is kept, for the resume's
+SECTION_ANALYSIS_MAX_JOBS most recently analyzed job descriptions.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import record_cache
+from ..models.resume import Resume, ResumeSectionAnalysis
+from ..utils.section_parser import SECTION_HEADERS
+from .resume_features import get_resume_features
+
+logger = logging.getLogger(__name__)
+
+# contact_info is not analyzed; only the content sections are
+ANALYZED_SECTIONS = list(SECTION_HEADERS.keys())
+
+
+def text_hash(text: Optional[str]) -> str:
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def merge_section_results(sections: Dict[str, str], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-section results into the shape analyze_resume_content returns.
+    Scores are averaged weighted by section length; lists are concatenated.
+    """
+    weights = {name: max(1, len(sections[name].split())) for name in results}
+    total_weight = sum(weights.values()) or 1
+
+    def weighted(field: str) -> int:
+        return round(sum(results[name].get(field, 0) * weights[name] for name in results) / total_weight)
+
+    strengths: List[str] = []
+    feedback: List[Dict[str, Any]] = []
+    recommendations: List[str] = []
+    missing_keywords: List[str] = []
+    for name, result in results.items():
+        strengths.extend(result.get("strengths", []))
+        feedback.extend({**item, "section": name} for item in result.get("feedback", []) if isinstance(item, dict))
+        recommendations.extend(result.get("recommendations", []))
+        missing_keywords.extend(result.get("missing_keywords", []))
+
+    overall_score = weighted("score")
+    return {
+        "overall_score": overall_score,
+        "ats_score": weighted("ats_score"),
+        "strengths": strengths,
+        "feedback": feedback,
+        "recommendations": list(dict.fromkeys(recommendations)),
+        "keyword_analysis": {
+            "missing_keywords": list(dict.fromkeys(missing_keywords)),
+            "keyword_density": "Assessed per section",
+        },
+        "content_score": overall_score,
+        "section_scores": {name: results[name].get("score", 0) for name in results},
+    }
+
+
+def _drop_oldest_jobs(db: Session, resume_id):
+    """Keep memoized feedback for the resume's most recently analyzed job descriptions only"""
+    stale_jobs = db.query(ResumeSectionAnalysis.job_hash).filter(
+        ResumeSectionAnalysis.resume_id == resume_id
+    ).group_by(
+        ResumeSectionAnalysis.job_hash
+    ).order_by(
+        func.max(ResumeSectionAnalysis.created_at).desc()
+    ).offset(settings.SECTION_ANALYSIS_MAX_JOBS).all()
+    if stale_jobs:
+        db.query(ResumeSectionAnalysis).filter(
+            ResumeSectionAnalysis.resume_id == resume_id,
+            ResumeSectionAnalysis.job_hash.in_([row.job_hash for row in stale_jobs])
+        ).delete(synchronize_session=False)
+
+
+async def analyze_resume_incremental(
+    db: Session,
+    resume: Resume,
+    gemini_service,
+    job_description: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Analyze a resume section by section, reusing memoized feedback for
+    unchanged sections. Returns None if no sections were detected, in
+    which case the caller should run a full analysis. Caller commits.
+    """
+    stored_sections = get_resume_features(db, resume).sections or {}
+    sections = {
+        name: stored_sections[name]
+        for name in ANALYZED_SECTIONS
+        if (stored_sections.get(name) or "").strip()
+    }
+    if not sections:
+        return None
+
+    job_hash = text_hash(job_description)
+    hashes = {name: text_hash(text) for name, text in sections.items()}
+
+    cached_rows = db.query(ResumeSectionAnalysis).filter(
+        ResumeSectionAnalysis.resume_id == resume.id,
+        ResumeSectionAnalysis.job_hash == job_hash,
+        ResumeSectionAnalysis.section_hash.in_(list(hashes.values()))
+    ).all()
+    results = {
+        row.section: row.result
+        for row in cached_rows
+        if hashes.get(row.section) == row.section_hash
+    }
+
+    changed = {name: text for name, text in sections.items() if name not in results}
+    if changed:
+        fresh = await gemini_service.analyze_resume_sections(changed, job_description)
+
+        # Feedback for earlier versions of the sections that changed is
+        # stale against every job description, not just this one
+        for name in fresh:
+            db.query(ResumeSectionAnalysis).filter(
+                ResumeSectionAnalysis.resume_id == resume.id,
+                ResumeSectionAnalysis.section == name,
+                (ResumeSectionAnalysis.section_hash != hashes[name]) | (ResumeSectionAnalysis.job_hash == job_hash)
+            ).delete(synchronize_session=False)
+
+        for name, result in fresh.items():
+            db.add(ResumeSectionAnalysis(
+                resume_id=resume.id,
+                section=name,
+                section_hash=hashes[name],
+                job_hash=job_hash,
+                result=result,
+                # Wall-clock time, not transaction start, so _drop_oldest_jobs can order jobs
+                created_at=datetime.now(timezone.utc),
+            ))
+            results[name] = result
+
+        # Sessions do not autoflush; the new rows must count as the latest job
+        db.flush()
+        _drop_oldest_jobs(db, resume.id)
+
+    if not results:
+        return None
+
+    logger.info(
+        f"Incremental analysis for resume {resume.id}: "
+        f"{len(changed)} section(s) analyzed, {len(sections) - len(changed)} reused"
+    )
+
+    analysis = merge_section_results(sections, results)
+    analysis["sections_analyzed"] = sorted(changed)
+    analysis["sections_reused"] = sorted(set(sections) - set(changed))
+    record_cache("section_analysis", "hit", len(analysis["sections_reused"]))
+    record_cache("section_analysis", "miss", len(changed))
+    return analysis
@@ -0,0 +1,210 @@
+"""
+Stripe Event Processing
+Webhook intake stores each verified event in stripe_events (keyed by the
+Stripe event id, so redeliveries are no-ops) and returns at once; the
+events are applied afterwards by Celery tasks.
+
+Each customer's events are applied in order of Stripe's created time by
+one worker at a time (a per-customer advisory lock), against a single
+User lookup and one commit per batch. An event that fails stops the
+customer's later events until it is retried successfully or has used up
+STRIPE_EVENT_MAX_ATTEMPTS; after that it is left as failed and the rest
+go ahead. Events for a customer id no user has yet stay pending until
+the periodic sweep finds the user; each lookup counts as an attempt, and
+after STRIPE_EVENT_MAX_ORPHAN_ATTEMPTS they are marked orphaned so the
+sweep stops returning to them. The sweep takes customers oldest event
+first.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.billing import StripeEvent
+from ..models.user import SubscriptionType, User
+
+logger = logging.getLogger(__name__)
+
+# Paid period assumed until Stripe reports the next renewal
+BILLING_PERIOD = timedelta(days=30)
+
+PLAN_TYPES = {subscription.value for subscription in SubscriptionType}
+
+
+def _plan_type(subscription: Dict[str, Any]) -> Optional[SubscriptionType]:
+    plan_type = (subscription.get("metadata") or {}).get("plan_type")
+    return SubscriptionType(plan_type) if plan_type in PLAN_TYPES else None
+
+
+def apply_subscription_created(user: User, subscription: Dict[str, Any], event_time: datetime):
+    plan_type = _plan_type(subscription)
+    if plan_type is not None:
+        user.subscription_type = plan_type
+        user.subscription_end_date = event_time + BILLING_PERIOD
+
+
+def apply_subscription_updated(user: User, subscription: Dict[str, Any], event_time: datetime):
+    if subscription.get("status") == "active":
+        plan_type = _plan_type(subscription)
+        if plan_type is not None:
+            user.subscription_type = plan_type
+    elif subscription.get("status") == "canceled":
+        user.subscription_type = SubscriptionType.FREE
+        user.subscription_end_date = None
+
+
+def apply_subscription_deleted(user: User, subscription: Dict[str, Any], event_time: datetime):
+    user.subscription_type = SubscriptionType.FREE
+    user.subscription_end_date = None
+
+
+def apply_payment_succeeded(user: User, invoice: Dict[str, Any], event_time: datetime):
+    if invoice.get("subscription"):
+        user.subscription_end_date = event_time + BILLING_PERIOD
+
+
+EVENT_HANDLERS: Dict[str, Callable[[User, Dict[str, Any], datetime], None]] = {
+    "customer.subscription.created": apply_subscription_created,
+    "customer.subscription.updated": apply_subscription_updated,
+    "customer.subscription.deleted": apply_subscription_deleted,
+    "invoice.payment_succeeded": apply_payment_succeeded,
+}
+
+
+def event_customer_id(event: Dict[str, Any]) -> Optional[str]:
+    obj = event.get("data", {}).get("object", {})
+    customer = obj.get("customer")
+    if isinstance(customer, dict):
+        customer = customer.get("id")
+    return customer
+
+
+def record_stripe_event(db: Session, event: Dict[str, Any]) -> bool:
+    """
+    Store a verified webhook event; returns False if it was already stored.
+    Event types without a handler (or without a customer) are kept as
+    ignored, for the record.
+    """
+    customer_id = event_customer_id(event)
+    handled = event["type"] in EVENT_HANDLERS and customer_id is not None
+    result = db.execute(
+        insert(StripeEvent)
+        .values(
+            id=event["id"],
+            type=event["type"],
+            customer_id=customer_id,
+            stripe_created_at=datetime.utcfromtimestamp(event["created"]),
+            payload=event,
+            status="pending" if handled else "ignored",
+            attempts=0,
+            received_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def enqueue_customer_events(customer_id: str):
+    """
+    Ask a worker to process the customer's pending events. The events are
+    already stored, so if the broker is unreachable the periodic sweep
+    picks them up instead.
+    """
+    try:
+        from ..workers.billing_tasks import process_stripe_customer_events
+
+        process_stripe_customer_events.apply_async((customer_id,), retry=False)
+    except Exception as e:
+        logger.warning(f"Could not enqueue Stripe events for {customer_id}, leaving them to the sweep: {str(e)}")
+
+
+def _processable():
+    return or_(
+        StripeEvent.status == "pending",
+        (StripeEvent.status == "failed") & (StripeEvent.attempts < settings.STRIPE_EVENT_MAX_ATTEMPTS),
+    )
+
+
+def _lock_customer(db: Session, customer_id: str) -> bool:
+    """Transaction-scoped lock so one worker applies a customer's events at a time"""
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return db.execute(
+        text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+        {"key": f"stripe_events:{customer_id}"},
+    ).scalar()
+
+
+def process_customer_events(db: Session, customer_id: str, batch_size: Optional[int] = None) -> int:
+    """Apply the customer's next batch of events in order; returns how many were applied"""
+    if not _lock_customer(db, customer_id):
+        # Another worker has this customer; anything it does not reach is left to the sweep
+        return 0
+
+    events: List[StripeEvent] = db.query(StripeEvent).filter(
+        StripeEvent.customer_id == customer_id,
+        _processable(),
+    ).order_by(
+        StripeEvent.stripe_created_at,
+        StripeEvent.received_at,
+    ).limit(batch_size or settings.STRIPE_EVENT_BATCH_SIZE).all()
+    if not events:
+        db.commit()
+        return 0
+
+    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    if user is None:
+        # The webhook can beat checkout to storing the customer id; the sweep
+        # retries until the attempts run out
+        orphaned = 0
+        for event in events:
+            event.attempts += 1
+            event.last_error = "No user with this Stripe customer id yet"
+            if event.status == "pending" and event.attempts >= settings.STRIPE_EVENT_MAX_ORPHAN_ATTEMPTS:
+                event.status = "orphaned"
+                orphaned += 1
+        if orphaned:
+            logger.warning(f"No user for Stripe customer {customer_id}, orphaned {orphaned} event(s)")
+        else:
+            logger.info(f"No user for Stripe customer {customer_id} yet, leaving {len(events)} event(s) pending")
+        db.commit()
+        return 0
+
+    applied = 0
+    for event in events:
+        # Attempts on a pending event were user lookups; count handler runs from here
+        event.attempts = event.attempts + 1 if event.status == "failed" else 1
+        try:
+            with db.begin_nested():
+                EVENT_HANDLERS[event.type](user, event.payload["data"]["object"], event.stripe_created_at)
+        except Exception as e:
+            logger.exception(f"Stripe event {event.id} ({event.type}) failed")
+            event.status = "failed"
+            event.last_error = str(e)[:1000]
+            # Later events for this customer wait, so they still apply after this one
+            break
+        event.status = "processed"
+        event.processed_at = datetime.utcnow()
+        applied += 1
+
+    db.commit()
+    return applied
+
+
+def pending_event_customers(db: Session, limit: int = 1000) -> List[str]:
+    """Customers with events to process, the one waiting longest first"""
+    rows = db.query(StripeEvent.customer_id).filter(
+        StripeEvent.customer_id.isnot(None),
+        _processable(),
+    ).group_by(
+        StripeEvent.customer_id,
+    ).order_by(
+        func.min(StripeEvent.stripe_created_at),
+    ).limit(limit).all()
+    return [row[0] for row in rows]
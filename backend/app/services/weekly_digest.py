@@ -0,0 +1,221 @@
+"""
+Weekly Digest Service
+Computes every active user's weekly stats in one set-based INSERT ... SELECT
+into a staging table, then sends the digests in key-range batches that mark
+and commit their rows every few dozen recipients, so a retried batch only
+sends what is still pending
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, and_, case, distinct, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from ..models.analytics import Analytics, ActionType
+from ..models.notification import WeeklyDigestStat
+from ..models.resume import Resume, ResumeAnalysis
+from ..models.user import User
+from .bulk_email import PROGRESS_BATCH_SIZE, chunked
+from .email_sender import SMTPSender
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = [
+    "week_start",
+    "user_id",
+    "resumes_analyzed",
+    "analyses_count",
+    "best_score",
+    "previous_best_score",
+    "improvement_score",
+    "actions_count",
+    "cover_letters_generated",
+]
+
+
+def digest_week_start(today: Optional[date] = None) -> date:
+    """Monday of the last full week before today"""
+    today = today or datetime.utcnow().date()
+    return today - timedelta(days=today.weekday() + 7)
+
+
+def digest_stats_select(week_start: date, user_ids: Optional[Sequence] = None):
+    """
+    One row per active user with activity in the week. Each source table is
+    aggregated once with GROUP BY; the best score before the week is read in
+    the same pass over resume_analyses as the week's own scores.
+    """
+    start = datetime.combine(week_start, time.min)
+    end = start + timedelta(days=7)
+    in_week = and_(ResumeAnalysis.created_at >= start, ResumeAnalysis.created_at < end)
+
+    analyses = (
+        select(
+            Resume.user_id.label("user_id"),
+            func.count(distinct(case((in_week, ResumeAnalysis.resume_id)))).label("resumes_analyzed"),
+            func.count(case((in_week, ResumeAnalysis.id))).label("analyses_count"),
+            func.max(case((in_week, ResumeAnalysis.overall_score))).label("best_score"),
+            func.max(case((ResumeAnalysis.created_at < start, ResumeAnalysis.overall_score))).label("previous_best_score"),
+        )
+        .join(Resume, Resume.id == ResumeAnalysis.resume_id)
+        .where(ResumeAnalysis.created_at < end)
+        .group_by(Resume.user_id)
+        .subquery()
+    )
+
+    activity = (
+        select(
+            Analytics.user_id.label("user_id"),
+            func.count(Analytics.id).label("actions_count"),
+            func.count(
+                case((Analytics.action_type == ActionType.COVER_LETTER_GENERATION, Analytics.id))
+            ).label("cover_letters_generated"),
+        )
+        .where(Analytics.created_at >= start, Analytics.created_at < end)
+        .group_by(Analytics.user_id)
+        .subquery()
+    )
+
+    improvement = case(
+        (analyses.c.best_score > analyses.c.previous_best_score,
+         analyses.c.best_score - analyses.c.previous_best_score),
+        else_=0.0
+    )
+
+    stmt = (
+        select(
+            literal(week_start, Date).label("week_start"),
+            User.id.label("user_id"),
+            func.coalesce(analyses.c.resumes_analyzed, 0).label("resumes_analyzed"),
+            func.coalesce(analyses.c.analyses_count, 0).label("analyses_count"),
+            analyses.c.best_score,
+            analyses.c.previous_best_score,
+            improvement.label("improvement_score"),
+            func.coalesce(activity.c.actions_count, 0).label("actions_count"),
+            func.coalesce(activity.c.cover_letters_generated, 0).label("cover_letters_generated"),
+        )
+        .select_from(User)
+        .outerjoin(analyses, analyses.c.user_id == User.id)
+        .outerjoin(activity, activity.c.user_id == User.id)
+        .where(
+            User.is_active.is_(True),
+            or_(analyses.c.analyses_count > 0, activity.c.actions_count > 0),
+        )
+    )
+    if user_ids is not None:
+        stmt = stmt.where(User.id.in_(user_ids))
+    return stmt
+
+
+def stage_weekly_digest_stats(db: Session, week_start: date) -> int:
+    """
+    Fill the staging table for the week in one statement; the rows never
+    pass through Python. A week that is already staged is left as it is.
+    """
+    staged = db.query(func.count()).select_from(WeeklyDigestStat).filter(
+        WeeklyDigestStat.week_start == week_start
+    ).scalar()
+    if staged:
+        logger.info(f"Weekly digest for {week_start} already staged: {staged} users")
+        return staged
+
+    result = db.execute(
+        insert(WeeklyDigestStat).from_select(STAT_COLUMNS, digest_stats_select(week_start))
+    )
+    db.commit()
+    logger.info(f"Staged weekly digest stats for {week_start}: {result.rowcount} users")
+    return result.rowcount
+
+
+def _pending(db: Session, week_start: date, lower=None, upper=None):
+    query = db.query(WeeklyDigestStat).filter(
+        WeeklyDigestStat.week_start == week_start,
+        WeeklyDigestStat.status == "pending"
+    )
+    if lower is not None:
+        query = query.filter(WeeklyDigestStat.user_id > lower)
+    if upper is not None:
+        query = query.filter(WeeklyDigestStat.user_id <= upper)
+    return query
+
+
+def digest_batch_bounds(db: Session, week_start: date, batch_size: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    (lower, upper] user id ranges of at most batch_size pending rows. Only
+    each batch's last id is fetched, walking the primary key index once.
+    """
+    bounds = []
+    lower = None
+    while True:
+        query = _pending(db, week_start, lower).with_entities(WeeklyDigestStat.user_id)
+        upper = query.order_by(WeeklyDigestStat.user_id).offset(batch_size - 1).limit(1).scalar()
+        if upper is None:
+            if query.first() is not None:
+                bounds.append((lower, None))
+            break
+        bounds.append((lower, upper))
+        lower = upper
+    return [(str(lo) if lo else None, str(up) if up else None) for lo, up in bounds]
+
+
+def send_digest_batch(
+    db: Session,
+    week_start: date,
+    lower: Optional[str],
+    upper: Optional[str],
+    build: Callable[[Any], Any],
+    sender: SMTPSender,
+    group_size: int = PROGRESS_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Send the pending digests in the range, marking them sent or failed and
+    committing after every group_size recipients
+    """
+    rows = _pending(db, week_start, lower, upper).join(
+        User, User.id == WeeklyDigestStat.user_id
+    ).with_entities(
+        WeeklyDigestStat.user_id,
+        User.email,
+        User.full_name,
+        WeeklyDigestStat.resumes_analyzed,
+        WeeklyDigestStat.improvement_score,
+    ).order_by(WeeklyDigestStat.user_id).all()
+
+    sent_count = failed_count = 0
+    for group in chunked(rows, group_size):
+        result = sender.send_many(build(row) for row in group)
+        failed_emails = set(result.failed_recipients)
+        sent_ids = [row.user_id for row in group if row.email not in failed_emails]
+        failed_ids = [row.user_id for row in group if row.email in failed_emails]
+
+        for status, user_ids in (("sent", sent_ids), ("failed", failed_ids)):
+            if user_ids:
+                db.query(WeeklyDigestStat).filter(
+                    WeeklyDigestStat.week_start == week_start,
+                    WeeklyDigestStat.user_id.in_(user_ids)
+                ).update(
+                    {WeeklyDigestStat.status: status, WeeklyDigestStat.sent_at: datetime.utcnow()},
+                    synchronize_session=False
+                )
+        db.commit()
+        sent_count += len(sent_ids)
+        failed_count += len(failed_ids)
+
+    return {"sent_count": sent_count, "failed_count": failed_count}
+
+
+def weekly_digest_stats_for_user(db: Session, user_id, week_start: date) -> Dict[str, Any]:
+    """The user's staged row, or the same stats computed for just this user"""
+    stat = db.query(WeeklyDigestStat).filter(
+        WeeklyDigestStat.week_start == week_start,
+        WeeklyDigestStat.user_id == user_id
+    ).first()
+    if stat is not None:
+        return {column: getattr(stat, column) for column in STAT_COLUMNS}
+
+    row = db.execute(digest_stats_select(week_start, [user_id])).first()
+    if row is not None:
+        return dict(row._mapping)
+    return {"week_start": week_start, "user_id": user_id, "resumes_analyzed": 0, "improvement_score": 0}
@@ -9,6 +9,9 @@ import tempfile
 from typing import Optional, Dict, Any
 from pathlib import Path
 
+from ..core.tracing import span
+from .section_parser import parse_resume_sections
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,14 +23,15 @@ def extract_text_from_file(file_path: str) -> str:
     try:
         file_ext = Path(file_path).suffix.lower()
         
-        if file_ext == '.pdf':
-            return extract_text_from_pdf(file_path)
-        elif file_ext in ['.doc', '.docx']:
-            return extract_text_from_docx(file_path)
-        elif file_ext == '.txt':
-            return extract_text_from_txt(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
+        with span("extract"):
+            if file_ext == '.pdf':
+                return extract_text_from_pdf(file_path)
+            elif file_ext in ['.doc', '.docx']:
+                return extract_text_from_docx(file_path)
+            elif file_ext == '.txt':
+                return extract_text_from_txt(file_path)
+            else:
+                raise ValueError(f"Unsupported file type: {file_ext}")
             
     except Exception as e:
         logger.error(f"Failed to extract text from {file_path}: {str(e)}")
@@ -150,9 +154,9 @@ def clean_extracted_text(text: str) -> str:
     # Join with single newlines
     cleaned_text = '\n'.join(lines)
     
-    # Remove multiple consecutive spaces
+    # Remove multiple consecutive spaces (keep line breaks for section parsing)
     import re
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
+    cleaned_text = re.sub(r'[ \t\f\v]+', ' ', cleaned_text)
     
     # Remove excessive newlines (more than 2 consecutive)
     cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
@@ -245,82 +249,7 @@ def extract_resume_sections(text: str) -> Dict[str, str]:
     Extract common resume sections from text
     Returns real parsed sections, not mock data
     """
-    import re
-    
-    sections = {
-        "contact_info": "",
-        "summary": "", 
-        "experience": "",
-        "education": "",
-        "skills": "",
-        "projects": "",
-        "certifications": ""
-    }
-    
-    text_lower = text.lower()
-    
-    # Define section patterns
-    section_patterns = {
-        "experience": r"(experience|work history|employment|professional experience)",
-        "education": r"(education|academic background|qualifications)",
-        "skills": r"(skills|technical skills|competencies|technologies)",
-        "projects": r"(projects|portfolio|personal projects)",
-        "certifications": r"(certifications|certificates|licenses)",
-        "summary": r"(summary|objective|profile|about me)"
-    }
-    
-    # Extract contact information (basic patterns)
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    
-    emails = re.findall(email_pattern, text)
-    phones = re.findall(phone_pattern, text)
-    
-    if emails or phones:
-        contact_parts = []
-        if emails:
-            contact_parts.extend(emails)
-        if phones:
-            contact_parts.extend([phone[0] + phone[1] if isinstance(phone, tuple) else phone for phone in phones])
-        sections["contact_info"] = "\n".join(contact_parts)
-    
-    # Split text into lines for section detection
-    lines = text.split('\n')
-    current_section = None
-    section_content = []
-    
-    for line in lines:
-        line_clean = line.strip()
-        if not line_clean:
-            continue
-            
-        # Check if line is a section header
-        found_section = None
-        for section_name, pattern in section_patterns.items():
-            if re.search(pattern, line_clean.lower()):
-                found_section = section_name
-                break
-        
-        if found_section:
-            # Save previous section content
-            if current_section and section_content:
-                sections[current_section] = '\n'.join(section_content)
-            
-            # Start new section
-            current_section = found_section
-            section_content = []
-        elif current_section:
-            section_content.append(line_clean)
-    
-    # Save last section
-    if current_section and section_content:
-        sections[current_section] = '\n'.join(section_content)
-    
-    # Clean up sections
-    for key in sections:
-        sections[key] = sections[key].strip()
-    
-    return sections
+    return parse_resume_sections(text)
 
 
 # Example usage for testing (development only)
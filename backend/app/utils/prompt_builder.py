@@ -0,0 +1,105 @@
+"""
+Prompt Builder
+Compacts what goes into Gemini prompts: whitespace normalization, token
+budgets for user-supplied text, JSON without empty fields, and token
+estimates logged per endpoint
+"""
+
+import json
+import logging
+import re
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Gemini averages close to 4 characters per token on English prose
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = "\n[truncated]"
+
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough input token count, good enough to compare prompt sizes"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """
+    Collapse runs of spaces and tabs, strip every line and keep at most
+    one blank line between paragraphs. Line breaks are kept since they
+    carry resume structure.
+    """
+    if not text:
+        return ""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = (_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, at a line break when one is close"""
+    text = text or ""
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+
+    limit = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    cut = text.rfind("\n", 0, limit)
+    if cut < limit * 0.8:
+        cut = text.rfind(" ", 0, limit)
+    if cut <= 0:
+        cut = limit
+    return text[:cut].rstrip() + TRUNCATION_MARKER
+
+
+def compact_input(text: Optional[str], max_tokens: int) -> str:
+    """normalize_text, then truncate_to_tokens"""
+    return truncate_to_tokens(normalize_text(text), max_tokens)
+
+
+def drop_empty(value: Any) -> Any:
+    """Recursively remove None, blank strings and empty lists/dicts"""
+    if isinstance(value, dict):
+        cleaned = {key: drop_empty(item) for key, item in value.items()}
+        return {key: item for key, item in cleaned.items() if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        cleaned = [drop_empty(item) for item in value]
+        return [item for item in cleaned if not _is_empty(item)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def compact_json(value: Any) -> str:
+    """JSON without empty fields or insignificant whitespace"""
+    return json.dumps(drop_empty(value), separators=(",", ":"), ensure_ascii=False)
+
+
+def log_prompt_tokens(endpoint: str, contents: str, system_instruction: Optional[str] = None, response: Any = None):
+    """
+    Log estimated input tokens for one call, split into the shared system
+    instruction and the per-request contents. When the response is given,
+    the prompt and cached token counts Gemini reports are logged too.
+    """
+    prefix_tokens = estimate_tokens(system_instruction)
+    contents_tokens = estimate_tokens(contents)
+    message = (
+        f"Prompt tokens [{endpoint}]: ~{prefix_tokens + contents_tokens} estimated "
+        f"({prefix_tokens} system, {contents_tokens} contents)"
+    )
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        message += (
+            f", {getattr(usage, 'prompt_token_count', None)} reported, "
+            f"{getattr(usage, 'cached_content_token_count', None) or 0} cached"
+        )
+    logger.info(message)
@@ -0,0 +1,92 @@
+"""
+Resume Section Parser
+Single-pass section splitter shared by the backend and the ml package
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Header phrases per section. Longer phrases are tried first so
+# "professional experience" wins over "experience".
+SECTION_HEADERS: Dict[str, List[str]] = {
+    "summary": ["professional summary", "summary", "objective", "profile", "about me"],
+    "experience": ["professional experience", "work experience", "work history", "employment", "experience"],
+    "education": ["academic background", "education", "qualifications"],
+    "skills": ["technical skills", "skills", "competencies", "technologies"],
+    "projects": ["personal projects", "projects", "portfolio"],
+    "certifications": ["certifications", "certificates", "licenses"],
+}
+
+SECTION_KEYS = ["contact_info"] + list(SECTION_HEADERS.keys())
+
+# Headers are short lines, so anything longer is body text mentioning a keyword
+MAX_HEADER_WORDS = 4
+
+
+def _build_header_regex() -> "re.Pattern":
+    alternatives = []
+    for section, phrases in SECTION_HEADERS.items():
+        ordered = sorted(phrases, key=len, reverse=True)
+        body = "|".join(re.escape(phrase).replace(r"\ ", r"\s+") for phrase in ordered)
+        alternatives.append(f"(?P<{section}>{body})")
+    # One alternation for every section; match.lastgroup names the section
+    return re.compile(
+        r"^[^\w]*(?:" + "|".join(alternatives) + r")\b\s*(?P<sep>[:\-–|])?\s*(?P<rest>.*)$",
+        re.IGNORECASE,
+    )
+
+
+HEADER_RE = _build_header_regex()
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}")
+
+
+def match_section_header(line: str) -> Optional[tuple]:
+    """
+    Return (section, inline_content) if the line is a section header, else None.
+    "Skills: Python, SQL" is a header with inline content; "Experience with
+    Python across many teams" is body text.
+    """
+    match = HEADER_RE.match(line)
+    if not match:
+        return None
+
+    rest = match.group("rest").strip()
+    if match.group("sep") or not rest or len(line.split()) <= MAX_HEADER_WORDS:
+        section = next(name for name in SECTION_HEADERS if match.group(name))
+        return section, rest if match.group("sep") else ""
+    return None
+
+
+def extract_contact_lines(text: str) -> str:
+    """Emails and phone numbers found in the text, one per line"""
+    contacts = EMAIL_RE.findall(text) + [phone.strip() for phone in PHONE_RE.findall(text)]
+    return "\n".join(contacts)
+
+
+def parse_resume_sections(text: str) -> Dict[str, str]:
+    """
+    Split resume text into sections in one pass over its lines
+    Always returns every key in SECTION_KEYS (empty string if absent)
+    """
+    sections: Dict[str, List[str]] = {key: [] for key in SECTION_KEYS}
+    if not text:
+        return {key: "" for key in SECTION_KEYS}
+
+    current_section = None
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        header = match_section_header(line)
+        if header:
+            current_section, inline_content = header
+            if inline_content:
+                sections[current_section].append(inline_content)
+        elif current_section:
+            sections[current_section].append(line)
+
+    result = {key: "\n".join(lines).strip() for key, lines in sections.items()}
+    result["contact_info"] = extract_contact_lines(text)
+    return result
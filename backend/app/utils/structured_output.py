@@ -0,0 +1,145 @@
+"""
+Structured Output Parsing
+One tolerant, linear-time JSON extractor for LLM responses plus Pydantic
+validation. Used as the fallback when a response did not come back as
+schema-validated JSON, by the backend and the ml package alike.
+"""
+
+import json
+from typing import Any, Dict, Iterator, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """Response did not contain JSON matching the expected shape"""
+
+
+def _scan_candidates(text: str) -> Iterator[str]:
+    """
+    Yield every top-level {...} or [...] span in one left-to-right pass.
+    Brackets inside strings are ignored, trailing commas are dropped and a
+    span cut off by the end of the text is closed. Spans never overlap, so
+    the total work is linear in the text length.
+    """
+    length = len(text)
+    position = 0
+
+    while position < length:
+        char = text[position]
+        if char not in _CLOSERS:
+            position += 1
+            continue
+
+        out = []
+        stack = []
+        in_string = False
+        escaped = False
+        last_comma = None  # index in out of a comma that may turn out to be trailing
+        mismatched = False
+        index = position
+
+        while index < length:
+            char = text[index]
+            index += 1
+
+            if in_string:
+                out.append(char)
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+
+            if char in _CLOSERS:
+                stack.append(_CLOSERS[char])
+                last_comma = None
+            elif char in "}]":
+                if char != stack[-1]:
+                    # Not JSON after all; resume scanning from here
+                    mismatched = True
+                    break
+                if last_comma is not None:
+                    del out[last_comma]
+                    last_comma = None
+                stack.pop()
+                out.append(char)
+                if not stack:
+                    break
+                continue
+            elif char == ",":
+                last_comma = len(out)
+            elif char == '"':
+                in_string = True
+                last_comma = None
+            elif not char.isspace():
+                last_comma = None
+            out.append(char)
+
+        position = index
+
+        if stack and not mismatched and index >= length:
+            # Truncated response: close whatever is still open
+            if in_string:
+                out.append('"')
+            if last_comma is not None:
+                del out[last_comma]
+            out.extend(reversed(stack))
+            stack = []
+
+        if not stack:
+            yield "".join(out)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON value in an LLM response, tolerating code fences,
+    surrounding prose, trailing commas and truncation.
+    """
+    text = (text or "").strip()
+    if not text:
+        raise StructuredOutputError("Empty response")
+
+    # Fast path: the whole response is JSON (always true in JSON mode)
+    if text[0] in _CLOSERS:
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, RecursionError):
+            pass
+
+    for candidate in _scan_candidates(text):
+        try:
+            return json.loads(candidate)
+        except (json.JSONDecodeError, RecursionError):
+            continue
+
+    raise StructuredOutputError("No JSON value found in response")
+
+
+def parse_json_object(text: str) -> Dict[str, Any]:
+    """extract_json, requiring a JSON object"""
+    value = extract_json(text)
+    if not isinstance(value, dict):
+        raise StructuredOutputError(f"Expected a JSON object, got {type(value).__name__}")
+    return value
+
+
+def validate_structured(data: Any, model: Type[ModelT], defaults: Optional[Dict[str, Any]] = None) -> ModelT:
+    """Validate parsed JSON into a model, filling missing top-level keys from defaults"""
+    if defaults and isinstance(data, dict):
+        data = {**defaults, **data}
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        raise StructuredOutputError(f"Response does not match {model.__name__}: {e}") from e
+
+
+def parse_structured(text: str, model: Type[ModelT], defaults: Optional[Dict[str, Any]] = None) -> ModelT:
+    """Extract JSON from raw response text and validate it into a model"""
+    return validate_structured(extract_json(text), model, defaults)
@@ -0,0 +1,76 @@
+"""
+Text Deltas
+Compact line-based deltas between two versions of a text, used by the
+resume version store to keep edits instead of full copies
+"""
+
+import difflib
+from typing import List, Any, Dict
+
+# Delta ops, applied in order against the base text's lines:
+#   ["=", n]        copy the next n base lines
+#   ["-", n]        skip the next n base lines
+#   ["+", [lines]]  insert these lines
+Delta = List[List[Any]]
+
+
+def _split(text: str) -> List[str]:
+    return (text or "").splitlines(keepends=True)
+
+
+def make_delta(base: str, target: str) -> Delta:
+    """Delta that turns base into target; size grows with the edit, not the text"""
+    base_lines, target_lines = _split(base), _split(target)
+    delta: Delta = []
+
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append(["=", i2 - i1])
+            continue
+        if i2 > i1:
+            delta.append(["-", i2 - i1])
+        if j2 > j1:
+            delta.append(["+", target_lines[j1:j2]])
+    return delta
+
+
+def apply_delta(base: str, delta: Delta) -> str:
+    """Rebuild the target text from base and a delta made by make_delta"""
+    base_lines = _split(base)
+    result: List[str] = []
+    position = 0
+
+    for op, value in delta:
+        if op == "=":
+            result.extend(base_lines[position:position + value])
+            position += value
+        elif op == "-":
+            position += value
+        elif op == "+":
+            result.extend(value)
+        else:
+            raise ValueError(f"Unknown delta op: {op}")
+
+    if position != len(base_lines):
+        raise ValueError("Delta does not match base text")
+    return "".join(result)
+
+
+def delta_size(delta: Delta) -> int:
+    """Approximate stored size in characters"""
+    return sum(sum(len(line) for line in value) if op == "+" else 4 for op, value in delta)
+
+
+def diff_texts(old: str, new: str, old_label: str = "old", new_label: str = "new") -> Dict[str, Any]:
+    """Unified diff plus line counts, for showing changes between versions"""
+    old_lines, new_lines = _split(old), _split(new)
+    unified = list(difflib.unified_diff(old_lines, new_lines, fromfile=old_label, tofile=new_label))
+
+    added = sum(1 for line in unified if line.startswith("+") and not line.startswith("+++"))
+    removed = sum(1 for line in unified if line.startswith("-") and not line.startswith("---"))
+    return {
+        "diff": "".join(unified),
+        "lines_added": added,
+        "lines_removed": removed,
+    }
@@ -0,0 +1,151 @@
+"""
+Resume Text Features
+Computes sections, keywords, contact info, word stats and readability
+from resume text in one pipeline pass
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+from .section_parser import parse_resume_sections, SECTION_HEADERS, EMAIL_RE, PHONE_RE
+
+# Bump when the feature computation changes so stored rows get recomputed
+FEATURES_PIPELINE_VERSION = 2
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#'.-]*[A-Za-z0-9+#]|[A-Za-z]")
+# Only punctuation followed by whitespace (or the end) ends a sentence, not dots in emails and URLs
+SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)")
+LINKEDIN_RE = re.compile(r"linkedin\.com/in/[\w-]+", re.IGNORECASE)
+GITHUB_RE = re.compile(r"github\.com/[\w-]+", re.IGNORECASE)
+WEBSITE_RE = re.compile(r"https?://[\w.-]+\.[a-zA-Z]{2,}[^\s]*")
+VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+DOMAIN_RE = re.compile(r"\.(?:com|org|net|io|dev|me|co|edu)$")
+
+STOPWORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'between', 'among', 'this', 'that', 'these', 'those', 'i', 'me', 'my',
+    'we', 'our', 'you', 'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
+    'they', 'them', 'their', 'what', 'which', 'who', 'whom', 'am', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'a', 'an', 'as', 'if', 'each', 'how', 'when', 'where', 'why', 'all', 'any',
+    'both', 'few', 'more', 'most', 'other', 'some', 'such', 'only', 'own', 'same',
+    'so', 'than', 'too', 'very', 'can', 'will', 'just', 'should', 'now', 'also',
+    # Resume boilerplate that says nothing about the candidate
+    'experience', 'work', 'job', 'position', 'role', 'company', 'team', 'year',
+    'years', 'month', 'months', 'responsible', 'various', 'including', 'using',
+})
+
+# Section header words are layout, not content
+HEADER_WORDS = frozenset(
+    word for phrases in SECTION_HEADERS.values() for phrase in phrases for word in phrase.split()
+)
+
+
+def content_hash(text: str) -> str:
+    """Identifies one version of a resume's text"""
+    return hashlib.sha256((text or "").encode("utf-8", errors="replace")).hexdigest()
+
+
+def count_syllables(word: str) -> int:
+    """Approximate syllable count (vowel groups, silent trailing e)"""
+    word = word.lower()
+    count = len(VOWEL_GROUP_RE.findall(word))
+    if word.endswith('e') and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def _guess_name(text: str) -> Optional[str]:
+    """First line if it looks like a person's name"""
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        words = line.split()
+        if 1 < len(words) <= 4 and not re.search(r"[\d@/:|]", line):
+            return line
+        return None
+    return None
+
+
+def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
+    """Contact details found anywhere in the text"""
+    def first(pattern) -> Optional[str]:
+        match = pattern.search(text)
+        return match.group().strip() if match else None
+
+    website = None
+    for match in WEBSITE_RE.finditer(text):
+        url = match.group()
+        if 'linkedin.com' not in url and 'github.com' not in url:
+            website = url
+            break
+
+    return {
+        'name': _guess_name(text),
+        'email': first(EMAIL_RE),
+        'phone': first(PHONE_RE),
+        'linkedin': first(LINKEDIN_RE),
+        'github': first(GITHUB_RE),
+        'website': website,
+    }
+
+
+def _keyword_counts(lowered: List[str], excluded: frozenset) -> Counter:
+    return Counter(
+        token for token in lowered
+        if len(token) > 2 and token not in excluded and not DOMAIN_RE.search(token)
+    )
+
+
+def extract_keywords(text: str, max_keywords: int = 30, exclude: frozenset = frozenset()) -> List[str]:
+    """Most frequent content words, filtered the same way as resume keywords"""
+    lowered = [token.lower() for token in WORD_RE.findall(text or "")]
+    counts = _keyword_counts(lowered, STOPWORDS | HEADER_WORDS | exclude)
+    return [word for word, _ in counts.most_common(max_keywords)]
+
+
+def compute_resume_features(text: str, max_keywords: int = 30) -> Dict[str, Any]:
+    """
+    Compute every stored text feature for one resume version.
+    Text is tokenized once; keywords, word stats and readability all
+    derive from the same token list.
+    """
+    text = text or ""
+    tokens: List[str] = WORD_RE.findall(text)
+    lowered = [token.lower() for token in tokens]
+
+    contact_info = extract_contact_info(text)
+    excluded = STOPWORDS | HEADER_WORDS | set((contact_info['name'] or '').lower().split())
+    keyword_counts = _keyword_counts(lowered, excluded)
+
+    sentences = len(SENTENCE_END_RE.findall(text))
+    words = len(tokens)
+    syllables = sum(count_syllables(token) for token in lowered)
+
+    # Flesch Reading Ease, same formula as the ml resume analyzer
+    if sentences and words:
+        readability = 206.835 - 1.015 * (words / sentences) - 84.6 * (syllables / words)
+        readability = round(max(0.0, min(100.0, readability)), 1)
+    else:
+        readability = 0.0
+
+    return {
+        'content_hash': content_hash(text),
+        'sections': parse_resume_sections(text),
+        'keywords': [word for word, _ in keyword_counts.most_common(max_keywords)],
+        'contact_info': contact_info,
+        'word_stats': {
+            'words': words,
+            'unique_words': len(set(lowered)),
+            'sentences': sentences,
+            'paragraphs': len([p for p in text.split('\n\n') if p.strip()]),
+            'lines': len([line for line in text.split('\n') if line.strip()]),
+            'characters': len(text),
+        },
+        'readability_score': readability,
+        'pipeline_version': FEATURES_PIPELINE_VERSION,
+    }
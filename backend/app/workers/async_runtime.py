@@ -0,0 +1,126 @@
+"""
+Worker Async Runtime
+One long-lived event loop per worker process, running in a background
+thread. Tasks submit coroutines to it with run_async instead of calling
+asyncio.run, so loop-bound clients (Gemini, HTTP pools) are created once
+and reused across tasks.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerLoop:
+    """
+    Lazily started event loop thread. A forked child notices the pid change
+    and starts its own loop, since threads do not survive fork.
+    """
+
+    def __init__(self, name: str = "worker-event-loop"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._resources: Dict[str, Any] = {}
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        # Anything inherited from a parent process belongs to a dead loop
+        self._resources = {}
+        self._loop = asyncio.new_event_loop()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, args=(self._loop,), name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"Started {self.name} in process {self._pid}")
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the worker loop and block until it finishes"""
+        if self.in_loop_thread():
+            raise RuntimeError("run_async called from the worker loop itself; await the coroutine instead")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def get_resource(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Per-loop singleton, e.g. a client whose connections are bound to this loop"""
+        self.get_loop()
+        with self._lock:
+            if key not in self._resources:
+                self._resources[key] = factory()
+            return self._resources[key]
+
+    def shutdown(self, timeout: float = 10.0):
+        """Close per-loop resources and stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or self._pid != os.getpid() or not thread.is_alive():
+                return
+            resources, self._resources = self._resources, {}
+            self._loop = self._thread = None
+
+        for key, resource in resources.items():
+            try:
+                aclose = getattr(resource, "aclose", None)
+                if aclose is not None:
+                    asyncio.run_coroutine_threadsafe(aclose(), loop).result(timeout)
+                elif hasattr(resource, "close"):
+                    resource.close()
+            except Exception as e:
+                logger.warning(f"Failed to close worker resource {key}: {str(e)}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        logger.info(f"Stopped {self.name} in process {os.getpid()}")
+
+
+worker_loop = WorkerLoop()
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Drop-in replacement for asyncio.run inside Celery tasks"""
+    return worker_loop.run(coro, timeout)
+
+
+def get_worker_gemini_service():
+    """GeminiService shared by every task in this worker process"""
+    from ..core.config import settings
+    from ..services.gemini_service import GeminiService
+
+    return worker_loop.get_resource(
+        "gemini_service", lambda: GeminiService(api_key=settings.GEMINI_API_KEY)
+    )
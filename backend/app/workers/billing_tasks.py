@@ -0,0 +1,63 @@
+"""
+Billing Tasks
+Background tasks for subscription usage and billing
+"""
+
+import logging
+from celery import Task
+from sqlalchemy.orm import Session
+
+from .celery_app import celery_app
+from ..database import SessionLocal
+from ..core.config import settings
+from ..services.quota import get_quota_counters
+from ..services.stripe_events import pending_event_customers, process_customer_events
+
+logger = logging.getLogger(__name__)
+
+
+class BillingTask(Task):
+    """Base task class that provides database session"""
+
+    def __call__(self, *args, **kwargs):
+        with SessionLocal() as db:
+            return self.run(db, *args, **kwargs)
+
+    def run(self, db: Session, *args, **kwargs):
+        raise NotImplementedError
+
+
+@celery_app.task(bind=True, base=BillingTask)
+def flush_quota_usage(self, db: Session) -> int:
+    """Move quota usage recorded in Redis into the user rows"""
+    flushed = get_quota_counters().flush(db)
+    if flushed:
+        logger.info(f"Flushed quota usage for {flushed} counter(s)")
+    return flushed
+
+
+def _drain_customer_events(db: Session, customer_id: str) -> int:
+    """Process full batches until the customer has none left (or one fails)"""
+    applied = 0
+    while True:
+        count = process_customer_events(db, customer_id)
+        applied += count
+        if count < settings.STRIPE_EVENT_BATCH_SIZE:
+            return applied
+
+
+@celery_app.task(bind=True, base=BillingTask)
+def process_stripe_customer_events(self, db: Session, customer_id: str) -> int:
+    """Apply a customer's stored webhook events, in order"""
+    return _drain_customer_events(db, customer_id)
+
+
+@celery_app.task(bind=True, base=BillingTask)
+def process_pending_stripe_events(self, db: Session) -> int:
+    """Sweep for events whose task was never enqueued or that are due a retry"""
+    applied = 0
+    for customer_id in pending_event_customers(db):
+        applied += _drain_customer_events(db, customer_id)
+    if applied:
+        logger.info(f"Applied {applied} pending Stripe event(s)")
+    return applied
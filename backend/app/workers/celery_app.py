@@ -5,7 +5,12 @@ Background task processing for CVPerfect
 
 import os
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import setup_logging, worker_process_init, worker_process_shutdown, worker_shutdown
 from ..core.config import settings
+from ..core.logging_config import setup_logging as setup_app_logging
+from .async_runtime import worker_loop
+from ..services.email_sender import close_email_sender
 
 # Create Celery app
 celery_app = Celery(
@@ -15,7 +20,8 @@ celery_app = Celery(
     include=[
         "app.workers.resume_tasks",
         "app.workers.email_tasks",
-        "app.workers.analytics_tasks"
+        "app.workers.analytics_tasks",
+        "app.workers.billing_tasks",
     ]
 )
 
@@ -55,11 +61,49 @@ celery_app.conf.update(
             "task": "app.workers.analytics_tasks.generate_daily_analytics",
             "schedule": 86400.0,  # Run daily
         },
+        "flush-quota-usage": {
+            "task": "app.workers.billing_tasks.flush_quota_usage",
+            "schedule": float(settings.QUOTA_FLUSH_INTERVAL_SECONDS),
+        },
+        "process-pending-stripe-events": {
+            "task": "app.workers.billing_tasks.process_pending_stripe_events",
+            "schedule": 60.0,  # Run every minute
+        },
+        "send-weekly-digests": {
+            "task": "app.workers.email_tasks.send_weekly_digests",
+            "schedule": crontab(hour=9, minute=0, day_of_week="mon"),
+        },
     },
 )
 
 # Auto-discover tasks
 celery_app.autodiscover_tasks()
 
+
+@setup_logging.connect
+def configure_logging(**kwargs):
+    """Use the application's queued logging instead of Celery's own handlers"""
+    setup_app_logging(
+        level=settings.LOG_LEVEL,
+        debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+        fmt=settings.LOG_FORMAT,
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+
+
+@worker_process_init.connect
+def start_worker_loop(**kwargs):
+    """Each pool process gets its own event loop, started before its first task"""
+    worker_loop.get_loop()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def release_worker_resources(**kwargs):
+    """Stop the event loop and close pooled SMTP connections"""
+    worker_loop.shutdown()
+    close_email_sender()
+
+
 if __name__ == "__main__":
     celery_app.start() 
\ No newline at end of file
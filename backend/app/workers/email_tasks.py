@@ -4,17 +4,32 @@ Background tasks for sending emails and notifications
 """
 
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from datetime import date
 from typing import Dict, Any, List, Optional
-from celery import Task
+from celery import Task, chord, group
 from sqlalchemy.orm import Session
 
 from .celery_app import celery_app
 from ..database import SessionLocal
 from ..models.user import User
 from ..core.config import settings
+from ..services.email_sender import build_message, get_email_sender
+from ..services.email_templates import render_email
+from ..services.bulk_email import (
+    ChunkInProgress,
+    claim_chunk,
+    create_bulk_email_job,
+    finalize_bulk_email_job,
+    release_chunk,
+    send_chunk,
+)
+from ..services.weekly_digest import (
+    digest_batch_bounds,
+    digest_week_start,
+    send_digest_batch,
+    stage_weekly_digest_stats,
+    weekly_digest_stats_for_user,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,32 +51,15 @@ def send_email_smtp(
     html_content: str,
     text_content: str = None
 ) -> bool:
-    """Send email using SMTP"""
+    """Send email over this worker's pooled SMTP connections"""
     
     try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = settings.EMAIL_FROM
-        msg['To'] = to_email
+        msg = build_message(to_email, subject, html_content, text_content, settings.EMAIL_FROM)
+        success = get_email_sender().send(msg)
         
-        # Add text content
-        if text_content:
-            text_part = MIMEText(text_content, 'plain')
-            msg.attach(text_part)
-        
-        # Add HTML content
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT) as server:
-            server.starttls()
-            server.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
-            server.send_message(msg)
-        
-        logger.info(f"Email sent successfully to {to_email}")
-        return True
+        if success:
+            logger.info(f"Email sent successfully to {to_email}")
+        return success
         
     except Exception as e:
         logger.error(f"Failed to send email to {to_email}: {str(e)}")
@@ -80,71 +78,8 @@ def send_welcome_email(self, db: Session, user_id: str) -> Dict[str, Any]:
         
         subject = "Welcome to CVPerfect! 🚀"
         
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #3b82f6;">Welcome to CVPerfect!</h1>
-                </div>
-                
-                <p>Hi {user.full_name},</p>
-                
-                <p>Welcome to CVPerfect! We're excited to help you create the perfect resume and advance your career.</p>
-                
-                <div style="background-color: #f8fafc; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #1f2937; margin-top: 0;">Here's what you can do with CVPerfect:</h3>
-                    <ul style="color: #4b5563;">
-                        <li>📄 Upload and analyze your resume with AI</li>
-                        <li>✨ Get personalized feedback and improvement suggestions</li>
-                        <li>💼 Generate tailored cover letters for job applications</li>
-                        <li>📚 Receive customized learning paths to enhance your skills</li>
-                        <li>🎯 Practice with AI-generated interview questions</li>
-                    </ul>
-                </div>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{settings.FRONTEND_URL}/dashboard" 
-                       style="background-color: #3b82f6; color: white; padding: 12px 24px; 
-                              text-decoration: none; border-radius: 6px; display: inline-block;">
-                        Get Started
-                    </a>
-                </div>
-                
-                <p>If you have any questions, feel free to reach out to our support team.</p>
-                
-                <p>Best regards,<br>The CVPerfect Team</p>
-                
-                <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #e5e7eb; 
-                            font-size: 12px; color: #6b7280; text-align: center;">
-                    <p>CVPerfect - Your AI-Powered Career Assistant</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Welcome to CVPerfect!
-        
-        Hi {user.full_name},
-        
-        Welcome to CVPerfect! We're excited to help you create the perfect resume and advance your career.
-        
-        Here's what you can do with CVPerfect:
-        - Upload and analyze your resume with AI
-        - Get personalized feedback and improvement suggestions
-        - Generate tailored cover letters for job applications
-        - Receive customized learning paths to enhance your skills
-        - Practice with AI-generated interview questions
-        
-        Get started: {settings.FRONTEND_URL}/dashboard
-        
-        If you have any questions, feel free to reach out to our support team.
-        
-        Best regards,
-        The CVPerfect Team
-        """
+        html_content = render_email("welcome.html", full_name=user.full_name)
+        text_content = render_email("welcome.txt", full_name=user.full_name)
         
         success = send_email_smtp(user.email, subject, html_content, text_content)
         
@@ -195,63 +130,15 @@ def send_analysis_complete_email(
             score_color = "#ef4444"
             score_message = "Let's work together to significantly improve your resume's impact."
         
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #3b82f6;">Resume Analysis Complete! 📊</h1>
-                </div>
-                
-                <p>Hi {user.full_name},</p>
-                
-                <p>Great news! Your resume analysis is ready and waiting for you.</p>
-                
-                <div style="background-color: #f8fafc; padding: 20px; border-radius: 8px; margin: 20px 0; text-align: center;">
-                    <h2 style="margin-top: 0; color: {score_color};">
-                        Your Resume Score: {int(analysis_score)}/100
-                    </h2>
-                    <p style="font-size: 18px; color: {score_color}; font-weight: bold;">
-                        {score_category}
-                    </p>
-                    <p style="color: #4b5563;">{score_message}</p>
-                </div>
-                
-                <div style="background-color: #ecfdf5; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #065f46; margin-top: 0;">What's Included in Your Analysis:</h3>
-                    <ul style="color: #047857;">
-                        <li>📈 Overall resume score and ATS compatibility</li>
-                        <li>💪 Your key strengths and accomplishments</li>
-                        <li>🎯 Specific improvement recommendations</li>
-                        <li>🔍 Detailed feedback on each section</li>
-                    </ul>
-                </div>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{settings.FRONTEND_URL}/ai-feedback/{resume_id}" 
-                       style="background-color: #3b82f6; color: white; padding: 12px 24px; 
-                              text-decoration: none; border-radius: 6px; display: inline-block;">
-                        View Your Analysis
-                    </a>
-                </div>
-                
-                <p>Ready to take the next step? Try our other AI-powered features:</p>
-                <ul>
-                    <li>Generate a custom cover letter</li>
-                    <li>Get a personalized learning path</li>
-                    <li>Practice with AI interview questions</li>
-                </ul>
-                
-                <p>Best regards,<br>The CVPerfect Team</p>
-                
-                <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #e5e7eb; 
-                            font-size: 12px; color: #6b7280; text-align: center;">
-                    <p>CVPerfect - Your AI-Powered Career Assistant</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = render_email(
+            "analysis_complete.html",
+            full_name=user.full_name,
+            score=int(analysis_score),
+            score_color=score_color,
+            score_category=score_category,
+            score_message=score_message,
+            feedback_url=f"{settings.FRONTEND_URL}/ai-feedback/{resume_id}"
+        )
         
         success = send_email_smtp(user.email, subject, html_content)
         
@@ -278,37 +165,7 @@ def send_password_reset_email(
         subject = "Reset Your CVPerfect Password"
         reset_url = f"{settings.FRONTEND_URL}/auth/reset-password?token={reset_token}"
         
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #3b82f6;">Password Reset Request</h1>
-                </div>
-                
-                <p>You requested a password reset for your CVPerfect account.</p>
-                
-                <div style="background-color: #fef3c7; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #f59e0b;">
-                    <p style="margin: 0; color: #92400e;">
-                        <strong>Security Notice:</strong> This link expires in 1 hour for your security.
-                    </p>
-                </div>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{reset_url}" 
-                       style="background-color: #3b82f6; color: white; padding: 12px 24px; 
-                              text-decoration: none; border-radius: 6px; display: inline-block;">
-                        Reset Password
-                    </a>
-                </div>
-                
-                <p>If you didn't request this password reset, you can safely ignore this email.</p>
-                
-                <p>Best regards,<br>The CVPerfect Team</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = render_email("password_reset.html", reset_url=reset_url)
         
         success = send_email_smtp(email, subject, html_content)
         
@@ -323,9 +180,21 @@ def send_password_reset_email(
         self.retry(countdown=300, max_retries=3)
 
 
+WEEKLY_DIGEST_SUBJECT = "Your Weekly CVPerfect Progress Report 📈"
+
+
+def _weekly_digest_html(full_name: str, resumes_analyzed: int, improvement_score: float) -> str:
+    return render_email(
+        "weekly_digest.html",
+        full_name=full_name,
+        resumes_analyzed=resumes_analyzed,
+        improvement_score=int(round(improvement_score or 0))
+    )
+
+
 @celery_app.task(bind=True, base=EmailTask)
 def send_weekly_digest_email(self, db: Session, user_id: str) -> Dict[str, Any]:
-    """Send weekly digest email with user statistics"""
+    """Send one user last week's digest, outside the weekly batch run"""
     
     try:
         # Get user from database
@@ -333,69 +202,13 @@ def send_weekly_digest_email(self, db: Session, user_id: str) -> Dict[str, Any]:
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        # Get user statistics (this would require implementing analytics tracking)
-        # For now, we'll use placeholder data
-        stats = {
-            'resumes_analyzed': 3,
-            'improvement_score': 12,
-            'goals_completed': 2
-        }
-        
-        subject = "Your Weekly CVPerfect Progress Report 📈"
+        stats = weekly_digest_stats_for_user(db, user.id, digest_week_start())
         
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #3b82f6;">Your Weekly Progress 📊</h1>
-                </div>
-                
-                <p>Hi {user.full_name},</p>
-                
-                <p>Here's your weekly summary of activity on CVPerfect:</p>
-                
-                <div style="display: flex; flex-wrap: wrap; gap: 15px; margin: 20px 0;">
-                    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                                color: white; padding: 20px; border-radius: 8px; flex: 1; min-width: 150px; text-align: center;">
-                        <h3 style="margin: 0; font-size: 24px;">{stats['resumes_analyzed']}</h3>
-                        <p style="margin: 5px 0 0;">Resumes Analyzed</p>
-                    </div>
-                    <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                                color: white; padding: 20px; border-radius: 8px; flex: 1; min-width: 150px; text-align: center;">
-                        <h3 style="margin: 0; font-size: 24px;">+{stats['improvement_score']}</h3>
-                        <p style="margin: 5px 0 0;">Score Improvement</p>
-                    </div>
-                </div>
-                
-                <div style="background-color: #f0f9ff; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="color: #0c4a6e; margin-top: 0;">Keep Up the Momentum! 🚀</h3>
-                    <p style="color: #0369a1;">
-                        You're making great progress! Consider trying our cover letter generator 
-                        or practice interview questions to further enhance your job search.
-                    </p>
-                </div>
-                
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{settings.FRONTEND_URL}/dashboard" 
-                       style="background-color: #3b82f6; color: white; padding: 12px 24px; 
-                              text-decoration: none; border-radius: 6px; display: inline-block;">
-                        Continue Your Journey
-                    </a>
-                </div>
-                
-                <p>Best regards,<br>The CVPerfect Team</p>
-                
-                <div style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #e5e7eb; 
-                            font-size: 12px; color: #6b7280; text-align: center;">
-                    <p>Don't want these emails? <a href="#" style="color: #6b7280;">Unsubscribe</a></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_content = _weekly_digest_html(
+            user.full_name, stats['resumes_analyzed'], stats['improvement_score']
+        )
         
-        success = send_email_smtp(user.email, subject, html_content)
+        success = send_email_smtp(user.email, WEEKLY_DIGEST_SUBJECT, html_content)
         
         if success:
             logger.info(f"Weekly digest email sent to user {user_id}")
@@ -408,6 +221,51 @@ def send_weekly_digest_email(self, db: Session, user_id: str) -> Dict[str, Any]:
         self.retry(countdown=300, max_retries=3)
 
 
+@celery_app.task(bind=True, base=EmailTask)
+def send_weekly_digests(self, db: Session, week_start: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Weekly beat task: stage every active user's stats in one SQL pass, then
+    fan the sends out as batch subtasks over user id ranges
+    """
+    week = date.fromisoformat(week_start) if week_start else digest_week_start()
+    
+    staged = stage_weekly_digest_stats(db, week)
+    bounds = digest_batch_bounds(db, week, settings.WEEKLY_DIGEST_BATCH_SIZE)
+    
+    if bounds:
+        group(
+            send_weekly_digest_batch.s(week.isoformat(), lower, upper) for lower, upper in bounds
+        ).apply_async()
+    
+    logger.info(f"Weekly digest for {week}: {staged} users staged, {len(bounds)} batches queued")
+    return {"week_start": week.isoformat(), "staged_users": staged, "batch_count": len(bounds)}
+
+
+@celery_app.task(bind=True, base=EmailTask, max_retries=3)
+def send_weekly_digest_batch(
+    self,
+    db: Session,
+    week_start: str,
+    lower: Optional[str],
+    upper: Optional[str]
+) -> Dict[str, Any]:
+    """Send the pending digests in one user id range; a retry skips rows already sent"""
+    
+    def build(row):
+        html_content = _weekly_digest_html(row.full_name, row.resumes_analyzed, row.improvement_score)
+        return build_message(row.email, WEEKLY_DIGEST_SUBJECT, html_content, from_email=settings.EMAIL_FROM)
+    
+    try:
+        return send_digest_batch(
+            db, date.fromisoformat(week_start), lower, upper, build, get_email_sender()
+        )
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Weekly digest batch ({lower}, {upper}] for {week_start} failed: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
+
+
 @celery_app.task
 def send_bulk_notification_email(
     user_ids: List[str], 
@@ -415,57 +273,31 @@ def send_bulk_notification_email(
     message: str,
     email_type: str = "notification"
 ) -> Dict[str, Any]:
-    """Send bulk notification emails to multiple users"""
+    """
+    Send bulk notification emails to multiple users.
+    The recipients are split into chunks sent by parallel subtasks; a chord
+    callback records the totals once every chunk has finished.
+    """
     
     try:
-        sent_count = 0
-        failed_count = 0
-        
         with SessionLocal() as db:
-            for user_id in user_ids:
-                try:
-                    user = db.query(User).filter(User.id == user_id).first()
-                    if not user:
-                        logger.warning(f"User {user_id} not found for bulk email")
-                        failed_count += 1
-                        continue
-                    
-                    html_content = f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                            <div style="text-align: center; margin-bottom: 30px;">
-                                <h1 style="color: #3b82f6;">CVPerfect Update</h1>
-                            </div>
-                            
-                            <p>Hi {user.full_name},</p>
-                            
-                            <div style="background-color: #f8fafc; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                                {message}
-                            </div>
-                            
-                            <p>Best regards,<br>The CVPerfect Team</p>
-                        </div>
-                    </body>
-                    </html>
-                    """
-                    
-                    success = send_email_smtp(user.email, subject, html_content)
-                    if success:
-                        sent_count += 1
-                    else:
-                        failed_count += 1
-                        
-                except Exception as e:
-                    logger.error(f"Failed to send bulk email to user {user_id}: {str(e)}")
-                    failed_count += 1
-        
-        logger.info(f"Bulk email complete: {sent_count} sent, {failed_count} failed")
+            job = create_bulk_email_job(
+                db, user_ids, subject, message, email_type, settings.BULK_EMAIL_CHUNK_SIZE
+            )
+            db.commit()
+            job_id, chunk_count, total_users = str(job.id), job.chunk_count, job.total_users
+        
+        if chunk_count:
+            chord(group(
+                send_bulk_email_chunk.s(job_id, index) for index in range(chunk_count)
+            ))(finalize_bulk_email.s(job_id))
+        
+        logger.info(f"Bulk email job {job_id} queued: {total_users} users in {chunk_count} chunks")
         return {
-            "status": "completed",
-            "sent_count": sent_count,
-            "failed_count": failed_count,
-            "total_users": len(user_ids)
+            "status": "queued",
+            "job_id": job_id,
+            "chunk_count": chunk_count,
+            "total_users": total_users
         }
         
     except Exception as e:
@@ -475,4 +307,46 @@ def send_bulk_notification_email(
             "error": str(e),
             "sent_count": 0,
             "failed_count": len(user_ids)
-        } 
\ No newline at end of file
+        }
+
+
+@celery_app.task(bind=True, base=EmailTask, max_retries=3)
+def send_bulk_email_chunk(self, db: Session, job_id: str, chunk_index: int) -> Dict[str, Any]:
+    """Send one chunk of a bulk job, resuming from its last committed offset"""
+    
+    try:
+        chunk = claim_chunk(db, job_id, chunk_index)
+    except ChunkInProgress as e:
+        # Wait for the other worker to finish (or its claim to go stale), so the
+        # chord callback only runs once every chunk is done
+        raise self.retry(exc=e, countdown=30, max_retries=None)
+    if chunk is None:
+        return {"chunk_index": chunk_index, "status": "skipped"}
+    
+    job = chunk.job
+    
+    def build(user):
+        html_content = render_email(
+            "bulk_notification.html", static={"message": job.message}, full_name=user.full_name
+        )
+        return build_message(user.email, job.subject, html_content, from_email=settings.EMAIL_FROM)
+    
+    try:
+        return send_chunk(db, chunk, build, get_email_sender())
+        
+    except Exception as e:
+        db.rollback()
+        # Claims count attempts; retries also include waits for another worker
+        final = chunk.attempts > self.max_retries
+        release_chunk(db, chunk.id, str(e), final)
+        logger.error(f"Bulk email chunk {chunk_index} of job {job_id} failed: {str(e)}")
+        if final:
+            # Let the chord finish; the job is recorded as completed with errors
+            return {"chunk_index": chunk_index, "status": "failed", "error": str(e)}
+        raise self.retry(exc=e, countdown=60)
+
+
+@celery_app.task(bind=True, base=EmailTask)
+def finalize_bulk_email(self, db: Session, chunk_results: List[Dict[str, Any]], job_id: str) -> Dict[str, Any]:
+    """Chord callback: store the job's totals"""
+    return finalize_bulk_email_job(db, job_id)
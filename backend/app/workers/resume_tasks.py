@@ -5,16 +5,17 @@ Uses existing Gemini integration (not Pro tier)
 """
 
 import logging
-import asyncio
 from typing import Dict, Any
 from celery import Task
 from sqlalchemy.orm import Session
 
 from .celery_app import celery_app
+from .async_runtime import run_async, get_worker_gemini_service
+from ..core.metrics import RESUMES_PROCESSED
 from ..database import SessionLocal
 from ..models.resume import Resume, ResumeAnalysis
-from ..services.gemini_service import GeminiService
-from ..core.config import settings
+from ..services.resume_features import get_resume_features
+from ..services.learning_path_cache import get_learning_path
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,14 @@ def analyze_resume_async(self, db: Session, resume_id: str, job_description: str
         if not resume:
             raise ValueError(f"Resume {resume_id} not found")
         
-        # Initialize Gemini service with existing configuration
-        gemini_service = GeminiService(api_key=settings.GEMINI_API_KEY)
+        # Make sure this version's text features are stored alongside the analysis
+        features = get_resume_features(db, resume)
+        
+        # Gemini service shared by every task in this worker process
+        gemini_service = get_worker_gemini_service()
         
         # Analyze resume using existing Gemini setup (not Pro)
-        analysis_result = asyncio.run(
+        analysis_result = run_async(
             gemini_service.analyze_resume_content(resume.content, job_description)
         )
         
@@ -62,13 +66,15 @@ def analyze_resume_async(self, db: Session, resume_id: str, job_description: str
         
         db.add(analysis)
         db.commit()
+        RESUMES_PROCESSED.labels("worker").inc()
         
         logger.info(f"Completed async resume analysis for resume {resume_id}")
         return {
             "status": "completed",
             "resume_id": resume_id,
             "analysis_id": analysis.id,
-            "overall_score": analysis.overall_score
+            "overall_score": analysis.overall_score,
+            "readability_score": features.readability_score
         }
         
     except Exception as e:
@@ -89,11 +95,11 @@ def generate_cover_letter_async(self, db: Session, resume_id: str, job_descripti
         if not resume:
             raise ValueError(f"Resume {resume_id} not found")
         
-        # Initialize Gemini service
-        gemini_service = GeminiService(api_key=settings.GEMINI_API_KEY)
+        # Gemini service shared by every task in this worker process
+        gemini_service = get_worker_gemini_service()
         
         # Generate cover letter using existing Gemini setup
-        cover_letter_content = asyncio.run(
+        cover_letter_content = run_async(
             gemini_service.generate_cover_letter(
                 resume_content=resume.content,
                 job_description=job_description,
@@ -129,22 +135,21 @@ def generate_learning_path_async(self, db: Session, resume_id: str, job_descript
         if not resume:
             raise ValueError(f"Resume {resume_id} not found")
         
-        # Initialize Gemini service
-        gemini_service = GeminiService(api_key=settings.GEMINI_API_KEY)
+        # Gemini service shared by every task in this worker process
+        gemini_service = get_worker_gemini_service()
         
-        # Generate learning path using existing Gemini setup
-        learning_path = asyncio.run(
-            gemini_service.generate_learning_path(
-                resume_content=resume.content,
-                job_description=job_description
-            )
+        # Generate learning path, reusing the shared path for this skill gap
+        learning_path, cache_status = run_async(
+            get_learning_path(db, gemini_service, resume.content, job_description)
         )
+        db.commit()
         
         logger.info(f"Completed async learning path generation for resume {resume_id}")
         return {
             "status": "completed",
             "resume_id": resume_id,
-            "learning_path": learning_path
+            "learning_path": learning_path,
+            "cache_status": cache_status
         }
         
     except Exception as e:
@@ -165,11 +170,11 @@ def generate_practice_exam_async(self, db: Session, resume_id: str, job_descript
         if not resume:
             raise ValueError(f"Resume {resume_id} not found")
         
-        # Initialize Gemini service
-        gemini_service = GeminiService(api_key=settings.GEMINI_API_KEY)
+        # Gemini service shared by every task in this worker process
+        gemini_service = get_worker_gemini_service()
         
         # Generate practice exam using existing Gemini setup
-        practice_exam = asyncio.run(
+        practice_exam = run_async(
             gemini_service.generate_practice_exam(
                 resume_content=resume.content,
                 job_description=job_description,
@@ -208,8 +213,10 @@ def process_resume_upload(self, resume_id: str, file_path: str) -> Dict[str, Any
             
             extracted_text = extract_text_from_file(file_path)
             
-            # Update resume with extracted content
+            # Update resume with extracted content and its text features
             resume.content = extracted_text
+            resume.character_count = len(extracted_text)
+            get_resume_features(db, resume)
             resume.processing_status = "completed"
             db.commit()
             
@@ -0,0 +1,98 @@
+"""
+Worker Async Runtime Tests
+Tests for the per-process event loop used by Celery tasks
+"""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from app.models.resume import LearningPathCache
+from app.services.learning_path_cache import get_learning_path
+from app.workers.async_runtime import WorkerLoop
+
+RESUME = "Backend developer. Python, PostgreSQL, Django."
+JOB = """Senior Backend Engineer
+We are looking for a backend engineer with Python, Kubernetes and Terraform."""
+
+
+class FakeGeminiService:
+    """Records the thread each generation ran on"""
+
+    def __init__(self):
+        self.threads = []
+
+    async def generate_skill_gap_learning_path(self, bucket, missing_skills):
+        self.threads.append(threading.current_thread())
+        await asyncio.sleep(0)
+        return {"learning_path": [{"skill": skill} for skill in missing_skills]}
+
+
+class TestWorkerLoop:
+    """Test that tasks share one loop and its resources"""
+
+    def setup_method(self):
+        self.worker_loop = WorkerLoop("test-worker-loop")
+
+    def teardown_method(self):
+        self.worker_loop.shutdown()
+
+    def test_runs_coroutines_on_one_loop(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = self.worker_loop.run(current_loop())
+        second = self.worker_loop.run(current_loop())
+        assert first is second
+        assert first.is_running()
+
+    def test_resources_are_reused(self):
+        created = []
+        factory = lambda: created.append(object()) or created[-1]
+        assert self.worker_loop.get_resource("client", factory) is self.worker_loop.get_resource("client", factory)
+        assert len(created) == 1
+
+    def test_exceptions_propagate(self):
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            self.worker_loop.run(fail())
+
+    def test_shutdown_closes_resources(self):
+        class Client:
+            closed = False
+
+            async def aclose(self):
+                self.closed = True
+
+        client = self.worker_loop.get_resource("client", Client)
+        loop = self.worker_loop.get_loop()
+        self.worker_loop.shutdown()
+
+        assert client.closed
+        assert loop.is_closed()
+
+    def test_learning_path_queries_run_off_the_loop(self, db_session):
+        gemini_service = FakeGeminiService()
+        query_threads = []
+
+        def record_thread(*args):
+            query_threads.append(threading.current_thread())
+
+        connection = db_session.connection()
+        event.listen(connection, "before_cursor_execute", record_thread)
+        try:
+            for expected in ("miss", "hit"):
+                _, status = self.worker_loop.run(get_learning_path(db_session, gemini_service, RESUME, JOB))
+                db_session.flush()
+                assert status == expected
+        finally:
+            event.remove(connection, "before_cursor_execute", record_thread)
+
+        loop_thread = gemini_service.threads[0]
+        assert loop_thread.name == "test-worker-loop"
+        assert query_threads and loop_thread not in query_threads
+        assert db_session.query(LearningPathCache).one().hit_count == 1
@@ -0,0 +1,132 @@
+"""
+Batch Analysis Tests
+Tests for the streamed many-resumes analysis endpoint
+"""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.user import User
+from app.routers import get_current_user
+from app.routers import resume as resume_router
+from app.services.gemini_service import GeminiService
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building billing systems.
+"""
+
+ANALYSIS = '{"overall_score": 81, "ats_score": 74, "strengths": ["Clear summary"]}'
+
+
+class FakeModels:
+    """Async generate_content; resumes mentioning "unreadable" get prose back, "slow" ones wait"""
+
+    async def generate_content(self, model, contents, config=None):
+        if "slow" in contents:
+            await asyncio.sleep(0.3)
+        text = "Sorry, I cannot help with that." if "unreadable" in contents else ANALYSIS
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+
+def fake_gemini_service():
+    service = GeminiService(api_key="test-key")
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=FakeModels()))
+    return service
+
+
+class TestBatchAnalysis:
+    """Test that streamed results are saved and parse failures are reported"""
+
+    @pytest.fixture
+    def resumes(self, db_session):
+        user = User(email="batch@example.com", full_name="Jane Doe")
+        db_session.add(user)
+        db_session.flush()
+        resumes = {}
+        for name, content in (
+            ("good", RESUME_TEXT),
+            ("unreadable", RESUME_TEXT + "\nunreadable attachment"),
+            ("unsaved", RESUME_TEXT + "\nPortfolio: https://example.com"),
+        ):
+            resumes[name] = Resume(user_id=user.id, filename=f"{name}.txt", content=content, file_type="txt")
+            db_session.add(resumes[name])
+        db_session.commit()
+        return user, resumes
+
+    def test_each_result_is_saved_before_it_is_streamed(self, client, resumes, monkeypatch):
+        user, resumes = resumes
+        saved = []
+
+        def save(rows):
+            if any(row["resume_id"] == resumes["unsaved"].id for row in rows):
+                raise RuntimeError("database unavailable")
+            saved.extend(row["id"] for row in rows)
+
+        monkeypatch.setattr(resume_router, "GeminiService", fake_gemini_service)
+        monkeypatch.setattr(resume_router, "_save_batch_analyses", save)
+        client.app.dependency_overrides[get_current_user] = lambda: user
+
+        response = client.post("/api/resume/analyze/batch", json={
+            "resume_ids": [str(resume.id) for resume in resumes.values()],
+            "job_description": "Senior backend engineer, Python and PostgreSQL",
+        })
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        results = {line["resume_id"]: line for line in lines[:-1]}
+
+        good = results[str(resumes["good"].id)]
+        assert good["status"] == "completed"
+        assert good["overall_score"] == 81
+        assert saved == [uuid.UUID(good["analysis_id"])]
+
+        unreadable = results[str(resumes["unreadable"].id)]
+        assert unreadable["status"] == "failed"
+        assert "analysis_id" not in unreadable
+
+        unsaved = results[str(resumes["unsaved"].id)]
+        assert unsaved == {
+            "resume_id": str(resumes["unsaved"].id),
+            "status": "failed",
+            "error": "Saving the analysis failed",
+        }
+
+        assert lines[-1] == {"status": "summary", "total": 3, "completed": 1, "saved": 1, "failed": 2}
+
+    def test_saves_are_grouped_by_row_count_and_interval(self, client, db_session, monkeypatch):
+        user = User(email="batch-groups@example.com", full_name="Jane Doe")
+        db_session.add(user)
+        db_session.flush()
+        resumes = [
+            Resume(user_id=user.id, filename=f"{name}.txt", content=f"{RESUME_TEXT}\n{name} projects", file_type="txt")
+            for name in ("first", "second", "third", "slow")
+        ]
+        db_session.add_all(resumes)
+        db_session.commit()
+
+        inserts = []
+        monkeypatch.setattr(resume_router, "GeminiService", fake_gemini_service)
+        monkeypatch.setattr(resume_router, "_save_batch_analyses", lambda rows: inserts.append(len(rows)))
+        monkeypatch.setattr(settings, "BATCH_ANALYSIS_SAVE_ROWS", 2)
+        monkeypatch.setattr(settings, "BATCH_ANALYSIS_SAVE_INTERVAL_MS", 50)
+        client.app.dependency_overrides[get_current_user] = lambda: user
+
+        response = client.post("/api/resume/analyze/batch", json={
+            "resume_ids": [str(resume.id) for resume in resumes],
+            "job_description": "Senior backend engineer, Python and PostgreSQL",
+        })
+
+        # Two full groups, the third fast result once the interval passed, then the slow one
+        assert inserts == [2, 1, 1]
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-2]["resume_id"] == str(resumes[-1].id)
+        assert lines[-1]["saved"] == 4
@@ -0,0 +1,90 @@
+"""
+Bulk Email Tests
+Tests for chunked bulk sends and resuming a chunk after a failure
+"""
+
+import uuid
+
+import pytest
+
+from app.models.user import User
+from app.services.bulk_email import (
+    ChunkInProgress,
+    claim_chunk,
+    create_bulk_email_job,
+    finalize_bulk_email_job,
+    release_chunk,
+    send_chunk,
+)
+from app.services.email_sender import BulkSendResult
+
+
+class FakeSender:
+    """Records recipients; raises on the given send_many call to simulate a crash"""
+
+    def __init__(self, fail_on_call=None):
+        self.recipients = []
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def send_many(self, messages):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise ConnectionError("SMTP server went away")
+        result = BulkSendResult()
+        for recipient in messages:
+            self.recipients.append(recipient)
+            result.sent += 1
+        return result
+
+
+@pytest.fixture
+def users(db_session):
+    created = [User(email=f"bulk{i}@example.com", full_name=f"User {i}") for i in range(5)]
+    db_session.add_all(created)
+    db_session.commit()
+    return created
+
+
+class TestBulkEmail:
+    """Test job creation, chunk claiming and resume"""
+
+    def test_job_is_split_into_chunks(self, db_session, users):
+        ids = [str(user.id) for user in users]
+        job = create_bulk_email_job(db_session, ids + ids[:1], "Update", "Hello", chunk_size=2)
+        db_session.commit()
+
+        assert job.total_users == 5
+        assert job.chunk_count == 3
+        assert [len(chunk.user_ids) for chunk in sorted(job.chunks, key=lambda c: c.chunk_index)] == [2, 2, 1]
+
+    def test_retried_chunk_resumes(self, db_session, users):
+        ids = [str(user.id) for user in users] + [str(uuid.uuid4())]
+        job = create_bulk_email_job(db_session, ids, "Update", "Hello", chunk_size=10)
+        db_session.commit()
+        build = lambda user: user.email
+
+        chunk = claim_chunk(db_session, job.id, 0)
+        with pytest.raises(ChunkInProgress):
+            claim_chunk(db_session, job.id, 0)  # already running
+
+        crashing = FakeSender(fail_on_call=2)
+        with pytest.raises(ConnectionError):
+            send_chunk(db_session, chunk, build, crashing, batch_size=2)
+        db_session.rollback()
+        release_chunk(db_session, chunk.id, "SMTP server went away", final=False)
+
+        chunk = claim_chunk(db_session, job.id, 0)
+        assert chunk.next_offset == 2
+        assert chunk.attempts == 2
+
+        sender = FakeSender()
+        send_chunk(db_session, chunk, build, sender, batch_size=2)
+
+        assert sorted(crashing.recipients + sender.recipients) == sorted(user.email for user in users)
+        assert claim_chunk(db_session, job.id, 0) is None  # completed
+
+        totals = finalize_bulk_email_job(db_session, job.id)
+        assert totals["sent_count"] == 5
+        assert totals["failed_count"] == 1  # the unknown user id
+        assert totals["status"] == "completed_with_errors"
@@ -0,0 +1,122 @@
+"""
+Bulk Ingestion Tests
+Tests for zip/multi-file resume uploads: manifest, dedupe and upload limits
+"""
+
+import io
+import zipfile
+from datetime import timedelta
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.user import SubscriptionType, User
+from app.routers import get_current_user
+from app.services import bulk_ingestion, quota
+from app.services.quota import RollingWindow
+from app.utils.file_processing import clean_extracted_text
+
+BACKEND_RESUME = """Jane Doe
+jane.doe@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building billing systems.
+"""
+
+DATA_RESUME = """John Roe
+john.roe@example.com
+
+SUMMARY
+Data analyst with five years of experience in SQL and dashboards.
+"""
+
+
+def zip_of(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def extraction_pool(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_EXTRACTION_WORKERS", 1)
+    yield
+    bulk_ingestion.shutdown_extraction_pool()
+
+
+@pytest.fixture
+def user(client, db_session):
+    user = User(email="bulk@example.com", full_name="Jane Doe", subscription_type=SubscriptionType.FREE)
+    db_session.add(user)
+    db_session.commit()
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    return user
+
+
+def upload(client, files):
+    return client.post("/api/resume/upload/bulk", files=[
+        ("files", (name, content, "application/octet-stream")) for name, content in files
+    ])
+
+
+class TestBulkIngestion:
+    """Test the per-file manifest and what gets stored"""
+
+    def test_pool_workers_are_not_forked_from_the_server(self):
+        pool = bulk_ingestion.get_extraction_pool()
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+    def test_manifest(self, client, db_session, user):
+        archive = zip_of({
+            "resumes/jane.txt": BACKEND_RESUME,
+            "resumes/jane-copy.txt": BACKEND_RESUME,
+            "__MACOSX/resumes/._jane.txt": "resource fork",
+            "resumes/setup.exe": "binary",
+        })
+
+        response = upload(client, [("batch.zip", archive), ("john.txt", DATA_RESUME.encode())])
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["counts"] == {"created": 2, "duplicate": 1, "skipped": 1}
+        statuses = {entry["filename"]: entry for entry in body["files"]}
+        assert statuses["setup.exe"]["error"] == "Unsupported file type"
+        duplicate = next(entry for entry in body["files"] if entry["status"] == "duplicate")
+        assert duplicate["duplicate_of"] == statuses["jane.txt"]["resume_id"]
+        assert db_session.query(Resume).filter(Resume.user_id == user.id).count() == 2
+
+    def test_legacy_resume_without_features_is_a_duplicate(self, client, db_session, user):
+        # Stored by the single-file upload, which extracts text the same way
+        content = clean_extracted_text(BACKEND_RESUME)
+        legacy = Resume(user_id=user.id, filename="old.txt", content=content, file_type="txt")
+        db_session.add(legacy)
+        db_session.commit()
+        assert not legacy.features
+
+        response = upload(client, [("jane.txt", BACKEND_RESUME.encode())])
+
+        entry = response.json()["files"][0]
+        assert entry["status"] == "duplicate"
+        assert entry["duplicate_of"] == str(legacy.id)
+
+    def test_new_resumes_count_against_the_upload_limit(self, client, db_session, user, monkeypatch):
+        window = RollingWindow(fakeredis.FakeRedis(server=fakeredis.FakeServer()), "uploads", timedelta(days=7))
+        monkeypatch.setattr(quota, "get_upload_window", lambda subscription: window)
+        monkeypatch.setattr(settings, "ENFORCE_UPLOAD_LIMITS", True)
+
+        # Free plan: one upload per window, so two new resumes are refused outright
+        response = upload(client, [("jane.txt", BACKEND_RESUME.encode()), ("john.txt", DATA_RESUME.encode())])
+        assert response.status_code == 403
+        assert db_session.query(Resume).filter(Resume.user_id == user.id).count() == 0
+        assert window.count(user.id) == 0
+
+        assert upload(client, [("jane.txt", BACKEND_RESUME.encode())]).json()["counts"] == {"created": 1}
+        assert window.count(user.id) == 1
+
+        # Duplicates create nothing, so they do not count
+        assert upload(client, [("jane.txt", BACKEND_RESUME.encode())]).json()["counts"] == {"duplicate": 1}
+        assert window.count(user.id) == 1
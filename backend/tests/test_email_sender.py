@@ -0,0 +1,123 @@
+"""
+Email Sender Tests
+Tests for pooled SMTP delivery against a local aiosmtpd server
+"""
+
+import socket
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from app.services.email_sender import SMTPSender, build_message
+
+
+class RecordingHandler:
+    """Collects delivered messages and counts SMTP sessions"""
+
+    def __init__(self):
+        self.recipients = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def make_sender(controller, **kwargs) -> SMTPSender:
+    return SMTPSender(
+        host=controller.hostname,
+        port=controller.port,
+        from_email="noreply@cvperfect.test",
+        use_tls=False,
+        **kwargs
+    )
+
+
+def messages(count: int):
+    for i in range(count):
+        yield build_message(f"user{i}@example.com", "Announcement", f"<p>Hello {i}</p>")
+
+
+class TestSMTPSender:
+    """Test connection reuse, bounded concurrency and reconnects"""
+
+    def test_reuses_connections(self, smtp_server):
+        controller, handler = smtp_server
+        sender = make_sender(controller, pool_size=1)
+
+        for message in messages(20):
+            assert sender.send(message)
+        sender.close()
+
+        assert len(handler.recipients) == 20
+        assert sender.stats()["connections_opened"] == 1
+
+    def test_bulk_send_is_bounded_by_pool(self, smtp_server):
+        controller, handler = smtp_server
+        sender = make_sender(controller, pool_size=3)
+
+        result = sender.send_many(messages(200))
+        sender.close()
+
+        assert result.sent == 200 and result.failed == 0
+        assert sorted(handler.recipients) == sorted(f"user{i}@example.com" for i in range(200))
+        assert sender.stats()["connections_opened"] <= 3
+        assert result.messages_per_second > 0
+
+    def test_recycles_after_message_limit(self, smtp_server):
+        controller, handler = smtp_server
+        sender = make_sender(controller, pool_size=1, max_messages_per_connection=5)
+
+        sender.send_many(messages(12))
+        sender.close()
+
+        assert sender.stats()["connections_opened"] == 3
+
+    def test_reconnects_after_server_restart(self):
+        handler = RecordingHandler()
+        port = free_port()
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        sender = make_sender(controller, pool_size=1)
+        assert sender.send(build_message("first@example.com", "Hi", "<p>1</p>"))
+
+        # The pooled session dies with the server; a new server takes the port
+        controller.stop()
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            assert sender.send(build_message("second@example.com", "Hi", "<p>2</p>"))
+        finally:
+            sender.close()
+            controller.stop()
+
+        stats = sender.stats()
+        assert stats["reconnects"] == 1
+        assert stats["connections_opened"] == 2
+        assert "second@example.com" in handler.recipients
+
+    def test_unreachable_server_fails_without_raising(self):
+        sender = SMTPSender(host="127.0.0.1", port=free_port(), use_tls=False, retries=1, timeout=1)
+        assert sender.send(build_message("user@example.com", "Hi", "<p>x</p>")) is False
+        assert sender.stats()["failed"] == 1
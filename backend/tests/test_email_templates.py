@@ -0,0 +1,49 @@
+"""
+Email Template Tests
+Tests for pre-rendered email templates and per-user field substitution
+"""
+
+import pytest
+
+from app.services.email_templates import CompiledEmail, build_template_environment
+
+
+@pytest.fixture
+def environment(tmp_path):
+    return build_template_environment(str(tmp_path / "bytecode"), frontend_url="https://cvperfect.test")
+
+
+class TestCompiledEmail:
+    """Test that static parts render once and per-user fields are substituted"""
+
+    def test_matches_full_render(self, environment):
+        compiled = CompiledEmail(environment, "weekly_digest.html", ["full_name", "resumes_analyzed", "improvement_score"])
+        values = {"full_name": "Jane Smith", "resumes_analyzed": 3, "improvement_score": 12}
+
+        rendered = compiled.render(**values)
+
+        assert rendered == environment.get_template("weekly_digest.html").render(**values)
+        assert "https://cvperfect.test/dashboard" in rendered
+
+    def test_escapes_user_fields_in_html_only(self, environment):
+        html = CompiledEmail(environment, "welcome.html", ["full_name"])
+        text = CompiledEmail(environment, "welcome.txt", ["full_name"])
+
+        assert "Hi &lt;b&gt;Jane&lt;/b&gt;," in html.render(full_name="<b>Jane</b>")
+        assert "Hi <b>Jane</b>," in text.render(full_name="<b>Jane</b>")
+
+    def test_static_context_is_rendered_once(self, environment):
+        compiled = CompiledEmail(
+            environment, "bulk_notification.html", ["full_name"], message="<p>New features are live</p>"
+        )
+
+        assert "<p>New features are live</p>" in compiled.render(full_name="Ann")
+        assert "Hi Bob," in compiled.render(full_name="Bob")
+
+    def test_rejects_unused_user_field(self, environment):
+        with pytest.raises(ValueError):
+            CompiledEmail(environment, "password_reset.html", ["reset_url", "full_name"])
+
+    def test_bytecode_is_cached(self, environment, tmp_path):
+        CompiledEmail(environment, "password_reset.html", ["reset_url"])
+        assert any((tmp_path / "bytecode").iterdir())
@@ -0,0 +1,200 @@
+"""
+Entitlement Tests
+Tests for the per-plan feature masks and Redis-backed usage quotas
+"""
+
+from types import SimpleNamespace
+import uuid
+
+import fakeredis
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.entitlements import ENTITLEMENTS, Entitlements, Feature
+from app.middleware.subscription import check_feature_access, require_feature
+from app.models.user import SubscriptionType, User
+from app.routers import get_current_user
+from app.services import quota
+from app.services.quota import QuotaCounters
+
+
+def principal(subscription, remaining=0):
+    return SimpleNamespace(id=uuid.uuid4(), subscription_type=subscription, remaining_enhancements=remaining)
+
+
+class TestEntitlements:
+    """Test the precomputed plan table"""
+
+    def test_every_plan_has_a_mask(self):
+        assert set(ENTITLEMENTS) == set(SubscriptionType)
+
+    def test_plan_features(self):
+        free = Entitlements.for_user(principal(SubscriptionType.FREE))
+        one_time = Entitlements.for_user(principal(SubscriptionType.ONE_TIME))
+        professional = Entitlements.for_user(principal(SubscriptionType.PROFESSIONAL))
+
+        assert not free.allows(Feature.RESUME_ENHANCE)
+        assert one_time.allows(Feature.RESUME_ENHANCE)
+        assert one_time.is_metered(Feature.RESUME_ENHANCE)
+        assert not one_time.allows(Feature.COVER_LETTER | Feature.RESUME_ENHANCE)
+        assert professional.allows(Feature.AI_RESUME_GENERATION | Feature.ANALYTICS)
+        assert not professional.is_metered(Feature.RESUME_ENHANCE)
+
+    def test_check_feature_access_by_name(self):
+        user = principal(SubscriptionType.ENTERPRISE)
+        assert check_feature_access("analytics", user, None) is user
+
+        with pytest.raises(HTTPException) as denied:
+            check_feature_access("analytics", principal(SubscriptionType.BASIC), None)
+        assert denied.value.status_code == 403
+
+        with pytest.raises(HTTPException) as invalid:
+            check_feature_access("teleport", user, None)
+        assert invalid.value.status_code == 400
+
+    def test_require_feature_dependency(self):
+        assert require_feature(Feature.ANALYTICS) is require_feature(Feature.ANALYTICS)
+
+        app = FastAPI()
+
+        @app.get("/analytics")
+        async def analytics(entitlements: Entitlements = Depends(require_feature(Feature.ANALYTICS))):
+            return {"subscription": entitlements.subscription.value}
+
+        client = TestClient(app)
+        app.dependency_overrides[get_current_user] = lambda: principal(SubscriptionType.PROFESSIONAL)
+        assert client.get("/analytics").json() == {"subscription": "professional"}
+
+        app.dependency_overrides[get_current_user] = lambda: principal(SubscriptionType.FREE)
+        assert client.get("/analytics").status_code == 403
+
+
+class TestQuotaCounters:
+    """Test usage counting against the row's allowance"""
+
+    def test_consume_within_allowance(self):
+        counters = QuotaCounters(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        user_id = uuid.uuid4()
+
+        assert [counters.consume(Feature.RESUME_ENHANCE, user_id, allowance=2) for _ in range(3)] == [True, True, False]
+        assert counters.used(Feature.RESUME_ENHANCE, user_id) == 2
+
+        counters.refund(Feature.RESUME_ENHANCE, user_id)
+        assert counters.consume(Feature.RESUME_ENHANCE, user_id, allowance=2)
+
+    def test_flush_moves_usage_to_the_row(self, db_session):
+        user = User(
+            email="quota@example.com",
+            full_name="Quota User",
+            subscription_type=SubscriptionType.ONE_TIME,
+            remaining_enhancements=3,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        counters = QuotaCounters(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+        counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+
+        assert counters.flush(db_session) == 1
+        db_session.refresh(user)
+        assert user.remaining_enhancements == 1
+        assert counters.used(Feature.RESUME_ENHANCE, user.id) == 0
+        assert counters.flush(db_session) == 0
+
+    def test_failed_flush_keeps_counters_dirty(self, db_session):
+        user = User(
+            email="quota-retry@example.com",
+            full_name="Quota User",
+            subscription_type=SubscriptionType.ONE_TIME,
+            remaining_enhancements=3,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        counters = QuotaCounters(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+
+        class BrokenSession:
+            def execute(self, statement):
+                raise RuntimeError("database unavailable")
+
+            def rollback(self):
+                pass
+
+        with pytest.raises(RuntimeError):
+            counters.flush(BrokenSession())
+
+        assert counters.flush(db_session) == 1
+        db_session.refresh(user)
+        assert user.remaining_enhancements == 2
+
+    def test_use_during_flush_stays_dirty(self, db_session, monkeypatch):
+        user = User(
+            email="quota-race@example.com",
+            full_name="Quota User",
+            subscription_type=SubscriptionType.ONE_TIME,
+            remaining_enhancements=3,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        counters = QuotaCounters(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+        execute = db_session.execute
+
+        def execute_with_concurrent_use(statement, *args, **kwargs):
+            monkeypatch.setattr(db_session, "execute", execute)
+            counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+            return execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", execute_with_concurrent_use)
+
+        assert counters.flush(db_session) == 1
+        assert counters.used(Feature.RESUME_ENHANCE, user.id) == 1
+        assert counters.flush(db_session) == 1
+        db_session.refresh(user)
+        assert user.remaining_enhancements == 1
+
+    def test_stale_allowance_after_flush(self, db_session):
+        user = User(
+            email="quota-stale@example.com",
+            full_name="Quota User",
+            subscription_type=SubscriptionType.ONE_TIME,
+            remaining_enhancements=3,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        counters = QuotaCounters(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        assert counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+        assert counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+        counters.flush(db_session)
+
+        # Requests still holding the principal loaded before the flush (allowance 3)
+        results = [counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3) for _ in range(3)]
+        assert results == [True, False, False]
+        assert counters.remaining(Feature.RESUME_ENHANCE, user.id, allowance=3) == 0
+
+        counters.flush(db_session)
+        db_session.refresh(user)
+        assert user.remaining_enhancements == 0
+
+    def test_subscription_reports_unflushed_usage(self, client, db_session, monkeypatch):
+        user = User(
+            email="quota-report@example.com",
+            full_name="Quota User",
+            subscription_type=SubscriptionType.ONE_TIME,
+            remaining_enhancements=3,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        counters = QuotaCounters(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+        monkeypatch.setattr(quota, "get_quota_counters", lambda: counters)
+        client.app.dependency_overrides[get_current_user] = lambda: user
+        counters.consume(Feature.RESUME_ENHANCE, user.id, allowance=3)
+
+        # The row still says 3 until the next flush
+        assert client.get("/api/billing/subscription").json()["remaining_enhancements"] == 2
@@ -0,0 +1,110 @@
+"""
+History Export Tests
+Tests for the streamed NDJSON and zip history exports
+"""
+
+import io
+import json
+import uuid
+import zipfile
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.resume import CoverLetterHistory, Resume, ResumeAnalysis, ResumeFeatures
+from app.models.user import User
+from app.routers import get_current_user
+from app.routers import resume as resume_router
+from app.services import history_export
+from app.services.report_service import ReportCache
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building billing systems.
+"""
+
+
+@pytest.fixture
+def history():
+    """Committed through SessionLocal, which the export reads from directly"""
+    with SessionLocal() as db:
+        user = User(email=f"export-{uuid.uuid4().hex}@example.com", full_name="Jane Doe")
+        db.add(user)
+        db.flush()
+        resumes = [
+            Resume(user_id=user.id, filename=f"{name}.txt", content=RESUME_TEXT + name, file_type="txt")
+            for name in ("backend cv", "data cv")
+        ]
+        db.add_all(resumes)
+        db.flush()
+        for resume, scores in zip(resumes, ([81, 84], [70])):
+            db.add_all(
+                ResumeAnalysis(resume_id=resume.id, overall_score=score, ats_score=score - 10,
+                               strengths=["Clear summary"], recommendations=[])
+                for score in scores
+            )
+        db.add(CoverLetterHistory(user_id=user.id, resume_id=resumes[0].id, company_name="Acme",
+                                  job_description="Backend engineer", content="Dear Acme"))
+        db.commit()
+        user_id, resume_ids = user.id, [resume.id for resume in resumes]
+
+    yield user_id
+
+    with SessionLocal() as db:
+        db.query(CoverLetterHistory).filter(CoverLetterHistory.user_id == user_id).delete()
+        db.query(ResumeAnalysis).filter(ResumeAnalysis.resume_id.in_(resume_ids)).delete()
+        db.query(ResumeFeatures).filter(ResumeFeatures.resume_id.in_(resume_ids)).delete()
+        db.query(Resume).filter(Resume.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+
+
+class TestHistoryExport:
+    """Test what the exports contain and that they are streamed"""
+
+    def test_ndjson(self, client, history):
+        client.app.dependency_overrides[get_current_user] = lambda: User(id=history)
+
+        response = client.get("/api/resume/export/history")
+
+        assert response.status_code == 200
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["type"] for record in records] == ["analysis"] * 3 + ["cover_letter"]
+        assert sorted(record["resume_filename"] for record in records[:3]) == ["backend cv.txt", "backend cv.txt", "data cv.txt"]
+
+    def test_zip(self, client, history, tmp_path, monkeypatch):
+        monkeypatch.setattr(resume_router, "report_cache", ReportCache(str(tmp_path)))
+        client.app.dependency_overrides[get_current_user] = lambda: User(id=history)
+
+        response = client.get("/api/resume/export/history?format=zip")
+
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        names = archive.namelist()
+        assert sorted(name.split("/")[0] for name in names) == ["analyses"] * 3 + ["cover_letters"]
+        assert sum("backend_cv" in name for name in names) == 3
+        assert all(archive.read(name).startswith(b"%PDF") for name in names if name.endswith(".pdf"))
+        cover_letter = next(name for name in names if name.startswith("cover_letters/"))
+        assert archive.read(cover_letter) == b"Dear Acme"
+
+        # Rendered reports were cached for the next export
+        assert len(list(tmp_path.glob("*.pdf"))) == 3
+
+    def test_zip_is_streamed_and_reads_features_once_per_resume(self, history, monkeypatch):
+        lookups = []
+        get_resume_features = history_export.get_resume_features
+
+        def counting(db, resume):
+            lookups.append(resume.id)
+            return get_resume_features(db, resume)
+
+        monkeypatch.setattr(history_export, "get_resume_features", counting)
+
+        chunks = list(history_export.iter_history_zip(history))
+
+        # One chunk per member plus the central directory
+        assert len(chunks) == 5
+        assert len(lookups) == len(set(lookups)) == 2
+        assert len(zipfile.ZipFile(io.BytesIO(b"".join(chunks))).namelist()) == 4
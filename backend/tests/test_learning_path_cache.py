@@ -0,0 +1,50 @@
+"""
+Learning Path Cache Tests
+Tests for skill-gap signatures and per-candidate personalization
+"""
+
+from app.services.learning_path_cache import (
+    gap_signature,
+    personalize_learning_path,
+    role_bucket,
+    skill_gap,
+)
+
+
+JOB = """Senior Backend Engineer
+We are looking for a backend engineer with Python, Kubernetes and Terraform.
+Kubernetes experience is a must; Terraform and PostgreSQL are a plus."""
+
+
+class TestLearningPathCache:
+    """Test signature normalization and personalization"""
+
+    def test_role_bucket_drops_seniority(self):
+        assert role_bucket("Senior Backend Engineer II") == "backend engineer"
+        assert role_bucket(None, JOB) == "backend engineer"
+        assert role_bucket(None, None) == "general"
+
+    def test_skill_gap(self):
+        missing, matched = skill_gap("Backend developer. Python, PostgreSQL, Django.", JOB, "backend engineer")
+        assert missing[0] == "kubernetes"
+        assert "terraform" in missing
+        assert "python" in matched and "postgresql" in matched
+        assert not {"looking", "engineer", "senior"} & set(missing)
+
+    def test_signature_ignores_skill_order(self):
+        assert gap_signature("backend engineer", ["terraform", "kubernetes"]) == \
+            gap_signature("backend engineer", ["kubernetes", "terraform"])
+        assert gap_signature("backend engineer", ["kubernetes"]) != gap_signature("data engineer", ["kubernetes"])
+
+    def test_personalize_does_not_touch_shared_path(self):
+        shared = {
+            "learning_path": [{"skill": "Terraform"}, {"skill": "Kubernetes"}],
+            "career_advice": "Automate infrastructure.",
+        }
+        path = personalize_learning_path(shared, ["kubernetes", "terraform"], ["python"], "Backend Engineer")
+
+        assert [item["skill"] for item in path["learning_path"]] == ["Kubernetes", "Terraform"]
+        assert path["career_advice"].startswith("You already cover python")
+        assert path["target_role"] == "Backend Engineer"
+        assert shared["career_advice"] == "Automate infrastructure."
+        assert "matched_skills" not in shared
@@ -0,0 +1,130 @@
+"""
+Logging Tests
+Tests for the queued JSON logging, request ids and debug sampling
+"""
+
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.logging_config import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RequestContextFilter,
+    begin_request,
+    current_request_id,
+    end_request,
+)
+from app.middleware.request_context import RequestContextMiddleware
+
+
+def make_logger(name, debug_sample_rate=0.0, queue_size=100):
+    """Logger -> filtered queue handler; returns (logger, handler, listener, output)"""
+    output = io.StringIO()
+    stream_handler = logging.StreamHandler(output)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter(logging.INFO, debug_sample_rate))
+
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger, handler, QueueListener(log_queue, stream_handler), output
+
+
+def read_lines(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+class TestQueuedLogging:
+    """Test that records are formatted and written by the listener"""
+
+    def test_json_lines_with_request_id(self):
+        logger, _, listener, output = make_logger("tests.logging.json")
+        listener.start()
+        tokens = begin_request("req-1", debug_sample_rate=0.0)
+        try:
+            logger.info("Cover letter generated", extra={"characters": 1200})
+            try:
+                raise ValueError("model unavailable")
+            except ValueError:
+                logger.exception("Cover letter generation failed")
+        finally:
+            end_request(tokens)
+        listener.stop()
+
+        info, error = read_lines(output)
+        assert info["message"] == "Cover letter generated"
+        assert info["request_id"] == "req-1"
+        assert info["characters"] == 1200
+        assert error["level"] == "ERROR"
+        assert "ValueError: model unavailable" in error["exc_info"]
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        logger, handler, _, _ = make_logger("tests.logging.full", queue_size=2)
+        for i in range(5):
+            logger.info(f"message {i}")
+        assert handler.dropped == 3
+
+
+class TestDebugSampling:
+    """Test that a request keeps all or none of its debug trace"""
+
+    def test_unsampled_request_drops_debug_only(self):
+        logger, _, listener, output = make_logger("tests.logging.unsampled")
+        listener.start()
+        tokens = begin_request(None, debug_sample_rate=0.0)
+        try:
+            logger.debug("trace")
+            logger.warning("kept")
+        finally:
+            end_request(tokens)
+        listener.stop()
+
+        assert [line["message"] for line in read_lines(output)] == ["kept"]
+
+    def test_sampled_request_keeps_debug(self):
+        logger, _, listener, output = make_logger("tests.logging.sampled")
+        listener.start()
+        tokens = begin_request(None, debug_sample_rate=1.0)
+        try:
+            logger.debug("first")
+            logger.debug("second")
+        finally:
+            end_request(tokens)
+        listener.stop()
+
+        assert [line["message"] for line in read_lines(output)] == ["first", "second"]
+
+
+class TestRequestContextMiddleware:
+    """Test request id propagation"""
+
+    def make_client(self):
+        app = FastAPI()
+        app.add_middleware(RequestContextMiddleware)
+
+        @app.get("/id")
+        async def request_id():
+            return {"request_id": current_request_id()}
+
+        return TestClient(app)
+
+    def test_caller_request_id_is_used(self):
+        response = self.make_client().get("/id", headers={"X-Request-ID": "abc123"})
+        assert response.json()["request_id"] == "abc123"
+        assert response.headers["x-request-id"] == "abc123"
+
+    def test_request_id_is_generated(self):
+        response = self.make_client().get("/id")
+        assert response.json()["request_id"]
+        assert response.headers["x-request-id"] == response.json()["request_id"]
+        assert current_request_id() is None
@@ -0,0 +1,76 @@
+"""
+Metrics Tests
+Tests for request, Gemini and cache metrics exported on /metrics
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import observe_ai_call, record_cache
+from app.middleware.metrics import PrometheusMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def metrics_client():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+class TestRequestMetrics:
+    """Test that requests are labelled by route template"""
+
+    def test_counts_by_route_template(self, metrics_client):
+        before = sample("http_requests_total", method="GET", handler="/items/{item_id}", status="200")
+
+        metrics_client.get("/items/1")
+        metrics_client.get("/items/2")
+
+        assert sample("http_requests_total", method="GET", handler="/items/{item_id}", status="200") == before + 2
+        assert sample("http_request_duration_seconds_count", method="GET", handler="/items/{item_id}") >= 2
+
+    def test_unmatched_paths_share_a_label(self, metrics_client):
+        before = sample("http_requests_total", method="GET", handler="unmatched", status="404")
+
+        metrics_client.get("/random/path/1")
+        metrics_client.get("/random/path/2")
+
+        assert sample("http_requests_total", method="GET", handler="unmatched", status="404") == before + 2
+
+
+class TestAIMetrics:
+    """Test Gemini call and cache counters"""
+
+    def test_records_tokens_and_errors(self):
+        usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=30, cached_content_token_count=None)
+        tokens_before = sample("cvperfect_ai_tokens_total", endpoint="test_call", kind="prompt")
+        errors_before = sample("cvperfect_ai_errors_total", endpoint="test_call", error="TimeoutError")
+
+        with observe_ai_call("test_call") as call:
+            call.record(SimpleNamespace(usage_metadata=usage))
+        with pytest.raises(TimeoutError):
+            with observe_ai_call("test_call"):
+                raise TimeoutError()
+
+        assert sample("cvperfect_ai_tokens_total", endpoint="test_call", kind="prompt") == tokens_before + 120
+        assert sample("cvperfect_ai_errors_total", endpoint="test_call", error="TimeoutError") == errors_before + 1
+        assert sample("cvperfect_ai_request_duration_seconds_count", endpoint="test_call") >= 2
+
+    def test_cache_results(self):
+        before = sample("cvperfect_cache_requests_total", cache="test_cache", result="hit")
+        record_cache("test_cache", "hit", 3)
+        record_cache("test_cache", "miss", 0)
+        assert sample("cvperfect_cache_requests_total", cache="test_cache", result="hit") == before + 3
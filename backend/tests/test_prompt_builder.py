@@ -0,0 +1,53 @@
+"""
+Prompt Builder Tests
+Tests for prompt compaction helpers
+"""
+
+import json
+
+from app.utils.prompt_builder import (
+    TRUNCATION_MARKER,
+    compact_input,
+    compact_json,
+    drop_empty,
+    estimate_tokens,
+    normalize_text,
+    truncate_to_tokens,
+)
+
+
+class TestPromptBuilder:
+    """Test normalization, budgets and empty-field removal"""
+
+    def test_normalize_text_keeps_line_structure(self):
+        text = "  Jane   Smith \r\n\tSKILLS\n\n\n\nPython,\t SQL  "
+        assert normalize_text(text) == "Jane Smith\nSKILLS\n\nPython, SQL"
+
+    def test_truncate_respects_budget(self):
+        text = "\n".join(f"Bullet point number {i}" for i in range(200))
+        truncated = truncate_to_tokens(text, 50)
+        assert truncated.endswith(TRUNCATION_MARKER)
+        assert estimate_tokens(truncated) <= 50
+        assert truncate_to_tokens("short", 50) == "short"
+
+    def test_compact_input_empty(self):
+        assert compact_input(None, 100) == ""
+
+    def test_drop_empty(self):
+        seed = {
+            "personal_info": {"full_name": "Jane", "email": "", "phone": None},
+            "skills": [],
+            "experience": [{"job_title": "", "company": ""}, {"job_title": "Engineer", "company": " Acme "}],
+            "languages": [{"name": "", "level": "Fluent"}],
+        }
+        assert drop_empty(seed) == {
+            "personal_info": {"full_name": "Jane"},
+            "experience": [{"job_title": "Engineer", "company": "Acme"}],
+            "languages": [{"level": "Fluent"}],
+        }
+
+    def test_compact_json_is_smaller(self):
+        seed = {"summary": "", "skills": ["Python", "SQL"], "education": [{"degree": "", "details": ""}]}
+        compact = compact_json(seed)
+        assert json.loads(compact) == {"skills": ["Python", "SQL"]}
+        assert len(compact) < len(json.dumps(seed))
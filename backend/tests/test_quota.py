@@ -0,0 +1,140 @@
+"""
+Quota Tests
+Tests for rolling usage windows and for quota counters under concurrent use
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import fakeredis
+import pytest
+
+from app.core.entitlements import Feature
+from app.database import SessionLocal, engine
+from app.models.user import SubscriptionType, User
+from app.services.quota import QuotaCounters, RollingWindow, consume_quota_in_database
+
+PARALLEL_REQUESTS = 100
+
+
+def fake_redis():
+    return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+
+def hammer(use):
+    """Call use() from PARALLEL_REQUESTS threads released at once; returns the results"""
+    barrier = threading.Barrier(PARALLEL_REQUESTS)
+
+    def request(_):
+        barrier.wait()
+        return use()
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_REQUESTS) as pool:
+        return list(pool.map(request, range(PARALLEL_REQUESTS)))
+
+
+class TestRollingWindow:
+    """Test usage counting over a trailing window"""
+
+    def test_limit_within_window(self):
+        window = RollingWindow(fake_redis(), "uploads", timedelta(days=7))
+        user_id = uuid.uuid4()
+        now = 1_700_000_000
+
+        buckets = [window.record(user_id, limit=2, now=now) for _ in range(3)]
+        assert buckets[0] and buckets[0] == buckets[1] and buckets[2] is None
+        assert window.count(user_id, now=now) == 2
+
+        window.release(buckets[0])
+        assert window.record(user_id, limit=2, now=now)
+
+    def test_release_after_a_bucket_boundary(self):
+        window = RollingWindow(fake_redis(), "uploads", timedelta(days=7))
+        user_id = uuid.uuid4()
+        now = 1_700_000_000
+
+        bucket = window.record(user_id, now=now)
+        later = now + 86400
+        window.record(user_id, now=later)
+        window.release(bucket)
+
+        # The later use is untouched and no bucket goes negative
+        assert window.count(user_id, now=later) == 1
+        assert window.count(user_id, now=now) == 0
+
+    def test_release_of_an_expired_bucket_is_a_no_op(self):
+        client = fake_redis()
+        window = RollingWindow(client, "uploads", timedelta(days=7))
+        user_id = uuid.uuid4()
+
+        bucket = window.record(user_id)
+        client.delete(bucket)
+        window.release(bucket)
+
+        assert not client.exists(bucket)
+
+    def test_old_usage_leaves_the_window(self):
+        window = RollingWindow(fake_redis(), "uploads", timedelta(days=7))
+        user_id = uuid.uuid4()
+        now = 1_700_000_000
+
+        window.record(user_id, now=now)
+        window.record(user_id, now=now + 3 * 86400)
+        assert window.count(user_id, now=now + 6 * 86400) == 2
+        assert window.count(user_id, now=now + 8 * 86400) == 1
+        assert window.record(user_id, limit=1, now=now + 11 * 86400)
+
+
+class TestConcurrentQuota:
+    """Hammer one user's quota from 100 parallel requests"""
+
+    def test_redis_counter_allows_exactly_the_allowance(self):
+        counters = QuotaCounters(fake_redis())
+        user_id = uuid.uuid4()
+
+        results = hammer(lambda: counters.consume(Feature.RESUME_ENHANCE, user_id, allowance=10))
+
+        assert results.count(True) == 10
+        assert counters.used(Feature.RESUME_ENHANCE, user_id) == 10
+
+    def test_rolling_window_allows_exactly_the_limit(self):
+        window = RollingWindow(fake_redis(), "uploads", timedelta(days=30))
+        user_id = uuid.uuid4()
+
+        results = hammer(lambda: window.record(user_id, limit=25))
+
+        assert len(results) - results.count(None) == 25
+        assert window.count(user_id) == 25
+
+    def test_database_counter_loses_no_decrements(self):
+        # The app's pooled engine, so each request has its own connection
+        if engine.dialect.name == "sqlite":
+            pytest.skip("needs a database with concurrent connections")
+
+        with SessionLocal() as db:
+            user = User(
+                email=f"quota-{uuid.uuid4().hex}@example.com",
+                full_name="Quota User",
+                subscription_type=SubscriptionType.ONE_TIME,
+                remaining_enhancements=40,
+            )
+            db.add(user)
+            db.commit()
+            user_id = user.id
+
+        def use():
+            with SessionLocal() as db:
+                return consume_quota_in_database(db, user_id, Feature.RESUME_ENHANCE)
+
+        try:
+            results = hammer(use)
+
+            assert sorted(remaining for remaining in results if remaining is not None) == list(range(40))
+            with SessionLocal() as db:
+                assert db.get(User, user_id).remaining_enhancements == 0
+        finally:
+            with SessionLocal() as db:
+                db.delete(db.get(User, user_id))
+                db.commit()
@@ -0,0 +1,121 @@
+"""
+Report Cache Tests
+Tests for report cache keys, pruning and conditional downloads
+"""
+
+import os
+import time
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from app.models.resume import Resume, ResumeAnalysis
+from app.models.user import User
+from app.routers import get_current_user
+from app.routers import resume as resume_router
+from app.services.report_service import ReportCache
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building billing systems.
+"""
+
+
+def age(cache, key, fmt, seconds):
+    """Make an entry look last used `seconds` ago"""
+    path = cache.cache_dir / f"{key}.{fmt}"
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+class TestReportCache:
+    """Test keys and bounded storage"""
+
+    def test_key_covers_every_input(self):
+        resume_id, analysis_id = uuid.uuid4(), uuid.uuid4()
+        key = ReportCache.make_key(resume_id, analysis_id, "hash-a", "pdf")
+
+        assert ReportCache.make_key(resume_id, analysis_id, "hash-a", "pdf") == key
+        assert ReportCache.make_key(resume_id, analysis_id, "hash-b", "pdf") != key
+        assert ReportCache.make_key(resume_id, analysis_id, "hash-a", "txt") != key
+        assert ReportCache.make_key(resume_id, uuid.uuid4(), "hash-a", "pdf") != key
+
+    def test_etag_matching(self):
+        etag = ReportCache.etag("abc")
+        assert ReportCache.etag_matches('"abc"', etag)
+        assert ReportCache.etag_matches('W/"abc", "other"', etag)
+        assert ReportCache.etag_matches("*", etag)
+        assert not ReportCache.etag_matches('"other"', etag)
+        assert not ReportCache.etag_matches(None, etag)
+
+    def test_prune_removes_least_recently_used(self, tmp_path):
+        cache = ReportCache(str(tmp_path), max_bytes=250, prune_every=1000)
+        for index, key in enumerate(["a", "b", "c"]):
+            cache.put(key, "txt", b"x" * 100)
+            age(cache, key, "txt", 300 - index * 100)
+
+        # A hit makes the oldest entry the most recently used
+        assert cache.get("a", "txt") is not None
+
+        assert cache.prune() == 1
+        assert cache.get("b", "txt") is None
+        assert cache.get("a", "txt") is not None
+        assert cache.get("c", "txt") is not None
+
+    def test_prune_removes_idle_entries(self, tmp_path):
+        cache = ReportCache(str(tmp_path), max_age=timedelta(hours=1), prune_every=2)
+        cache.put("idle", "pdf", b"report")
+        age(cache, "idle", "pdf", 7200)
+
+        cache.put("fresh", "pdf", b"report")  # second write triggers a prune
+
+        assert cache.get("idle", "pdf") is None
+        assert cache.get("fresh", "pdf") == b"report"
+
+
+class TestReportDownload:
+    """Test ETag and 304 handling on report downloads"""
+
+    @pytest.fixture
+    def analyzed_resume(self, db_session):
+        user = User(email="report@example.com", full_name="Jane Doe")
+        db_session.add(user)
+        db_session.flush()
+        resume = Resume(user_id=user.id, filename="cv.txt", content=RESUME_TEXT, file_type="txt")
+        db_session.add(resume)
+        db_session.flush()
+        db_session.add(ResumeAnalysis(
+            resume_id=resume.id,
+            overall_score=78,
+            ats_score=70,
+            strengths=["Clear summary"],
+            recommendations=["Quantify results"],
+            analysis_data={"feedback": []},
+        ))
+        db_session.commit()
+        return user, resume
+
+    def test_conditional_download(self, client, analyzed_resume, tmp_path, monkeypatch):
+        user, resume = analyzed_resume
+        monkeypatch.setattr(resume_router, "report_cache", ReportCache(str(tmp_path)))
+        client.app.dependency_overrides[get_current_user] = lambda: user
+        url = f"/api/resume/download/{resume.id}?format=txt"
+
+        first = client.get(url)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert list(tmp_path.iterdir())
+
+        # Served from the cache: same bytes, same ETag
+        second = client.get(url)
+        assert second.content == first.content
+        assert second.headers["etag"] == etag
+
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
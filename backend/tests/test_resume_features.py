@@ -0,0 +1,115 @@
+"""
+Resume Features Tests
+Tests for the text feature pipeline and storing features once per version
+"""
+
+import threading
+import uuid
+
+import pytest
+
+from app.database import SessionLocal, engine
+from app.models.resume import Resume, ResumeFeatures
+from app.models.user import User
+from app.services.resume_features import get_resume_features
+from app.utils.text_features import FEATURES_PIPELINE_VERSION, compute_resume_features
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com | https://jane.example.dev/portfolio.html
+
+SUMMARY
+Backend engineer. Built billing systems at scale!
+
+EXPERIENCE
+Senior Engineer, Acme Corp. Led the payments team.
+"""
+
+
+class TestTextFeatures:
+    """Test the single-pass feature computation"""
+
+    def test_dots_in_emails_and_urls_do_not_end_sentences(self):
+        stats = compute_resume_features(RESUME_TEXT)["word_stats"]
+        assert stats["sentences"] == 4
+
+
+class TestResumeFeatures:
+    """Test reading and storing features per resume version"""
+
+    @pytest.fixture
+    def resume(self, db_session):
+        user = User(email="features@example.com", full_name="Jane Doe")
+        db_session.add(user)
+        db_session.flush()
+        resume = Resume(user_id=user.id, filename="cv.txt", content=RESUME_TEXT, file_type="txt")
+        db_session.add(resume)
+        db_session.commit()
+        return resume
+
+    def test_features_are_stored_once_per_version(self, db_session, resume):
+        first = get_resume_features(db_session, resume)
+        db_session.commit()
+        assert get_resume_features(db_session, resume).id == first.id
+        assert first.contact_info["email"] == "jane.doe@example.com"
+
+        resume.content = RESUME_TEXT + "\nSKILLS\nPython, SQL\n"
+        second = get_resume_features(db_session, resume)
+        db_session.commit()
+        assert second.id != first.id
+        assert "skills" in second.sections
+
+    def test_older_pipeline_rows_are_replaced(self, db_session, resume):
+        stale = get_resume_features(db_session, resume)
+        stale.pipeline_version = FEATURES_PIPELINE_VERSION - 1
+        stale.word_stats = {}
+        db_session.commit()
+
+        current = get_resume_features(db_session, resume)
+        assert current.id == stale.id
+        assert current.pipeline_version == FEATURES_PIPELINE_VERSION
+        assert current.word_stats["sentences"] == 4
+
+    def test_concurrent_first_reads(self):
+        # The app's pooled engine, so each reader has its own connection
+        if engine.dialect.name == "sqlite":
+            pytest.skip("needs a database with concurrent connections")
+
+        with SessionLocal() as db:
+            user = User(email=f"features-{uuid.uuid4().hex}@example.com", full_name="Jane Doe")
+            db.add(user)
+            db.flush()
+            resume = Resume(user_id=user.id, filename="cv.txt", content=RESUME_TEXT, file_type="txt")
+            db.add(resume)
+            db.commit()
+            user_id, resume_id = user.id, resume.id
+
+        readers = 8
+        barrier = threading.Barrier(readers)
+        errors = []
+
+        def read():
+            try:
+                with SessionLocal() as db:
+                    resume = db.get(Resume, resume_id)
+                    barrier.wait()
+                    get_resume_features(db, resume)
+                    db.commit()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(readers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert errors == []
+            with SessionLocal() as db:
+                assert db.query(ResumeFeatures).filter(ResumeFeatures.resume_id == resume_id).count() == 1
+        finally:
+            with SessionLocal() as db:
+                db.query(ResumeFeatures).filter(ResumeFeatures.resume_id == resume_id).delete()
+                db.query(Resume).filter(Resume.id == resume_id).delete()
+                db.query(User).filter(User.id == user_id).delete()
+                db.commit()
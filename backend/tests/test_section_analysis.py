@@ -0,0 +1,108 @@
+"""
+Section Analysis Tests
+Tests for full and opt-in incremental resume analysis
+"""
+
+import importlib
+
+import pytest
+
+from app.core.config import settings
+from app.models.resume import Resume, ResumeSectionAnalysis
+from app.models.user import User
+from app.routers import get_current_user
+from app.services.section_analysis import text_hash
+
+# app.services re-exports the service instance under the module's name
+gemini_module = importlib.import_module("app.services.gemini_service")
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building billing systems.
+
+SKILLS
+Python, PostgreSQL, Redis, Kubernetes
+"""
+
+FULL_RESPONSE_KEYS = {
+    "analysis_id", "overall_score", "ats_score", "strengths", "feedback",
+    "recommendations", "resume_features", "data_source",
+}
+
+
+class FakeGeminiService:
+    """Records which analysis ran; full and section scores differ on purpose"""
+
+    calls = []
+
+    async def analyze_resume_content(self, resume_text, job_description=None):
+        self.calls.append(("full", None))
+        return {"overall_score": 72, "ats_score": 65, "strengths": ["Clear summary"], "recommendations": []}
+
+    async def analyze_resume_sections(self, sections, job_description=None):
+        self.calls.append(("sections", sorted(sections)))
+        return {name: {"score": 90, "ats_score": 80, "strengths": [f"Good {name}"]} for name in sections}
+
+
+@pytest.fixture
+def resume(client, db_session, monkeypatch):
+    user = User(email="sections@example.com", full_name="Jane Doe")
+    db_session.add(user)
+    db_session.flush()
+    resume = Resume(user_id=user.id, filename="cv.txt", content=RESUME_TEXT, file_type="txt")
+    db_session.add(resume)
+    db_session.commit()
+
+    FakeGeminiService.calls = []
+    monkeypatch.setattr(gemini_module, "GeminiService", FakeGeminiService)
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    return resume
+
+
+class TestAnalyzeResume:
+    """Test which analysis the endpoint runs and what it returns"""
+
+    def test_full_analysis_by_default(self, client, resume):
+        response = client.post(f"/api/resume/analyze/{resume.id}")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body) == FULL_RESPONSE_KEYS
+        assert body["overall_score"] == 72
+        assert FakeGeminiService.calls == [("full", None)]
+
+    def test_incremental_reuses_unchanged_sections(self, client, db_session, resume):
+        first = client.post(f"/api/resume/analyze/{resume.id}?incremental=true").json()
+
+        assert set(first) == FULL_RESPONSE_KEYS | {"sections_analyzed", "sections_reused"}
+        assert first["sections_analyzed"] == ["skills", "summary"]
+        assert first["overall_score"] == 90
+
+        second = client.post(f"/api/resume/analyze/{resume.id}?incremental=true").json()
+
+        assert second["sections_analyzed"] == []
+        assert second["sections_reused"] == ["skills", "summary"]
+        assert FakeGeminiService.calls == [("sections", ["skills", "summary"])]
+
+    def test_edited_section_drops_its_feedback_for_every_job(self, client, db_session, resume):
+        analyze = lambda job: client.post(f"/api/resume/analyze/{resume.id}?incremental=true", json={"job_description": job})
+        analyze("Backend engineer, Python")
+        analyze("Platform engineer, Kubernetes")
+
+        resume.content = RESUME_TEXT.replace("Kubernetes", "Terraform")
+        db_session.commit()
+        analyze("Backend engineer, Python")
+
+        rows = db_session.query(ResumeSectionAnalysis).filter(ResumeSectionAnalysis.section == "skills").all()
+        assert len(rows) == 1
+        assert rows[0].job_hash == text_hash("Backend engineer, Python")
+
+    def test_feedback_is_kept_for_the_most_recent_jobs(self, client, db_session, resume, monkeypatch):
+        monkeypatch.setattr(settings, "SECTION_ANALYSIS_MAX_JOBS", 1)
+        for job in ("Backend engineer, Python", "Platform engineer, Kubernetes"):
+            client.post(f"/api/resume/analyze/{resume.id}?incremental=true", json={"job_description": job})
+
+        job_hashes = {row.job_hash for row in db_session.query(ResumeSectionAnalysis).all()}
+        assert job_hashes == {text_hash("Platform engineer, Kubernetes")}
@@ -0,0 +1,69 @@
+"""
+Section Parser Tests
+Tests for single-pass resume section parsing
+"""
+
+from app.utils.section_parser import parse_resume_sections, match_section_header, SECTION_KEYS
+from app.utils.file_processing import clean_extracted_text
+
+
+SAMPLE_RESUME = """Jane Smith
+jane.smith@example.com | (555) 123-4567
+PROFESSIONAL SUMMARY
+Backend engineer with experience scaling APIs.
+Experience
+Software Developer at Tech Corp
+Experience with Python across many teams and products
+Skills: Python, SQL, React
+EDUCATION
+BSc Computer Science
+"""
+
+
+class TestSectionHeaders:
+    """Test header detection"""
+
+    def test_plain_header(self):
+        assert match_section_header("EDUCATION") == ("education", "")
+
+    def test_longest_phrase_wins(self):
+        assert match_section_header("Professional Experience") == ("experience", "")
+
+    def test_inline_content_after_colon(self):
+        assert match_section_header("Skills: Python, SQL") == ("skills", "Python, SQL")
+
+    def test_body_text_is_not_a_header(self):
+        assert match_section_header("Experience with Python across many teams and products") is None
+
+
+class TestParseResumeSections:
+    """Test full section parsing"""
+
+    def test_returns_every_key(self):
+        sections = parse_resume_sections("")
+        assert set(sections) == set(SECTION_KEYS)
+        assert all(value == "" for value in sections.values())
+
+    def test_sections_are_split(self):
+        sections = parse_resume_sections(SAMPLE_RESUME)
+
+        assert sections["summary"] == "Backend engineer with experience scaling APIs."
+        assert sections["experience"].splitlines() == [
+            "Software Developer at Tech Corp",
+            "Experience with Python across many teams and products",
+        ]
+        assert sections["skills"] == "Python, SQL, React"
+        assert sections["education"] == "BSc Computer Science"
+        assert sections["projects"] == ""
+
+    def test_contact_info(self):
+        sections = parse_resume_sections(SAMPLE_RESUME)
+
+        assert "jane.smith@example.com" in sections["contact_info"]
+        assert "(555) 123-4567" in sections["contact_info"]
+
+    def test_cleaned_text_keeps_lines(self):
+        """Extracted text must keep line breaks or no headers can be found"""
+        cleaned = clean_extracted_text("EDUCATION\n\n   BSc   Computer Science  \n")
+
+        assert parse_resume_sections(cleaned)["education"] == "BSc Computer Science"
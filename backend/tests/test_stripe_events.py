@@ -0,0 +1,164 @@
+"""
+Stripe Event Tests
+Replays recorded webhook deliveries (out of order, with retries) through
+the webhook and the per-customer event processing
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.models.billing import StripeEvent
+from app.models.user import SubscriptionType, User
+from app.routers import billing
+from app.services.stripe_events import pending_event_customers, process_customer_events, record_stripe_event
+
+FIXTURES = Path(__file__).parent / "fixtures" / "stripe_events.json"
+WEBHOOK_SECRET = "whsec_test_replay"
+CUSTOMER = "cus_PReplayOne0001"
+OTHER_CUSTOMER = "cus_PReplayTwo0002"
+
+
+def signed(payload: bytes, secret: str = WEBHOOK_SECRET) -> dict:
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return {"stripe-signature": f"t={timestamp},v1={signature}", "content-type": "application/json"}
+
+
+@pytest.fixture
+def deliveries():
+    return json.loads(FIXTURES.read_text())
+
+
+@pytest.fixture
+def customers(db_session):
+    users = {}
+    for customer_id, email in ((CUSTOMER, "replay-one@example.com"), (OTHER_CUSTOMER, "replay-two@example.com")):
+        users[customer_id] = User(
+            email=email,
+            full_name="Replay User",
+            stripe_customer_id=customer_id,
+            subscription_type=SubscriptionType.FREE,
+        )
+        db_session.add(users[customer_id])
+    db_session.commit()
+    return users
+
+
+class TestWebhookReplay:
+    """Test intake and processing of the recorded deliveries"""
+
+    def test_replay(self, client, db_session, customers, deliveries, monkeypatch):
+        monkeypatch.setattr(billing, "STRIPE_WEBHOOK_SECRET", WEBHOOK_SECRET)
+
+        statuses = []
+        for event in deliveries:
+            payload = json.dumps(event).encode()
+            response = client.post("/api/billing/webhook", content=payload, headers=signed(payload))
+            assert response.status_code == 200
+            statuses.append(response.json()["status"])
+
+        # Retried deliveries are acknowledged but stored once
+        assert statuses.count("duplicate") == 2
+        stored = {event.id: event for event in db_session.query(StripeEvent).all()}
+        assert len(stored) == len({event["id"] for event in deliveries})
+        assert stored["evt_3OdReplayChargeOk001"].status == "ignored"
+
+        # Nothing is applied during intake
+        db_session.refresh(customers[CUSTOMER])
+        assert customers[CUSTOMER].subscription_type == SubscriptionType.FREE
+
+        assert process_customer_events(db_session, CUSTOMER) == 3
+        assert process_customer_events(db_session, OTHER_CUSTOMER) == 2
+        assert process_customer_events(db_session, CUSTOMER) == 0
+
+        # Applied in Stripe's order: the update (delivered first) wins over the creation
+        user = customers[CUSTOMER]
+        db_session.refresh(user)
+        paid_at = datetime.utcfromtimestamp(stored["evt_1OdReplayInvoicePaid1"].payload["created"])
+        assert user.subscription_type == SubscriptionType.ENTERPRISE
+        assert user.subscription_end_date == paid_at + timedelta(days=30)
+
+        other = customers[OTHER_CUSTOMER]
+        db_session.refresh(other)
+        assert other.subscription_type == SubscriptionType.FREE
+        assert other.subscription_end_date is None
+
+    def test_invalid_signature_is_rejected(self, client, db_session, deliveries, monkeypatch):
+        monkeypatch.setattr(billing, "STRIPE_WEBHOOK_SECRET", WEBHOOK_SECRET)
+        payload = json.dumps(deliveries[0]).encode()
+
+        response = client.post("/api/billing/webhook", content=payload, headers=signed(payload, "whsec_other"))
+
+        assert response.status_code == 400
+        assert db_session.query(StripeEvent).count() == 0
+
+    def test_failed_event_holds_back_later_events(self, db_session, customers, deliveries):
+        created, updated = deliveries[1], deliveries[0]
+        broken = json.loads(json.dumps(created))
+        broken["data"]["object"]["metadata"] = "corrupt"
+        record_stripe_event(db_session, broken)
+        record_stripe_event(db_session, updated)
+
+        assert process_customer_events(db_session, CUSTOMER) == 0
+
+        events = {event.id: event for event in db_session.query(StripeEvent).all()}
+        assert events[created["id"]].status == "failed"
+        assert events[created["id"]].attempts == 1
+        assert events[updated["id"]].status == "pending"
+        db_session.refresh(customers[CUSTOMER])
+        assert customers[CUSTOMER].subscription_type == SubscriptionType.FREE
+
+    def test_events_wait_for_the_customer_to_be_stored(self, db_session, deliveries):
+        created = deliveries[1]
+        record_stripe_event(db_session, created)
+
+        assert process_customer_events(db_session, CUSTOMER) == 0
+        event = db_session.get(StripeEvent, created["id"])
+        assert event.status == "pending"
+        assert event.attempts == 1
+
+        # Checkout stores the customer id afterwards; the next sweep applies the event
+        user = User(
+            email="late-customer@example.com",
+            full_name="Replay User",
+            stripe_customer_id=CUSTOMER,
+            subscription_type=SubscriptionType.FREE,
+        )
+        db_session.add(user)
+        db_session.commit()
+
+        assert process_customer_events(db_session, CUSTOMER) == 1
+        db_session.refresh(event)
+        db_session.refresh(user)
+        assert event.status == "processed"
+        assert event.attempts == 1
+        assert user.subscription_type == SubscriptionType.PROFESSIONAL
+
+    def test_events_without_a_customer_are_orphaned(self, db_session, deliveries, monkeypatch):
+        monkeypatch.setattr(settings, "STRIPE_EVENT_MAX_ORPHAN_ATTEMPTS", 2)
+        created = deliveries[1]
+        record_stripe_event(db_session, created)
+
+        process_customer_events(db_session, CUSTOMER)
+        assert pending_event_customers(db_session) == [CUSTOMER]
+
+        process_customer_events(db_session, CUSTOMER)
+        assert db_session.get(StripeEvent, created["id"]).status == "orphaned"
+        assert pending_event_customers(db_session) == []
+
+    def test_sweep_takes_the_oldest_customer_first(self, db_session, customers, deliveries):
+        newer, older = (json.loads(json.dumps(deliveries[1])) for _ in range(2))
+        newer["id"], newer["data"]["object"]["customer"] = "evt_sweep_newer", OTHER_CUSTOMER
+        older["id"], older["created"] = "evt_sweep_older", newer["created"] - 3600
+        record_stripe_event(db_session, newer)
+        record_stripe_event(db_session, older)
+
+        assert pending_event_customers(db_session) == [CUSTOMER, OTHER_CUSTOMER]
+        assert pending_event_customers(db_session, limit=1) == [CUSTOMER]
@@ -0,0 +1,132 @@
+"""
+Structured Output Tests
+Tests for the fallback JSON extractor used on Gemini responses
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.gemini_service import AI_GENERATE_INSTRUCTIONS, GeminiService
+from app.utils.structured_output import extract_json, parse_json_object, StructuredOutputError
+
+
+class FakeModels:
+    """Async generate_content returning a fixed text, recording each call"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls.append({"contents": contents, "config": config})
+        return SimpleNamespace(text=self.text, usage_metadata=None)
+
+
+def service_returning(text):
+    service = GeminiService(api_key="test-key")
+    service.client = SimpleNamespace(aio=SimpleNamespace(models=FakeModels(text)))
+    return service
+
+
+class TestExtractJson:
+    """Test tolerant JSON extraction"""
+
+    def test_plain_json(self):
+        assert parse_json_object('{"score": 80}') == {"score": 80}
+
+    def test_code_fence_and_prose(self):
+        text = 'Here is the analysis:\n```json\n{"strengths": ["a", "b"]}\n```\nHope this helps.'
+        assert parse_json_object(text) == {"strengths": ["a", "b"]}
+
+    def test_brackets_inside_strings(self):
+        text = 'Result: {"fix": "use [brackets] and {braces}", "ok": true}'
+        assert parse_json_object(text) == {"fix": "use [brackets] and {braces}", "ok": True}
+
+    def test_trailing_commas(self):
+        assert extract_json('{"a": [1, 2, ], "b": 3, }') == {"a": [1, 2], "b": 3}
+
+    def test_truncated_response(self):
+        assert extract_json('{"strengths": ["clear", "conc') == {"strengths": ["clear", "conc"]}
+
+    def test_skips_non_json_braces(self):
+        assert parse_json_object('Note {see below}] then {"x": 1}') == {"x": 1}
+
+    def test_no_json(self):
+        with pytest.raises(StructuredOutputError):
+            parse_json_object("No structured content here")
+
+    def test_requires_object(self):
+        with pytest.raises(StructuredOutputError):
+            parse_json_object("[1, 2, 3]")
+
+
+class TestResumeBuilderGeneration:
+    """Test the resume builder's JSON-mode generation"""
+
+    def test_generate_resume_data(self):
+        service = service_returning('{"summary": "Backend engineer", "skills": ["Python"]}')
+
+        data = asyncio.run(service.generate_resume_data("Target role: Engineer"))
+
+        assert data == {"summary": "Backend engineer", "skills": ["Python"]}
+        config = service.client.aio.models.calls[0]["config"]
+        assert config.response_mime_type == "application/json"
+        assert config.system_instruction == AI_GENERATE_INSTRUCTIONS
+
+    def test_non_json_output_is_empty(self):
+        service = service_returning("Sorry, I cannot help with that.")
+        assert asyncio.run(service.generate_resume_data("Target role: Engineer")) == {}
+
+    def test_generate_resume_summary(self):
+        service = service_returning("  Seasoned engineer.\n")
+        assert asyncio.run(service.generate_resume_summary("Write a summary")) == "Seasoned engineer."
+
+
+class TestAnalysisParsing:
+    """Test the placeholder analysis for unreadable responses"""
+
+    def test_fallback_analysis(self):
+        service = GeminiService(api_key="test-key")
+        response = SimpleNamespace(text="Sorry, I cannot help with that.")
+
+        assert service._parse_analysis_response(response)["error"] == "Analysis temporarily unavailable"
+        with pytest.raises(ValueError):
+            service._parse_analysis_response(response, fallback=False)
+
+
+class TestJobCompatibilityBatch:
+    """Test that batch results are matched back to their jobs"""
+
+    def test_results_follow_job_index(self):
+        service = service_returning(
+            '{"results": ['
+            '{"job_index": 2, "compatibility_score": 90, "matching_skills": ["Python"], "recommendation": "apply"},'
+            '{"job_index": 0, "compatibility_score": 40, "recommendation": "not_suitable"}'
+            ']}'
+        )
+
+        results = asyncio.run(service.analyze_job_compatibility_batch(
+            "Backend engineer", ["Data analyst", "Designer", "Python developer"]
+        ))
+
+        assert [result.get("compatibility_score") for result in results] == [40, None, 90]
+        assert results[1] == {}
+        assert results[2]["matching_skills"] == ["Python"]
+        assert len(service.client.aio.models.calls) == 1
+        assert "JOB 2:\nPython developer" in service.client.aio.models.calls[0]["contents"]
+
+    def test_missing_index_uses_position(self):
+        service = service_returning('{"results": [{"compatibility_score": 70}, {"job_index": 7, "compatibility_score": 10}]}')
+
+        results = asyncio.run(service.analyze_job_compatibility_batch("Backend engineer", ["Python developer", "Go developer"]))
+
+        assert results[0]["compatibility_score"] == 70
+        assert results[1] == {}
+
+    def test_no_jobs_makes_no_call(self):
+        service = service_returning("{}")
+
+        assert asyncio.run(service.analyze_job_compatibility_batch("Backend engineer", [])) == []
+        assert service.client.aio.models.calls == []
@@ -0,0 +1,40 @@
+"""
+Text Delta Tests
+Tests for the line deltas behind the resume version store
+"""
+
+import pytest
+
+from app.utils.text_delta import make_delta, apply_delta, delta_size, diff_texts
+
+
+BASE = "Jane Smith\nSUMMARY\nBackend engineer.\nSKILLS\nPython, SQL\n"
+
+
+class TestTextDelta:
+    """Test delta round trips and size"""
+
+    def test_round_trip(self):
+        edited = BASE.replace("Python, SQL", "Python, SQL, Go") + "PROJECTS\nSearch engine\n"
+        assert apply_delta(BASE, make_delta(BASE, edited)) == edited
+
+    def test_round_trip_without_trailing_newline(self):
+        assert apply_delta("a\nb", make_delta("a\nb", "a\nc")) == "a\nc"
+        assert apply_delta("", make_delta("", "new text")) == "new text"
+        assert apply_delta("old text", make_delta("old text", "")) == ""
+
+    def test_delta_grows_with_edit_not_text(self):
+        long_text = "".join(f"Bullet point number {i}\n" for i in range(500))
+        edited = long_text.replace("number 250\n", "number 250 (edited)\n")
+
+        assert delta_size(make_delta(long_text, edited)) < 100
+
+    def test_mismatched_base_is_rejected(self):
+        delta = make_delta(BASE, BASE + "extra\n")
+        with pytest.raises(ValueError):
+            apply_delta("short\n", delta)
+
+    def test_diff_counts(self):
+        diff = diff_texts("a\nb\n", "a\nc\nd\n")
+        assert diff["lines_added"] == 2
+        assert diff["lines_removed"] == 1
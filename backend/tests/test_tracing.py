@@ -0,0 +1,105 @@
+"""
+Request Timing Tests
+Tests for span timings, the Server-Timing header and the slow-request log
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.tracing import instrument_engine, span
+from app.middleware import timing
+from app.middleware.timing import TimingMiddleware
+
+
+class FakeSpan:
+    def __init__(self, name):
+        self.name = name
+
+    def update_name(self, name):
+        self.name = name
+
+
+def make_client(slow_threshold_ms, server_timing=True):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware, slow_threshold_ms=slow_threshold_ms, server_timing=server_timing)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/work")
+    async def work():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+        async def call_model():
+            with span("gemini"):
+                await asyncio.sleep(0.01)
+
+        # Spans in tasks started by the request are counted too
+        await asyncio.gather(call_model(), call_model())
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestRequestTiming:
+    """Test the per-request breakdown"""
+
+    def test_server_timing_header(self):
+        response = make_client(slow_threshold_ms=60000).get("/work")
+
+        header = response.headers["server-timing"]
+        entries = {part.split(";")[0].strip(): part for part in header.split(",")}
+        assert 'desc="2x"' in entries["db"]
+        assert 'desc="2x"' in entries["gemini"]
+        assert "total" in entries
+
+    def test_server_timing_is_off_by_default(self):
+        response = make_client(slow_threshold_ms=60000, server_timing=False).get("/work")
+        assert "server-timing" not in response.headers
+
+    def test_root_span_is_named_by_route(self, monkeypatch):
+        spans = []
+
+        @contextmanager
+        def request_span(name):
+            spans.append(FakeSpan(name))
+            yield spans[-1]
+
+        monkeypatch.setattr(timing, "request_span", request_span)
+        client = make_client(slow_threshold_ms=60000)
+        client.get("/items/123")
+        client.get("/items/456")
+        client.get("/missing")
+
+        assert [root.name for root in spans] == ["GET /items/{item_id}", "GET /items/{item_id}", "GET"]
+
+    def test_spans_outside_requests_are_ignored(self):
+        with span("gemini"):
+            pass
+
+    def test_slow_request_log(self, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+            make_client(slow_threshold_ms=0).get("/work")
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["event"] == "slow_request"
+        assert record["route"] == "/work"
+        assert record["status"] == 200
+        assert record["spans"]["db"]["count"] == 2
+        assert record["spans"]["gemini"]["ms"] >= 20
+
+    def test_fast_requests_are_not_logged(self, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.slow_requests"):
+            make_client(slow_threshold_ms=60000).get("/work")
+        assert not caplog.records
@@ -0,0 +1,133 @@
+"""
+Weekly Digest Tests
+Tests for set-based digest stats staging and batched sends
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from app.models.analytics import Analytics, ActionType
+from app.models.notification import WeeklyDigestStat
+from app.models.resume import Resume, ResumeAnalysis
+from app.models.user import User
+from app.services.email_sender import BulkSendResult
+from app.services.weekly_digest import (
+    digest_batch_bounds,
+    digest_week_start,
+    send_digest_batch,
+    stage_weekly_digest_stats,
+)
+
+WEEK = date(2024, 3, 4)  # a Monday
+IN_WEEK = datetime(2024, 3, 6, 12)
+BEFORE_WEEK = datetime(2024, 2, 20, 12)
+
+
+class FakeSender:
+    """Fails delivery to the given addresses; raises on the given send_many call to simulate a crash"""
+
+    def __init__(self, failing=(), fail_on_call=None):
+        self.failing = set(failing)
+        self.recipients = []
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def send_many(self, messages):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise ConnectionError("SMTP server went away")
+        result = BulkSendResult()
+        for recipient in messages:
+            if recipient in self.failing:
+                result.failed += 1
+                result.failed_recipients.append(recipient)
+            else:
+                self.recipients.append(recipient)
+                result.sent += 1
+        return result
+
+
+def add_analysis(db, user, score, created_at):
+    resume = Resume(user_id=user.id, filename="cv.pdf", content="cv", file_type="pdf")
+    db.add(resume)
+    db.flush()
+    db.add(ResumeAnalysis(resume_id=resume.id, overall_score=score, ats_score=score, created_at=created_at))
+
+
+@pytest.fixture
+def digest_users(db_session):
+    users = [User(email=f"digest{i}@example.com", full_name=f"User {i}", is_active=True) for i in range(5)]
+    users[3].is_active = False
+    db_session.add_all(users)
+    db_session.flush()
+
+    add_analysis(db_session, users[0], 60, BEFORE_WEEK)
+    add_analysis(db_session, users[0], 72, IN_WEEK)
+    add_analysis(db_session, users[0], 70, IN_WEEK)
+    db_session.add(Analytics(user_id=users[1].id, action_type=ActionType.COVER_LETTER_GENERATION, created_at=IN_WEEK))
+    db_session.add(Analytics(user_id=users[2].id, action_type=ActionType.RESUME_UPLOAD, created_at=IN_WEEK))
+    add_analysis(db_session, users[3], 90, IN_WEEK)  # inactive
+    add_analysis(db_session, users[4], 80, BEFORE_WEEK)  # nothing this week
+    db_session.commit()
+    return users
+
+
+class TestWeeklyDigest:
+    """Test staging, batch ranges and resumable sends"""
+
+    def test_week_start_is_previous_monday(self):
+        assert digest_week_start(date(2024, 3, 13)) == WEEK
+        assert digest_week_start(date(2024, 3, 11)) == WEEK
+
+    def test_stats_are_staged_for_active_users(self, db_session, digest_users):
+        assert stage_weekly_digest_stats(db_session, WEEK) == 3
+
+        stats = {
+            row.user_id: row
+            for row in db_session.query(WeeklyDigestStat).filter(WeeklyDigestStat.week_start == WEEK)
+        }
+        assert set(stats) == {digest_users[0].id, digest_users[1].id, digest_users[2].id}
+
+        first = stats[digest_users[0].id]
+        assert first.resumes_analyzed == 2
+        assert first.best_score == 72
+        assert first.improvement_score == 12
+        assert stats[digest_users[1].id].cover_letters_generated == 1
+        assert stats[digest_users[1].id].improvement_score == 0
+
+        # Staging the same week again keeps the existing rows
+        assert stage_weekly_digest_stats(db_session, WEEK) == 3
+
+    def test_batches_send_each_user_once(self, db_session, digest_users):
+        stage_weekly_digest_stats(db_session, WEEK)
+        bounds = digest_batch_bounds(db_session, WEEK, batch_size=2)
+        assert len(bounds) == 2
+
+        build = lambda row: row.email
+        failing = FakeSender(failing={"digest2@example.com"})
+        results = [send_digest_batch(db_session, WEEK, lower, upper, build, failing) for lower, upper in bounds]
+
+        assert sum(result["sent_count"] for result in results) == 2
+        assert sorted(failing.recipients) == ["digest0@example.com", "digest1@example.com"]
+
+        # Sent rows are no longer pending; the failed one is not retried either
+        assert digest_batch_bounds(db_session, WEEK, batch_size=2) == []
+
+    def test_retried_batch_does_not_resend(self, db_session, digest_users):
+        stage_weekly_digest_stats(db_session, WEEK)
+        build = lambda row: row.email
+
+        crashing = FakeSender(fail_on_call=2)
+        with pytest.raises(ConnectionError):
+            send_digest_batch(db_session, WEEK, None, None, build, crashing, group_size=1)
+        db_session.rollback()
+
+        sender = FakeSender()
+        result = send_digest_batch(db_session, WEEK, None, None, build, sender, group_size=1)
+
+        assert len(crashing.recipients) == 1
+        assert result["sent_count"] == 2
+        assert sorted(crashing.recipients + sender.recipients) == [
+            "digest0@example.com", "digest1@example.com", "digest2@example.com"
+        ]
@@ -7,11 +7,15 @@ import logging
 import asyncio
 import aiohttp
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from urllib.parse import urljoin, urlparse
+import os
 import re
-from bs4 import BeautifulSoup
+import hashlib
+import json
 from ..utils.text_processing import clean_text, extract_keywords
+from .html_parsing import get_parser_backend, scan_page, scan_job_element, JOB_SELECTORS
+from .crawl_state import CrawlStateStore, CrawlDelta, content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +43,22 @@ class CompanyCrawler:
     Processes actual job data, not mock data
     """
     
-    def __init__(self, gemini_service=None):
+    def __init__(
+        self,
+        gemini_service=None,
+        parser_backend: str = None,
+        corpus_dir: str = None,
+        state_path: str = None
+    ):
         self.session = None
         self.gemini_service = gemini_service
+        # Fastest installed parser unless one is requested (e.g. CRAWLER_PARSER=lxml)
+        self.parser = get_parser_backend(parser_backend or os.getenv("CRAWLER_PARSER"))
+        # Optional directory to save fetched pages for the parsing benchmark
+        self.corpus_dir = corpus_dir or os.getenv("CRAWLER_CORPUS_DIR")
+        # Persisted per-URL state enables incremental re-crawls
+        state_path = state_path or os.getenv("CRAWLER_STATE_PATH")
+        self.state_store = CrawlStateStore(state_path) if state_path else None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -99,7 +116,8 @@ class CompanyCrawler:
                     return []
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                self._save_to_corpus(company_url, html)
+                scan = scan_page(self.parser, self.parser.parse(html), selectors=[])
                 
                 # Common career page patterns
                 career_patterns = [
@@ -110,13 +128,14 @@ class CompanyCrawler:
                 career_urls = set()
                 
                 # Find links containing career-related keywords
-                for link in soup.find_all('a', href=True):
-                    href = link['href'].lower()
-                    link_text = link.get_text().lower()
+                for link in scan.links:
+                    raw_href = self.parser.attr(link, 'href')
+                    href = raw_href.lower()
+                    link_text = self.parser.text(link).lower()
                     
                     # Check if link or text contains career keywords
                     if any(pattern in href or pattern in link_text for pattern in career_patterns):
-                        full_url = urljoin(company_url, link['href'])
+                        full_url = urljoin(company_url, raw_href)
                         career_urls.add(full_url)
                 
                 # Common career page URL patterns
@@ -140,6 +159,108 @@ class CompanyCrawler:
             logger.error(f"Failed to find career pages for {company_url}: {str(e)}")
             return []
     
+    async def crawl_company_changes(self, company_url: str) -> CrawlDelta:
+        """
+        Re-crawl company career pages, returning only postings that were
+        added, changed or removed since the previous crawl. Nothing is
+        saved until the caller passes the consumed delta to
+        state_store.apply()
+        """
+        if not self.state_store:
+            raise ValueError("Incremental crawling requires a state_path")
+        
+        delta = CrawlDelta()
+        try:
+            logger.info(f"Starting incremental crawl of company careers: {company_url}")
+            
+            career_urls = await self._find_career_pages(company_url)
+            
+            for career_url in career_urls:
+                try:
+                    page_delta = await self._crawl_career_page_incremental(career_url, company_url)
+                    delta.extend(page_delta)
+                    
+                    # Respect rate limiting (a 304 costs the server almost nothing)
+                    if page_delta.crawled_pages:
+                        await asyncio.sleep(1)
+                    
+                except Exception as e:
+                    logger.error(f"Failed to crawl {career_url}: {str(e)}")
+                    continue
+            
+            # No pages at all means the site could not be read, not that every posting went away
+            if career_urls:
+                for state in self.state_store.pages_for(company_url):
+                    if state.url not in career_urls:
+                        delta.removed.extend(JobPosting(**previous["job"]) for previous in state.jobs.values())
+                        delta.dropped_pages.append(state.url)
+            
+            logger.info(
+                f"Incremental crawl of {company_url}: {len(delta.added)} added, "
+                f"{len(delta.changed)} changed, {len(delta.removed)} removed, "
+                f"{delta.unchanged_pages} pages unchanged"
+            )
+            return delta
+            
+        except Exception as e:
+            logger.error(f"Incremental company crawl failed for {company_url}: {str(e)}")
+            return delta
+    
+    async def _crawl_career_page_incremental(self, career_url: str, company_url: str) -> CrawlDelta:
+        """Conditional GET of a career page and diff against its saved state"""
+        
+        state = self.state_store.get(career_url)
+        state.company_url = company_url
+        delta = CrawlDelta()
+        
+        async with self.session.get(career_url, headers=state.conditional_headers()) as response:
+            if response.status == 304:
+                delta.unchanged_pages = 1
+                return delta
+            
+            if response.status != 200:
+                # Keep the previous state; an outage is not a mass removal
+                logger.warning(f"Skipping {career_url}: {response.status}")
+                return delta
+            
+            html = await response.text()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+        
+        page_hash = content_hash(html)
+        state.etag = etag
+        state.last_modified = last_modified
+        delta.states.append(state)
+        
+        # Servers without validators still return identical bodies
+        if page_hash == state.content_hash:
+            delta.unchanged_pages = 1
+            return delta
+        
+        delta.crawled_pages = 1
+        self._save_to_corpus(career_url, html)
+        jobs = await self._extract_jobs_from_html(html, career_url)
+        
+        current = {}
+        for job in jobs:
+            job_data = asdict(job)
+            fingerprint = content_hash(json.dumps(job_data, sort_keys=True))
+            current[job.id] = {"fingerprint": fingerprint, "job": job_data}
+            
+            previous = state.jobs.get(job.id)
+            if previous is None:
+                delta.added.append(job)
+            elif previous["fingerprint"] != fingerprint:
+                delta.changed.append(job)
+        
+        for job_id, previous in state.jobs.items():
+            if job_id not in current:
+                delta.removed.append(JobPosting(**previous["job"]))
+        
+        state.content_hash = page_hash
+        state.jobs = current
+        return delta
+    
     async def _crawl_career_page(self, career_url: str) -> List[JobPosting]:
         """Crawl individual career page for job listings"""
         
@@ -149,45 +270,55 @@ class CompanyCrawler:
                     return []
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Extract company name from domain
-                company_name = self._extract_company_name(career_url)
-                
-                # Try different job listing selectors
-                job_selectors = [
-                    '.job-listing', '.job-item', '.position', '.opening',
-                    '[class*="job"]', '[class*="position"]', '[class*="career"]',
-                    'article', '.card', '.listing'
-                ]
-                
-                jobs = []
-                for selector in job_selectors:
-                    job_elements = soup.select(selector)
-                    
-                    if job_elements:
-                        logger.info(f"Found {len(job_elements)} job elements with selector '{selector}'")
-                        
-                        for element in job_elements:
-                            job = await self._extract_job_from_element(element, company_name, career_url)
-                            if job:
-                                jobs.append(job)
-                        
-                        # If we found jobs with this selector, use them
-                        if jobs:
-                            break
-                
-                # If no structured jobs found, try extracting from text
-                if not jobs:
-                    jobs = await self._extract_jobs_from_text(soup, company_name, career_url)
-                
-                logger.info(f"Extracted {len(jobs)} jobs from {career_url}")
-                return jobs
+            
+            self._save_to_corpus(career_url, html)
+            return await self._extract_jobs_from_html(html, career_url)
                 
         except Exception as e:
             logger.error(f"Failed to crawl career page {career_url}: {str(e)}")
             return []
     
+    async def _extract_jobs_from_html(self, html: str, career_url: str) -> List[JobPosting]:
+        """Extract job postings from a fetched career page"""
+        
+        root = self.parser.parse(html)
+        
+        # Extract company name from domain
+        company_name = self._extract_company_name(career_url)
+        
+        # One walk over the page buckets elements for every job selector
+        scan = scan_page(self.parser, root, JOB_SELECTORS)
+        
+        jobs = []
+        for selector, _ in JOB_SELECTORS:
+            job_elements = scan.matches[selector]
+            
+            if job_elements:
+                logger.info(f"Found {len(job_elements)} job elements with selector '{selector}'")
+                
+                for element in job_elements:
+                    job = await self._extract_job_from_element(element, company_name, career_url)
+                    if job:
+                        jobs.append(job)
+                
+                # If we found jobs with this selector, use them
+                if jobs:
+                    break
+        
+        # If no structured jobs found, try extracting from text
+        if not jobs:
+            jobs = await self._extract_jobs_from_text(root, company_name, career_url)
+        
+        # Postings sharing a title (and no link of their own) are told apart by page order
+        seen = {}
+        for job in jobs:
+            seen[job.id] = seen.get(job.id, 0) + 1
+            if seen[job.id] > 1:
+                job.id = f"{job.id}_{seen[job.id]}"
+        
+        logger.info(f"Extracted {len(jobs)} jobs from {career_url}")
+        return jobs
+    
     async def _extract_job_from_element(
         self, 
         element, 
@@ -197,14 +328,11 @@ class CompanyCrawler:
         """Extract job posting from HTML element"""
         
         try:
+            # Single walk over the element for title, description and link
+            fields = scan_job_element(self.parser, element)
+            
             # Extract job title
-            title_selectors = ['h1', 'h2', 'h3', '.title', '.job-title', '[class*="title"]']
-            title = None
-            for selector in title_selectors:
-                title_elem = element.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text().strip()
-                    break
+            title = self.parser.text(fields.title).strip() if fields.title is not None else None
             
             if not title:
                 return None
@@ -217,7 +345,7 @@ class CompanyCrawler:
             ]
             
             location = "Not specified"
-            element_text = element.get_text()
+            element_text = self.parser.text(element)
             for pattern in location_patterns:
                 match = re.search(pattern, element_text, re.IGNORECASE)
                 if match:
@@ -225,18 +353,23 @@ class CompanyCrawler:
                     break
             
             # Extract description
-            description_elem = element.select_one('.description, .summary, .content, p')
-            description = description_elem.get_text().strip() if description_elem else element.get_text()[:500]
+            if fields.description is not None:
+                description = self.parser.text(fields.description).strip()
+            else:
+                description = element_text[:500]
             
             # Extract requirements
             requirements = self._extract_requirements_from_text(element_text)
             
             # Extract job URL
-            link_elem = element.select_one('a[href]')
-            job_url = urljoin(base_url, link_elem['href']) if link_elem else base_url
+            if fields.link is not None:
+                job_url = urljoin(base_url, self.parser.attr(fields.link, 'href'))
+            else:
+                job_url = base_url
             
-            # Generate unique ID
-            job_id = f"{company_name}_{hash(title + location)}".replace(' ', '_').lower()
+            # Identify the posting by its own link (or its title), so edits to
+            # location or description show up as changes rather than new jobs
+            job_id = self._stable_job_id(company_name, job_url if job_url != base_url else title)
             
             job = JobPosting(
                 id=job_id,
@@ -256,7 +389,7 @@ class CompanyCrawler:
     
     async def _extract_jobs_from_text(
         self, 
-        soup: BeautifulSoup, 
+        root, 
         company_name: str, 
         career_url: str
     ) -> List[JobPosting]:
@@ -264,7 +397,7 @@ class CompanyCrawler:
         
         try:
             # Get all text content
-            page_text = soup.get_text()
+            page_text = self.parser.text(root)
             
             # Look for job title patterns
             job_title_patterns = [
@@ -293,7 +426,7 @@ class CompanyCrawler:
                     context = page_text[start:end]
                     
                     # Generate job posting
-                    job_id = f"{company_name}_{hash(title)}".replace(' ', '_').lower()
+                    job_id = self._stable_job_id(company_name, title)
                     
                     job = JobPosting(
                         id=job_id,
@@ -354,6 +487,24 @@ class CompanyCrawler:
         
         return any(re.search(pattern, keyword, re.IGNORECASE) for pattern in tech_patterns)
     
+    def _stable_job_id(self, company_name: str, key: str) -> str:
+        """Job id that is identical across processes (builtin hash() is salted per run)"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return f"{company_name}_{digest}".replace(' ', '_').lower()
+    
+    def _save_to_corpus(self, url: str, html: str):
+        """Save a fetched page to the benchmark corpus directory (if configured)"""
+        if not self.corpus_dir:
+            return
+        
+        try:
+            os.makedirs(self.corpus_dir, exist_ok=True)
+            digest = hashlib.sha1(url.encode()).hexdigest()[:16]
+            with open(os.path.join(self.corpus_dir, f"{digest}.html"), 'w', encoding='utf-8') as f:
+                f.write(html)
+        except OSError as e:
+            logger.warning(f"Failed to save {url} to corpus: {str(e)}")
+    
     def _extract_company_name(self, url: str) -> str:
         """Extract company name from URL"""
         
@@ -378,58 +529,127 @@ class CompanyCrawler:
         self, 
         jobs: List[JobPosting], 
         user_resume: str,
-        target_skills: List[str] = None
+        target_skills: List[str] = None,
+        batch_size: int = 10,
+        max_concurrency: int = 4,
+        min_keyword_overlap: int = 1
     ) -> List[Dict[str, Any]]:
         """
         Filter and rank jobs using existing Gemini integration
+        A lexical prefilter drops clearly irrelevant postings, then the rest are
+        scored in batches (several jobs per prompt) with bounded concurrency
         """
         if not self.gemini_service:
             logger.warning("No Gemini service available for ML filtering")
             return [self._job_to_dict(job) for job in jobs]
         
         try:
-            filtered_jobs = []
+            candidates = self._lexical_prefilter(jobs, user_resume, target_skills, min_keyword_overlap)
+            dropped = len(jobs) - len(candidates)
+            if dropped:
+                logger.info(f"Lexical prefilter dropped {dropped} of {len(jobs)} jobs before ML scoring")
             
-            for job in jobs:
-                try:
-                    # Analyze job compatibility using existing Gemini
-                    compatibility = await self.gemini_service.analyze_job_compatibility(
-                        user_resume, 
-                        f"Job Title: {job.title}\nCompany: {job.company}\nLocation: {job.location}\n"
-                        f"Description: {job.description}\nRequirements: {', '.join(job.requirements)}"
-                    )
-                    
-                    job_dict = self._job_to_dict(job)
-                    job_dict['ml_analysis'] = {
-                        'compatibility_score': compatibility.get('compatibility_score', 0),
-                        'matching_skills': compatibility.get('matching_skills', []),
-                        'missing_skills': compatibility.get('missing_skills', []),
-                        'recommendation': compatibility.get('recommendation', 'review'),
-                        'key_strengths': compatibility.get('key_strengths', [])
-                    }
-                    
-                    filtered_jobs.append(job_dict)
-                    
-                    # Rate limiting for API calls
-                    await asyncio.sleep(0.5)
-                    
-                except Exception as e:
-                    logger.error(f"ML filtering failed for job {job.title}: {str(e)}")
-                    # Include job without ML analysis
-                    job_dict = self._job_to_dict(job)
-                    job_dict['ml_analysis'] = {'compatibility_score': 50, 'error': 'Analysis unavailable'}
-                    filtered_jobs.append(job_dict)
+            batches = [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def score(batch: List[JobPosting]) -> List[Dict[str, Any]]:
+                async with semaphore:
+                    return await self._score_job_batch(batch, user_resume)
+            
+            filtered_jobs = []
+            for batch_result in await asyncio.gather(*(score(batch) for batch in batches)):
+                filtered_jobs.extend(batch_result)
             
             # Sort by compatibility score
             filtered_jobs.sort(key=lambda x: x['ml_analysis'].get('compatibility_score', 0), reverse=True)
             
-            logger.info(f"ML filtered and ranked {len(filtered_jobs)} jobs")
+            logger.info(f"ML filtered and ranked {len(filtered_jobs)} jobs in {len(batches)} batches")
             return filtered_jobs
             
         except Exception as e:
             logger.error(f"ML job filtering failed: {str(e)}")
             return [self._job_to_dict(job) for job in jobs]
     
+    async def _score_job_batch(self, batch: List[JobPosting], user_resume: str) -> List[Dict[str, Any]]:
+        """Score one batch of jobs with a single Gemini call"""
+        
+        descriptions = [self._job_prompt_text(job) for job in batch]
+        
+        try:
+            if hasattr(self.gemini_service, 'analyze_job_compatibility_batch'):
+                results = await self.gemini_service.analyze_job_compatibility_batch(user_resume, descriptions)
+            else:
+                results = [
+                    await self.gemini_service.analyze_job_compatibility(user_resume, description)
+                    for description in descriptions
+                ]
+        except Exception as e:
+            logger.error(f"ML filtering failed for batch of {len(batch)} jobs: {str(e)}")
+            results = [None] * len(batch)
+        
+        scored = []
+        for job, compatibility in zip(batch, results):
+            job_dict = self._job_to_dict(job)
+            if compatibility:
+                job_dict['ml_analysis'] = {
+                    'compatibility_score': compatibility.get('compatibility_score', 0),
+                    'matching_skills': compatibility.get('matching_skills', []),
+                    'missing_skills': compatibility.get('missing_skills', []),
+                    'recommendation': compatibility.get('recommendation', 'review'),
+                    'key_strengths': compatibility.get('key_strengths', [])
+                }
+            else:
+                # Include job without ML analysis
+                job_dict['ml_analysis'] = {'compatibility_score': 50, 'error': 'Analysis unavailable'}
+            scored.append(job_dict)
+        
+        return scored
+    
+    def _job_prompt_text(self, job: JobPosting) -> str:
+        """Compact job text sent to the compatibility scorer"""
+        return (
+            f"Job Title: {job.title}\nCompany: {job.company}\nLocation: {job.location}\n"
+            f"Description: {job.description}\nRequirements: {', '.join(job.requirements)}"
+        )
+    
+    def _lexical_prefilter(
+        self,
+        jobs: List[JobPosting],
+        user_resume: str,
+        target_skills: List[str] = None,
+        min_keyword_overlap: int = 1
+    ) -> List[JobPosting]:
+        """
+        Keep jobs sharing at least min_keyword_overlap terms with the resume
+        keywords (plus target skills). Cheap set intersection, no LLM calls.
+        """
+        if min_keyword_overlap <= 0:
+            return list(jobs)
+        
+        profile_terms = set()
+        for keyword in extract_keywords(user_resume.lower(), max_keywords=50):
+            profile_terms.update(self._tokenize(keyword))
+        for skill in target_skills or []:
+            profile_terms.update(self._tokenize(skill.lower()))
+        
+        # Nothing to compare against: do not drop anything
+        if not profile_terms:
+            return list(jobs)
+        
+        kept = []
+        for job in jobs:
+            job_terms = self._tokenize(
+                f"{job.title} {job.description} {' '.join(job.requirements)}".lower()
+            )
+            if len(job_terms & profile_terms) >= min_keyword_overlap:
+                kept.append(job)
+        
+        return kept
+    
+    def _tokenize(self, text: str) -> set:
+        """Lowercase word tokens, keeping tech spellings like c++, c# and node.js"""
+        return set(re.findall(r'[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]', text))
+    
     def _job_to_dict(self, job: JobPosting) -> Dict[str, Any]:
         """Convert JobPosting to dictionary"""
         return {
@@ -464,4 +684,40 @@ async def crawl_company_jobs(company_url: str, user_resume: str = None) -> List[
             filtered_jobs = await crawler.filter_jobs_with_ml(jobs, user_resume)
             return filtered_jobs
         else:
-            return [crawler._job_to_dict(job) for job in jobs] 
\ No newline at end of file
+            return [crawler._job_to_dict(job) for job in jobs] 
+
+
+async def crawl_company_job_changes(
+    company_url: str,
+    user_resume: str = None,
+    state_path: str = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Incrementally re-crawl company jobs; ML filtering runs on the delta only
+    """
+    from backend.app.services.gemini_service import gemini_service
+    
+    state_path = state_path or os.getenv("CRAWLER_STATE_PATH", "crawl_state.json")
+    
+    async with CompanyCrawler(gemini_service, state_path=state_path) as crawler:
+        delta = await crawler.crawl_company_changes(company_url)
+        
+        new_or_updated = delta.added + delta.changed
+        if user_resume and new_or_updated:
+            scored = await crawler.filter_jobs_with_ml(new_or_updated, user_resume)
+            scored_by_id = {job['id']: job for job in scored}
+            added = [scored_by_id[job.id] for job in delta.added if job.id in scored_by_id]
+            changed = [scored_by_id[job.id] for job in delta.changed if job.id in scored_by_id]
+        else:
+            added = [crawler._job_to_dict(job) for job in delta.added]
+            changed = [crawler._job_to_dict(job) for job in delta.changed]
+        
+        result = {
+            'added': added,
+            'changed': changed,
+            'removed': [crawler._job_to_dict(job) for job in delta.removed]
+        }
+        
+        # Only now are these changes known to have been delivered
+        crawler.state_store.apply(delta)
+        return result
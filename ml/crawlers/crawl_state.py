@@ -0,0 +1,132 @@
+"""
+Crawl State Store
+Persisted per-URL crawl state for incremental re-crawls with change detection
+
+A crawl stages the new page states on its CrawlDelta; they are written with
+CrawlStateStore.apply() once the delta has been consumed, so a failure after
+the crawl (e.g. during scoring) reports the same changes again next time.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of page or posting content"""
+    return hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+
+
+@dataclass
+class CrawlState:
+    """What we knew about a career page after the last crawl"""
+    url: str
+    # Company site the page was found on, so pages that disappear can be retired
+    company_url: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    last_crawled: Optional[str] = None
+    # job_id -> {"fingerprint": ..., "job": serialized JobPosting}
+    jobs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for a conditional GET against this page"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+@dataclass
+class CrawlDelta:
+    """Job postings that changed since the previous crawl"""
+    added: List[Any] = field(default_factory=list)
+    changed: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+    unchanged_pages: int = 0
+    crawled_pages: int = 0
+    # Staged for CrawlStateStore.apply()
+    states: List[CrawlState] = field(default_factory=list)
+    dropped_pages: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def extend(self, other: 'CrawlDelta'):
+        self.added.extend(other.added)
+        self.changed.extend(other.changed)
+        self.removed.extend(other.removed)
+        self.unchanged_pages += other.unchanged_pages
+        self.crawled_pages += other.crawled_pages
+        self.states.extend(other.states)
+        self.dropped_pages.extend(other.dropped_pages)
+
+
+class CrawlStateStore:
+    """
+    JSON file store of CrawlState keyed by career URL
+    Writes are atomic (temp file + rename) so a crashed crawl never corrupts state
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._states: Dict[str, CrawlState] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._states = {url: CrawlState(**data) for url, data in raw.items()}
+            logger.info(f"Loaded crawl state for {len(self._states)} pages from {self.path}")
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Failed to load crawl state from {self.path}, starting fresh: {str(e)}")
+            self._states = {}
+
+    def get(self, url: str) -> CrawlState:
+        """A copy of the page's state; changes are kept only once put()"""
+        state = self._states.get(url)
+        return replace(state, jobs=dict(state.jobs)) if state else CrawlState(url=url)
+
+    def pages_for(self, company_url: str) -> List[CrawlState]:
+        return [state for state in self._states.values() if state.company_url == company_url]
+
+    def put(self, state: CrawlState):
+        state.last_crawled = datetime.utcnow().isoformat()
+        self._states[state.url] = state
+
+    def apply(self, delta: CrawlDelta):
+        """Record the page states staged on a consumed delta and save"""
+        for state in delta.states:
+            self.put(state)
+        for url in delta.dropped_pages:
+            self._states.pop(url, None)
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({url: asdict(state) for url, state in self._states.items()}, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,293 @@
+"""
+HTML Parsing Backends
+Pluggable parser backends and single-pass extraction for the company crawler
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+
+# Try to import optional parser backends (fastest first)
+try:
+    from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    import lxml.etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from bs4 import BeautifulSoup
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+
+logger = logging.getLogger(__name__)
+
+
+class ParserBackend:
+    """
+    Minimal node API the crawler needs from a parser
+    Backends wrap their native tree; nodes are passed through untouched
+    """
+
+    name = "base"
+
+    def parse(self, html: str):
+        raise NotImplementedError
+
+    def iter_descendants(self, node) -> Iterator[Any]:
+        """Yield element descendants of node in document order (node itself excluded)"""
+        raise NotImplementedError
+
+    def tag(self, node) -> str:
+        raise NotImplementedError
+
+    def attr(self, node, name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def text(self, node) -> str:
+        raise NotImplementedError
+
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax (Modest engine) - C parser, fastest option"""
+
+    name = "selectolax"
+
+    def parse(self, html: str):
+        return SelectolaxHTMLParser(html).root
+
+    def iter_descendants(self, node) -> Iterator[Any]:
+        # Explicit stack instead of traverse() so the root node is never yielded
+        stack = list(node.iter())
+        stack.reverse()
+        while stack:
+            child = stack.pop()
+            yield child
+            grandchildren = list(child.iter())
+            grandchildren.reverse()
+            stack.extend(grandchildren)
+
+    def tag(self, node) -> str:
+        return node.tag or ""
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+    def text(self, node) -> str:
+        return node.text(deep=True)
+
+
+@lru_cache(maxsize=1)
+def _lxml_utf8_parser():
+    return lxml.html.HTMLParser(encoding="utf-8")
+
+
+class LxmlBackend(ParserBackend):
+    """lxml.html - libxml2 parser"""
+
+    name = "lxml"
+
+    def parse(self, html: str):
+        # Parsed as UTF-8 bytes: lxml rejects str input that starts with an
+        # <?xml encoding=...?> declaration, as XHTML career pages often do
+        try:
+            return lxml.html.document_fromstring(html.encode("utf-8"), parser=_lxml_utf8_parser())
+        except lxml.etree.ParserError:
+            # Empty, whitespace-only or comment-only documents
+            return lxml.html.document_fromstring("<html></html>")
+
+    def iter_descendants(self, node) -> Iterator[Any]:
+        for element in node.iterdescendants():
+            # Skip comments and processing instructions
+            if isinstance(element.tag, str):
+                yield element
+
+    def tag(self, node) -> str:
+        return node.tag.lower()
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.get(name)
+
+    def text(self, node) -> str:
+        return node.text_content()
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """BeautifulSoup with the pure-Python html.parser builder (original behaviour)"""
+
+    name = "html.parser"
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, 'html.parser')
+
+    def iter_descendants(self, node) -> Iterator[Any]:
+        return iter(node.find_all(True))
+
+    def tag(self, node) -> str:
+        return node.name or ""
+
+    def attr(self, node, name: str) -> Optional[str]:
+        value = node.get(name)
+        # BeautifulSoup returns multi-valued attributes such as class as lists
+        if isinstance(value, list):
+            return ' '.join(value)
+        return value
+
+    def text(self, node) -> str:
+        return node.get_text()
+
+
+PARSER_BACKENDS: Dict[str, Tuple[bool, type]] = {
+    'selectolax': (HAS_SELECTOLAX, SelectolaxBackend),
+    'lxml': (HAS_LXML, LxmlBackend),
+    'html.parser': (HAS_BS4, BeautifulSoupBackend),
+}
+
+
+def available_backends() -> List[str]:
+    """Names of installed parser backends, fastest first"""
+    return [name for name, (installed, _) in PARSER_BACKENDS.items() if installed]
+
+
+def get_parser_backend(name: Optional[str] = None) -> ParserBackend:
+    """
+    Get a parser backend by name, or the fastest installed one
+    """
+    if name:
+        if name not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {name}")
+        installed, backend_cls = PARSER_BACKENDS[name]
+        if not installed:
+            raise ImportError(f"Parser backend '{name}' is not installed")
+        return backend_cls()
+
+    for backend_name in available_backends():
+        return PARSER_BACKENDS[backend_name][1]()
+
+    raise ImportError("No HTML parser available. Install selectolax, lxml or beautifulsoup4.")
+
+
+# Simple selector predicates: (tag, class attribute) -> bool
+# Only the selector forms the crawler uses are supported: tag, .class, [class*="x"]
+SelectorPredicate = Callable[[str, str], bool]
+
+
+def compile_selector(selector: str) -> SelectorPredicate:
+    """Compile a simple CSS selector into a predicate over (tag, class attribute)"""
+    selector = selector.strip()
+
+    if selector.startswith('.'):
+        class_name = selector[1:]
+        return lambda tag, classes: class_name in classes.split()
+
+    match = re.fullmatch(r'\[class\*=["\']?([^"\'\]]+)["\']?\]', selector)
+    if match:
+        fragment = match.group(1)
+        return lambda tag, classes: fragment in classes
+
+    if re.fullmatch(r'[a-zA-Z][a-zA-Z0-9]*', selector):
+        tag_name = selector.lower()
+        return lambda tag, classes: tag == tag_name
+
+    raise ValueError(f"Unsupported selector: {selector}")
+
+
+def compile_selector_group(selectors: List[str]) -> List[Tuple[str, SelectorPredicate]]:
+    """Compile selectors in priority order"""
+    return [(selector, compile_selector(selector)) for selector in selectors]
+
+
+# Selector groups used by the crawler, compiled once at import
+JOB_SELECTORS = compile_selector_group([
+    '.job-listing', '.job-item', '.position', '.opening',
+    '[class*="job"]', '[class*="position"]', '[class*="career"]',
+    'article', '.card', '.listing'
+])
+TITLE_SELECTORS = compile_selector_group(['h1', 'h2', 'h3', '.title', '.job-title', '[class*="title"]'])
+DESCRIPTION_SELECTORS = compile_selector_group(['.description', '.summary', '.content', 'p'])
+
+
+class PageScan:
+    """Result of a single walk over a parsed page"""
+
+    def __init__(self, root, selector_names: List[str]):
+        self.root = root
+        self.links: List[Any] = []
+        self.matches: Dict[str, List[Any]] = {name: [] for name in selector_names}
+
+
+def scan_page(
+    backend: ParserBackend,
+    root,
+    selectors: List[Tuple[str, SelectorPredicate]] = JOB_SELECTORS
+) -> PageScan:
+    """
+    Walk the document once, bucketing elements by every selector they match
+    and collecting anchors with an href. Buckets keep document order, so
+    scan.matches[selector] equals what soup.select(selector) would return.
+    """
+    scan = PageScan(root, [name for name, _ in selectors])
+
+    for node in backend.iter_descendants(root):
+        tag = backend.tag(node)
+        classes = backend.attr(node, 'class') or ''
+
+        if tag == 'a' and backend.attr(node, 'href') is not None:
+            scan.links.append(node)
+
+        for name, predicate in selectors:
+            if predicate(tag, classes):
+                scan.matches[name].append(node)
+
+    return scan
+
+
+class ElementScan:
+    """First title / description / link found in a job element"""
+
+    def __init__(self):
+        self.title = None
+        self.description = None
+        self.link = None
+
+
+def scan_job_element(backend: ParserBackend, element) -> ElementScan:
+    """
+    Walk a job element once, picking the first node for each field.
+    Title keeps selector priority (an h1 beats an earlier .title); description
+    and link take the first match in document order, like select_one.
+    """
+    result = ElementScan()
+    title_rank = len(TITLE_SELECTORS)
+
+    for node in backend.iter_descendants(element):
+        tag = backend.tag(node)
+        classes = backend.attr(node, 'class') or ''
+
+        if title_rank:
+            for rank, (_, predicate) in enumerate(TITLE_SELECTORS[:title_rank]):
+                if predicate(tag, classes):
+                    result.title = node
+                    title_rank = rank
+                    break
+
+        if result.description is None:
+            if any(predicate(tag, classes) for _, predicate in DESCRIPTION_SELECTORS):
+                result.description = node
+
+        if result.link is None and tag == 'a' and backend.attr(node, 'href') is not None:
+            result.link = node
+
+        # An h1 cannot be beaten, stop early once everything is found
+        if title_rank == 0 and result.description is not None and result.link is not None:
+            break
+
+    return result
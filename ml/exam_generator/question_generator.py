@@ -3,7 +3,6 @@ Practice Exam Question Generator
 Generates custom practice questions based on resume analysis and job requirements.
 """
 
-import json
 import logging
 from typing import List, Dict, Optional
 from dataclasses import dataclass
@@ -119,20 +118,9 @@ class QuestionGenerator:
         """
         
         try:
-            response = self.model.generate_content(analysis_prompt)
-            analysis_text = response.text.strip()
-            
-            # Extract JSON from response
-            if "```json" in analysis_text:
-                json_start = analysis_text.find("```json") + 7
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            elif "```" in analysis_text:
-                json_start = analysis_text.find("```") + 3
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            
-            return json.loads(analysis_text)
+            from backend.app.utils.structured_output import parse_json_object
+            response = self.model.generate_content(analysis_prompt, generation_config={"response_mime_type": "application/json"})
+            return parse_json_object(response.text)
             
         except Exception as e:
             self.logger.error(f"Skill gap analysis failed: {str(e)}")
@@ -213,20 +201,9 @@ class QuestionGenerator:
         """
         
         try:
-            response = self.model.generate_content(question_prompt)
-            response_text = response.text.strip()
-            
-            # Extract JSON from response
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            
-            question_data = json.loads(response_text)
+            from backend.app.utils.structured_output import parse_json_object
+            response = self.model.generate_content(question_prompt, generation_config={"response_mime_type": "application/json"})
+            question_data = parse_json_object(response.text)
             
             return ExamQuestion(
                 id=question_id,
@@ -114,23 +114,12 @@ class ResumeAnalyzer:
             """
         
         try:
-            response = self.model.generate_content(base_prompt.format(resume_text=resume_text))
-            
-            # Parse JSON response
-            import json
-            analysis_text = response.text.strip()
-            
-            # Extract JSON from response (handle markdown code blocks)
-            if "```json" in analysis_text:
-                json_start = analysis_text.find("```json") + 7
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            elif "```" in analysis_text:
-                json_start = analysis_text.find("```") + 3
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            
-            return json.loads(analysis_text)
+            from backend.app.utils.structured_output import parse_json_object
+            response = self.model.generate_content(
+                base_prompt.format(resume_text=resume_text),
+                generation_config={"response_mime_type": "application/json"}
+            )
+            return parse_json_object(response.text)
             
         except Exception as e:
             self.logger.error(f"AI analysis failed: {str(e)}")
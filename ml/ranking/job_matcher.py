@@ -5,7 +5,7 @@ Uses existing Gemini integration (not Pro tier)
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 import google.generativeai as genai
 from ..utils.text_processing import extract_keywords, calculate_text_similarity, clean_text
@@ -49,7 +49,8 @@ class JobMatcher:
         self, 
         resume_text: str, 
         jobs: List[Job], 
-        max_matches: int = 10
+        max_matches: int = 10,
+        resume_keywords: Optional[List[str]] = None
     ) -> List[JobMatch]:
         """
         Match a resume against multiple job postings
@@ -58,15 +59,18 @@ class JobMatcher:
             resume_text: The candidate's resume text
             jobs: List of job postings to match against
             max_matches: Maximum number of matches to return
+            resume_keywords: Stored keywords for this resume (resume_features);
+                extracted once here when not provided
             
         Returns:
             List of JobMatch objects sorted by match score
         """
         try:
             matches = []
+            keywords = self._keyword_set(resume_text, resume_keywords)
             
             for job in jobs:
-                match = await self._analyze_job_match(resume_text, job)
+                match = await self._analyze_job_match(resume_text, job, keywords)
                 if match:
                     matches.append(match)
             
@@ -82,7 +86,8 @@ class JobMatcher:
     async def _analyze_job_match(
         self, 
         resume_text: str, 
-        job: Job
+        job: Job,
+        resume_keywords: Optional[Set[str]] = None
     ) -> Optional[JobMatch]:
         """Analyze how well a resume matches a specific job"""
         
@@ -91,7 +96,9 @@ class JobMatcher:
             ai_analysis = await self._get_ai_match_analysis(resume_text, job)
             
             # Calculate keyword-based similarity as fallback
-            keyword_similarity = self._calculate_keyword_similarity(resume_text, job.description)
+            if resume_keywords is None:
+                resume_keywords = self._keyword_set(resume_text)
+            keyword_similarity = self._calculate_keyword_similarity(resume_keywords, job.description)
             
             # Combine AI analysis with keyword matching
             final_score = self._calculate_final_score(ai_analysis, keyword_similarity)
@@ -151,21 +158,9 @@ class JobMatcher:
         """
         
         try:
-            response = self.model.generate_content(analysis_prompt)
-            analysis_text = response.text.strip()
-            
-            # Parse JSON response
-            import json
-            if "```json" in analysis_text:
-                json_start = analysis_text.find("```json") + 7
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            elif "```" in analysis_text:
-                json_start = analysis_text.find("```") + 3
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            
-            return json.loads(analysis_text)
+            from backend.app.utils.structured_output import parse_json_object
+            response = self.model.generate_content(analysis_prompt, generation_config={"response_mime_type": "application/json"})
+            return parse_json_object(response.text)
             
         except Exception as e:
             self.logger.error(f"AI match analysis failed: {str(e)}")
@@ -180,11 +175,16 @@ class JobMatcher:
                 "improvement_areas": []
             }
     
-    def _calculate_keyword_similarity(self, resume_text: str, job_description: str) -> float:
+    def _keyword_set(self, resume_text: str, stored_keywords: Optional[List[str]] = None) -> Set[str]:
+        """Resume keywords, preferring the stored features over re-extraction"""
+        if stored_keywords:
+            return {keyword.lower() for keyword in stored_keywords}
+        return set(extract_keywords(clean_text(resume_text.lower()), 50))
+    
+    def _calculate_keyword_similarity(self, resume_keywords: Set[str], job_description: str) -> float:
         """Calculate similarity based on keyword overlap"""
         
-        # Extract keywords from both texts
-        resume_keywords = set(extract_keywords(clean_text(resume_text.lower()), 50))
+        # Resume keywords are extracted once per resume by the caller
         job_keywords = set(extract_keywords(clean_text(job_description.lower()), 50))
         
         if not resume_keywords or not job_keywords:
@@ -215,7 +215,8 @@ class JobMatcher:
         Rank multiple candidates for a single job
         
         Args:
-            candidates: List of candidate dictionaries with resume_text
+            candidates: List of candidate dictionaries with resume_text and
+                optionally stored keywords
             job: Job posting to match against
             
         Returns:
@@ -226,11 +227,12 @@ class JobMatcher:
         
         for candidate in candidates:
             resume_text = candidate.get('resume_text', '')
-            if not resume_text:
+            if not resume_text and not candidate.get('keywords'):
                 continue
             
             # Calculate match score
-            keyword_similarity = self._calculate_keyword_similarity(resume_text, job.description)
+            resume_keywords = self._keyword_set(resume_text, candidate.get('keywords'))
+            keyword_similarity = self._calculate_keyword_similarity(resume_keywords, job.description)
             
             ranked_candidates.append((candidate, keyword_similarity))
         
@@ -299,17 +301,9 @@ class JobMatcher:
             }}
             """
             
-            response = self.model.generate_content(recommendation_prompt)
-            analysis_text = response.text.strip()
-            
-            # Parse JSON response
-            import json
-            if "```json" in analysis_text:
-                json_start = analysis_text.find("```json") + 7
-                json_end = analysis_text.find("```", json_start)
-                analysis_text = analysis_text[json_start:json_end].strip()
-            
-            return json.loads(analysis_text)
+            from backend.app.utils.structured_output import parse_json_object
+            response = self.model.generate_content(recommendation_prompt, generation_config={"response_mime_type": "application/json"})
+            return parse_json_object(response.text)
             
         except Exception as e:
             self.logger.error(f"Career recommendations failed: {str(e)}")
@@ -0,0 +1,149 @@
+"""
+Crawl State Tests
+Tests for incremental re-crawls against a scripted company site
+"""
+
+import asyncio
+
+import pytest
+
+from ml.crawlers import company_crawler
+from ml.crawlers.company_crawler import CompanyCrawler
+from ml.crawlers.crawl_state import CrawlStateStore
+
+COMPANY_URL = "https://acme.example/"
+CAREERS_URL = "https://acme.example/careers"
+TEAM_URL = "https://acme.example/team-openings"
+
+
+def home_page(*links):
+    anchors = "".join(f'<a href="{href}">{text}</a>' for href, text in links)
+    return f"<html><body>{anchors}</body></html>"
+
+
+def career_page(*jobs):
+    listings = "".join(
+        f'<div class="job-listing"><h3>{title}</h3><p class="description">Location: {location}</p>\n'
+        f'<a href="{href}">Apply</a></div>'
+        for title, location, href in jobs
+    )
+    return f"<html><body>{listings}</body></html>"
+
+
+class FakeResponse:
+    def __init__(self, status, body=""):
+        self.status = status
+        self.body = body
+        self.headers = {}
+
+    async def text(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serves the pages in `site`; anything else is a 404"""
+
+    def __init__(self, site):
+        self.site = site
+
+    def get(self, url, headers=None):
+        if url in self.site:
+            return FakeResponse(200, self.site[url])
+        return FakeResponse(404)
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    async def sleep(_):
+        return None
+
+    monkeypatch.setattr(company_crawler.asyncio, "sleep", sleep)
+
+
+def crawl(state_path, site):
+    crawler = CompanyCrawler(state_path=str(state_path))
+    crawler.session = FakeSession(site)
+    return crawler, asyncio.run(crawler.crawl_company_changes(COMPANY_URL))
+
+
+def titles(jobs):
+    return sorted(job.title for job in jobs)
+
+
+class TestIncrementalCrawl:
+    """Test change detection and when crawl state is saved"""
+
+    def test_location_edit_is_a_change(self, tmp_path):
+        state_path = tmp_path / "state.json"
+        site = {
+            COMPANY_URL: home_page(),
+            CAREERS_URL: career_page(("Backend Engineer", "Berlin", "/jobs/1"), ("Data Analyst", "Paris", "/jobs/2")),
+        }
+        crawler, delta = crawl(state_path, site)
+        assert titles(delta.added) == ["Backend Engineer", "Data Analyst"]
+        crawler.state_store.apply(delta)
+
+        site[CAREERS_URL] = career_page(("Backend Engineer", "Remote", "/jobs/1"), ("Data Analyst", "Paris", "/jobs/2"))
+        _, delta = crawl(state_path, site)
+
+        assert titles(delta.changed) == ["Backend Engineer"]
+        assert delta.changed[0].location == "Remote"
+        assert delta.added == [] and delta.removed == []
+
+    def test_state_is_saved_only_when_applied(self, tmp_path):
+        state_path = tmp_path / "state.json"
+        site = {
+            COMPANY_URL: home_page(),
+            CAREERS_URL: career_page(("Backend Engineer", "Berlin", "/jobs/1")),
+        }
+
+        # Scoring failed before the delta was applied, so the job is reported again
+        crawler, delta = crawl(state_path, site)
+        assert titles(delta.added) == ["Backend Engineer"]
+        assert not state_path.exists()
+        delta = asyncio.run(crawler.crawl_company_changes(COMPANY_URL))
+        assert titles(delta.added) == ["Backend Engineer"]
+
+        crawler.state_store.apply(delta)
+        _, delta = crawl(state_path, site)
+        assert not delta.has_changes
+        assert delta.unchanged_pages == 1
+
+    def test_jobs_on_a_vanished_career_page_are_removed(self, tmp_path):
+        state_path = tmp_path / "state.json"
+        site = {
+            COMPANY_URL: home_page(("/team-openings", "Careers on the platform team")),
+            CAREERS_URL: career_page(("Backend Engineer", "Berlin", "/jobs/1")),
+            TEAM_URL: career_page(("Platform Engineer", "Remote", "/jobs/9")),
+        }
+        crawler, delta = crawl(state_path, site)
+        assert titles(delta.added) == ["Backend Engineer", "Platform Engineer"]
+        crawler.state_store.apply(delta)
+
+        site[COMPANY_URL] = home_page()
+        del site[TEAM_URL]
+        crawler, delta = crawl(state_path, site)
+
+        assert titles(delta.removed) == ["Platform Engineer"]
+        crawler.state_store.apply(delta)
+        assert [state.url for state in CrawlStateStore(str(state_path)).pages_for(COMPANY_URL)] == [CAREERS_URL]
+
+    def test_unreachable_site_removes_nothing(self, tmp_path):
+        state_path = tmp_path / "state.json"
+        site = {
+            COMPANY_URL: home_page(),
+            CAREERS_URL: career_page(("Backend Engineer", "Berlin", "/jobs/1")),
+        }
+        crawler, delta = crawl(state_path, site)
+        crawler.state_store.apply(delta)
+
+        _, delta = crawl(state_path, {})
+
+        assert not delta.has_changes
+        assert delta.dropped_pages == []
@@ -0,0 +1,45 @@
+"""
+HTML Parsing Tests
+Tests for the crawler's parser backends on real-world page quirks
+"""
+
+import pytest
+
+from ml.crawlers.html_parsing import available_backends, get_parser_backend, scan_job_element, scan_page
+
+XHTML_PAGE = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<body>
+  <div class="job-listing">
+    <h2>Ingénieur Backend</h2>
+    <p class="description">Paris, remote friendly</p>
+    <a href="/careers/backend">Apply</a>
+  </div>
+</body>
+</html>
+"""
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    return get_parser_backend(request.param)
+
+
+class TestParserBackends:
+    """Test every installed backend on the same pages"""
+
+    def test_xhtml_with_encoding_declaration(self, backend):
+        scan = scan_page(backend, backend.parse(XHTML_PAGE))
+
+        [job] = scan.matches[".job-listing"]
+        fields = scan_job_element(backend, job)
+        assert backend.text(fields.title).strip() == "Ingénieur Backend"
+        assert backend.attr(fields.link, "href") == "/careers/backend"
+
+    @pytest.mark.parametrize("html", ["", "   \n", "<!-- nothing here -->"])
+    def test_empty_documents(self, backend, html):
+        scan = scan_page(backend, backend.parse(html))
+
+        assert scan.links == []
+        assert not any(scan.matches.values())
@@ -0,0 +1,97 @@
+"""
+Job Filtering Tests
+Tests for the lexical prefilter and batched ML scoring of crawled jobs
+"""
+
+import asyncio
+
+from ml.crawlers.company_crawler import CompanyCrawler, JobPosting
+
+RESUME = """Jane Doe
+Backend engineer with eight years of Python, PostgreSQL and Kubernetes experience.
+Built billing services in Django and Redis."""
+
+
+def job(job_id, title, description, requirements=()):
+    return JobPosting(
+        id=job_id, title=title, company="Acme", location="Berlin",
+        description=description, requirements=list(requirements),
+        url=f"https://acme.example/jobs/{job_id}",
+    )
+
+
+JOBS = [
+    job("1", "Senior Backend Engineer", "Own our Python billing services", ["PostgreSQL", "Kubernetes"]),
+    job("2", "Pastry Chef", "Bake croissants and tarts every morning", ["Lamination", "Sourdough"]),
+    job("3", "Platform Engineer", "Run Kubernetes clusters", ["Terraform"]),
+]
+
+
+class FakeGeminiService:
+    """Scores jobs by position in the batch, recording each batch it is sent"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def analyze_job_compatibility_batch(self, resume_text, job_descriptions):
+        self.batches.append(job_descriptions)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return [{"compatibility_score": 60 + 10 * index} for index in range(len(job_descriptions))]
+
+
+def ids(jobs):
+    return [job["id"] if isinstance(job, dict) else job.id for job in jobs]
+
+
+class TestLexicalPrefilter:
+    """Test which jobs reach ML scoring"""
+
+    def test_unrelated_jobs_are_dropped(self):
+        crawler = CompanyCrawler()
+        assert ids(crawler._lexical_prefilter(JOBS, RESUME)) == ["1", "3"]
+
+    def test_target_skills_count_as_profile_terms(self):
+        crawler = CompanyCrawler()
+        assert ids(crawler._lexical_prefilter(JOBS, "Jane Doe", target_skills=["Sourdough"])) == ["2"]
+
+    def test_overlap_threshold(self):
+        crawler = CompanyCrawler()
+        assert ids(crawler._lexical_prefilter(JOBS, RESUME, min_keyword_overlap=3)) == ["1"]
+        assert ids(crawler._lexical_prefilter(JOBS, RESUME, min_keyword_overlap=0)) == ["1", "2", "3"]
+
+    def test_tech_spellings_are_single_tokens(self):
+        crawler = CompanyCrawler()
+        assert {"c++", "c#", "node.js"} <= crawler._tokenize("c++, c# and node.js.")
+
+
+class TestFilterJobsWithML:
+    """Test batched scoring of the prefiltered jobs"""
+
+    def test_prefiltered_jobs_are_scored_in_batches(self):
+        gemini = FakeGeminiService()
+        crawler = CompanyCrawler(gemini)
+
+        ranked = asyncio.run(crawler.filter_jobs_with_ml(JOBS, RESUME, batch_size=1))
+
+        assert len(gemini.batches) == 2
+        assert not any("Pastry Chef" in description for batch in gemini.batches for description in batch)
+        assert ids(ranked) == ["1", "3"]
+        assert [job["ml_analysis"]["compatibility_score"] for job in ranked] == [60, 60]
+
+    def test_results_are_ranked_by_score(self):
+        crawler = CompanyCrawler(FakeGeminiService())
+
+        ranked = asyncio.run(crawler.filter_jobs_with_ml(JOBS, RESUME))
+
+        # One batch: job 1 scores 60, job 3 scores 70
+        assert ids(ranked) == ["3", "1"]
+
+    def test_failed_batch_keeps_jobs_unscored(self):
+        crawler = CompanyCrawler(FakeGeminiService(fail=True))
+
+        ranked = asyncio.run(crawler.filter_jobs_with_ml(JOBS, RESUME))
+
+        assert ids(ranked) == ["1", "3"]
+        assert all(job["ml_analysis"]["error"] == "Analysis unavailable" for job in ranked)
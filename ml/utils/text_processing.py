@@ -225,24 +225,14 @@ def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
 
 
 def extract_sections(text: str) -> Dict[str, str]:
-    """Extract different sections from resume text."""
-    sections = {}
+    """Extract different sections from resume text (sections found only)."""
+    # Shared with the backend so both sides split resumes identically; imported
+    # here so the rest of this module works without the backend tree
+    from backend.app.utils.section_parser import parse_resume_sections
     
-    # Common section headers
-    section_patterns = {
-        'summary': r'(summary|profile|objective|about).*?(?=\n\s*[A-Z][A-Z\s]*\n|$)',
-        'experience': r'(experience|employment|work history).*?(?=\n\s*[A-Z][A-Z\s]*\n|$)',
-        'education': r'(education|academic|qualification).*?(?=\n\s*[A-Z][A-Z\s]*\n|$)',
-        'skills': r'(skills|competencies|technologies).*?(?=\n\s*[A-Z][A-Z\s]*\n|$)',
-        'projects': r'(projects|portfolio).*?(?=\n\s*[A-Z][A-Z\s]*\n|$)'
-    }
-    
-    for section_name, pattern in section_patterns.items():
-        match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-        if match:
-            sections[section_name] = match.group().strip()
-    
-    return sections
+    sections = parse_resume_sections(text)
+    sections.pop('contact_info', None)
+    return {name: content for name, content in sections.items() if content}
 
 
 def calculate_text_similarity(text1: str, text2: str) -> float:
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+HTML Parsing Benchmark
+Compares crawler parser backends over a saved corpus of career pages
+
+Build a corpus by crawling with CRAWLER_CORPUS_DIR set, then run:
+    python scripts/bench_html_parsing.py --corpus ./crawl_corpus
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the repository root to the Python path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root))
+
+from ml.crawlers.html_parsing import (
+    available_backends,
+    get_parser_backend,
+    scan_page,
+    scan_job_element,
+    JOB_SELECTORS,
+    HAS_BS4,
+)
+
+
+def load_corpus(corpus_dir: Path):
+    """Load every saved .html page in the corpus directory"""
+    pages = []
+    for path in sorted(corpus_dir.glob("*.html")):
+        pages.append(path.read_text(encoding="utf-8", errors="replace"))
+    return pages
+
+
+def run_single_pass(backend_name: str, pages) -> int:
+    """Current strategy: one walk per page, one walk per job element"""
+    backend = get_parser_backend(backend_name)
+    elements = 0
+    for html in pages:
+        scan = scan_page(backend, backend.parse(html), JOB_SELECTORS)
+        for selector, _ in JOB_SELECTORS:
+            job_elements = scan.matches[selector]
+            if job_elements:
+                for element in job_elements:
+                    scan_job_element(backend, element)
+                elements += len(job_elements)
+                break
+    return elements
+
+
+def run_legacy(pages) -> int:
+    """Previous strategy: html.parser plus one soup.select() per selector"""
+    from bs4 import BeautifulSoup
+
+    selectors = [selector for selector, _ in JOB_SELECTORS]
+    title_selectors = ['h1', 'h2', 'h3', '.title', '.job-title', '[class*="title"]']
+    elements = 0
+    for html in pages:
+        soup = BeautifulSoup(html, 'html.parser')
+        soup.find_all('a', href=True)
+        for selector in selectors:
+            job_elements = soup.select(selector)
+            if job_elements:
+                for element in job_elements:
+                    for title_selector in title_selectors:
+                        if element.select_one(title_selector):
+                            break
+                    element.select_one('.description, .summary, .content, p')
+                    element.select_one('a[href]')
+                elements += len(job_elements)
+                break
+    return elements
+
+
+def timed(label: str, fn, pages, repeat: int):
+    best = None
+    elements = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        elements = fn(pages)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    per_page_ms = best / len(pages) * 1000
+    print(f"{label:<28} {best:8.3f}s  {per_page_ms:7.2f} ms/page  {elements:6d} job elements")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawler HTML parsing backends")
+    parser.add_argument("--corpus", required=True, help="Directory of saved career page .html files")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend (best time is reported)")
+    args = parser.parse_args()
+
+    pages = load_corpus(Path(args.corpus))
+    if not pages:
+        print(f"No .html files found in {args.corpus}")
+        sys.exit(1)
+
+    total_mb = sum(len(html) for html in pages) / 1024 / 1024
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB")
+
+    if HAS_BS4:
+        timed("legacy (bs4 + select)", run_legacy, pages, args.repeat)
+
+    for backend_name in available_backends():
+        timed(f"single-pass ({backend_name})", lambda p, b=backend_name: run_single_pass(b, p), pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Report Rendering Benchmark
+Times PDF/text report rendering for analyses with many feedback items,
+with and without the per-process style cache, and cached report reads
+
+    python scripts/bench_report_rendering.py --items 10 100 500
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the backend to the Python path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "backend"))
+
+from app.services.report_service import (
+    ReportCache,
+    build_report_data,
+    generate_pdf_report,
+    generate_text_report,
+    get_report_styles,
+)
+
+CATEGORIES = ["technical", "experience", "education", "format", "keywords"]
+PRIORITIES = ["high", "medium", "low"]
+
+
+def make_report_inputs(feedback_items: int):
+    """Synthetic analysis/features rows shaped like the database models"""
+    feedback = [
+        {
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "priority": PRIORITIES[i % len(PRIORITIES)],
+            "job_wants": f"Requirement {i} from the job description",
+            "you_have": f"Current resume coverage for requirement {i}",
+            "fix": f"Rewrite bullet {i} to quantify impact and name the tools used",
+        }
+        for i in range(feedback_items)
+    ]
+    analysis = SimpleNamespace(
+        id=f"analysis-{feedback_items}",
+        overall_score=78.0,
+        ats_score=82.0,
+        created_at=datetime.now(timezone.utc),
+        strengths=["Clear structure"],
+        recommendations=["Add metrics"],
+        analysis_data={"feedback": feedback},
+    )
+    features = SimpleNamespace(
+        content_hash="0" * 64,
+        contact_info={"name": "Jane Smith", "email": "jane@example.com", "phone": "(555) 123-4567"},
+        sections={"summary": "Backend engineer with experience scaling APIs."},
+        keywords=["python", "sql", "fastapi"],
+        word_stats={"words": 540, "sentences": 32},
+        readability_score=48.2,
+    )
+    resume = SimpleNamespace(id="resume-1", filename="resume.pdf")
+    return resume, analysis, features
+
+
+def time_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark report rendering")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 500],
+                        help="Feedback item counts to render")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders per measurement")
+    args = parser.parse_args()
+
+    cache = ReportCache(tempfile.mkdtemp(prefix="report_cache_"))
+
+    print(f"{'items':>6} {'txt ms':>10} {'pdf cold ms':>12} {'pdf warm ms':>12} {'cache hit ms':>13} {'pdf KB':>8}")
+    for items in args.items:
+        resume, analysis, features = make_report_inputs(items)
+        data = build_report_data(analysis, features)
+
+        txt_ms = time_call(lambda: generate_text_report(data, resume), args.repeat)
+
+        def render_cold():
+            # Rebuilds the stylesheet every time, as the old endpoint did
+            get_report_styles.cache_clear()
+            return generate_pdf_report(data, resume)
+
+        cold_ms = time_call(render_cold, args.repeat)
+        warm_ms = time_call(lambda: generate_pdf_report(data, resume), args.repeat)
+
+        pdf = generate_pdf_report(data, resume)
+        key = cache.make_key(resume.id, analysis.id, features.content_hash, "pdf")
+        cache.put(key, "pdf", pdf)
+        hit_ms = time_call(lambda: cache.get(key, "pdf"), args.repeat)
+
+        print(f"{items:>6} {txt_ms:>10.2f} {cold_ms:>12.2f} {warm_ms:>12.2f} {hit_ms:>13.3f} {len(pdf) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Worker Event Loop Benchmark
+Throughput of the real resume tasks (analyze_resume_async or
+generate_learning_path_async) in one worker process when each task calls
+asyncio.run with its own GeminiService, versus run_async on the shared
+worker loop with the worker's GeminiService. Gemini is a local HTTP
+endpoint with configurable latency; the tasks read and write the
+database in DATABASE_URL, so point it at a scratch database.
+
+The shared loop is also sampled by a heartbeat coroutine: any blocking
+call made on the loop thread (a sync Gemini request, a database query)
+shows up as a stall for every task sharing it.
+
+    python scripts/bench_worker_event_loop.py --task analyze --tasks 200 --latency-ms 20 --threads 1 4
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the backend to the Python path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root / "backend"))
+
+from aiohttp import web
+from google import genai
+from google.genai import types
+
+from app.database import Base, SessionLocal, engine
+from app.models.resume import LearningPathCache, Resume, ResumeAnalysis, ResumeFeatures
+from app.models.user import User
+from app.services.gemini_service import GeminiService
+from app.workers import resume_tasks
+from app.workers.async_runtime import worker_loop
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com
+
+SUMMARY
+Backend engineer with eight years of experience building billing systems.
+
+SKILLS
+Python, PostgreSQL, Django, Redis
+"""
+
+JOB = """Senior Backend Engineer
+We are looking for a backend engineer with Python, Kubernetes and Terraform."""
+
+ANALYSIS_TEXT = '{"overall_score": 78, "ats_score": 70, "strengths": ["Clear summary"], "recommendations": []}'
+LEARNING_PATH_TEXT = '{"learning_path": [{"skill": "Kubernetes", "priority": "high"}]}'
+
+
+def start_gemini(latency: float) -> dict:
+    """generateContent endpoint on a background loop; returns its port and connection count"""
+    ready = threading.Event()
+    state = {"peers": set()}
+
+    async def generate_content(request):
+        state["peers"].add(request.transport.get_extra_info("peername"))
+        await request.read()
+        await asyncio.sleep(latency)
+        text = LEARNING_PATH_TEXT if state.get("learning_path") else ANALYSIS_TEXT
+        return web.json_response({
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}],
+            "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 20, "totalTokenCount": 120},
+        })
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/{path:.*}", generate_content)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        state["port"] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return state
+
+
+def bench_gemini_service(port: int) -> GeminiService:
+    service = GeminiService(api_key="bench-key")
+    service.client = genai.Client(
+        api_key="bench-key", http_options=types.HttpOptions(base_url=f"http://127.0.0.1:{port}")
+    )
+    return service
+
+
+def create_resume() -> tuple:
+    with SessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", full_name="Bench User")
+        db.add(user)
+        db.flush()
+        resume = Resume(user_id=user.id, filename="cv.txt", content=RESUME_TEXT, file_type="txt")
+        db.add(resume)
+        db.commit()
+        return user.id, str(resume.id)
+
+
+def delete_resume(user_id, resume_id: str):
+    with SessionLocal() as db:
+        db.query(ResumeAnalysis).filter(ResumeAnalysis.resume_id == resume_id).delete()
+        db.query(ResumeFeatures).filter(ResumeFeatures.resume_id == resume_id).delete()
+        db.query(Resume).filter(Resume.id == resume_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+    clear_learning_paths()
+
+
+class Heartbeat:
+    """Longest delay of a 1 ms timer on the shared worker loop"""
+
+    def __init__(self):
+        self.max_stall = 0.0
+        self.running = True
+
+    async def run(self):
+        while self.running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            self.max_stall = max(self.max_stall, time.perf_counter() - start - 0.001)
+
+
+def clear_learning_paths():
+    with SessionLocal() as db:
+        db.query(LearningPathCache).filter(LearningPathCache.role_bucket == "backend engineer").delete()
+        db.commit()
+
+
+def call_task(task, resume_id: str):
+    result = task(resume_id, JOB)
+    assert result["status"] == "completed", result
+
+
+def warm_up(task, resume_id: str):
+    """Untimed first task: imports, schema builds and the learning path cache entry"""
+    clear_learning_paths()
+    call_task(task, resume_id)
+
+
+def run_tasks(task, resume_id: str, tasks: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda _: call_task(task, resume_id), range(tasks)))
+    return time.perf_counter() - start
+
+
+def run_per_task_loops(task, port: int, resume_id: str, tasks: int, threads: int) -> tuple:
+    """Old behaviour: asyncio.run and a new GeminiService per task"""
+    run_async, get_service = resume_tasks.run_async, resume_tasks.get_worker_gemini_service
+    resume_tasks.run_async = lambda coro, timeout=None: asyncio.run(coro)
+    resume_tasks.get_worker_gemini_service = lambda: bench_gemini_service(port)
+    try:
+        warm_up(task, resume_id)
+        return run_tasks(task, resume_id, tasks, threads), None
+    finally:
+        resume_tasks.run_async, resume_tasks.get_worker_gemini_service = run_async, get_service
+
+
+def run_shared_loop(task, port: int, resume_id: str, tasks: int, threads: int) -> tuple:
+    """Current behaviour: run_async on the worker loop, one GeminiService per worker"""
+    worker_loop.get_resource("gemini_service", lambda: bench_gemini_service(port))
+    warm_up(task, resume_id)
+    heartbeat = Heartbeat()
+    beat = asyncio.run_coroutine_threadsafe(heartbeat.run(), worker_loop.get_loop())
+    try:
+        return run_tasks(task, resume_id, tasks, threads), heartbeat.max_stall
+    finally:
+        heartbeat.running = False
+        beat.result()
+        worker_loop.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker task throughput")
+    parser.add_argument("--task", choices=["analyze", "learning_path"], default="analyze")
+    parser.add_argument("--tasks", type=int, default=200, help="Tasks per measurement")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Gemini latency per request")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4],
+                        help="Concurrent task threads (1 = prefork child)")
+    args = parser.parse_args()
+
+    task = {
+        "analyze": resume_tasks.analyze_resume_async,
+        "learning_path": resume_tasks.generate_learning_path_async,
+    }[args.task]
+    gemini = start_gemini(args.latency_ms / 1000)
+    gemini["learning_path"] = args.task == "learning_path"
+
+    Base.metadata.create_all(bind=engine)
+    user_id, resume_id = create_resume()
+    try:
+        print(f"{'threads':>7} {'mode':>16} {'tasks/s':>10} {'ms/task':>9} {'connections':>12} {'loop stall ms':>14}")
+        for threads in args.threads:
+            for mode, runner in (("asyncio.run", run_per_task_loops), ("shared loop", run_shared_loop)):
+                gemini["peers"].clear()
+                elapsed, stall = runner(task, gemini["port"], resume_id, args.tasks, threads)
+                stall_ms = "-" if stall is None else f"{stall * 1000:.1f}"
+                print(f"{threads:>7} {mode:>16} {args.tasks / elapsed:>10.1f} "
+                      f"{elapsed / args.tasks * 1000:>9.3f} {len(gemini['peers']):>12} {stall_ms:>14}")
+    finally:
+        delete_resume(user_id, resume_id)
+
+
+if __name__ == "__main__":
+    main()